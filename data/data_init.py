@@ -17,18 +17,31 @@ def make_maps(H, W):
                            p=[0.4,0.2,0.15,0.15,0.1]).astype(np.int16)
     np.savetxt(maps_dir / "veg.csv", veg, fmt="%d", delimiter=",")
 
-    # river: a vertical sine curve in the middle
-    river = np.zeros((H, W), dtype=bool)
+    # river: a vertical sine curve in the middle (one broadcast compare, no row loop)
     thickness = 2
     cx = W // 2
-    for y in range(H):
-        rx = int(cx + 2*np.sin(2*np.pi*y/max(1,H)))
-        xL, xR = max(0, rx - thickness//2), min(W, rx + (thickness+1)//2)
-        river[y, xL:xR] = True
+    rx = (cx + 2*np.sin(2*np.pi*np.arange(H)/max(1,H))).astype(int)
+    xL, xR = np.maximum(0, rx - thickness//2), np.minimum(W, rx + (thickness+1)//2)
+    xs = np.arange(W)[None, :]
+    river = (xs >= xL[:, None]) & (xs < xR[:, None])
     np.savetxt(maps_dir / "river.csv", river.astype(int), fmt="%d", delimiter=",")
 
     return veg, river
 
+def make_procedural_maps(H, W, seed=0, patch_size=16.0, river_meander=0.0):
+    """
+    Noise-based vegetation patches + meandering river (src/landscape.py), saved as .npy maps.
+    Same (H, W) row/column layout as make_maps; use a large H, W for big test landscapes.
+    """
+    import sys
+    sys.path.insert(0, str(project_root))
+    from src.landscape import generate_landscape
+    veg, river = generate_landscape(W, H, seed=seed, patch_size=patch_size, river_meander=river_meander)
+    veg, river = veg.T.copy(), river.T.copy()
+    np.save(maps_dir / "veg.npy", veg)
+    np.save(maps_dir / "river.npy", river)
+    return veg, river
+
 def visualize(veg, river):
     fig, ax = plt.subplots(1,2, figsize=(8,4))
     ax[0].imshow(veg, cmap="Greens", origin="upper")
@@ -3,8 +3,7 @@ GUI entry point for the Feral Cats ABM (custom map support, class-based, no unre
 Run: python run.py
 """
 
-import os, sys, json
-import numpy as np
+import os, sys
 import matplotlib
 
 # ---- backend selection ----
@@ -27,33 +26,20 @@ def select_backend(interactive=True, force_tk=False):
             continue
 
 # ---- loaders ----
+# parsing + binary caching live in src/maps.py; these keep the GUI's names
+from src.maps import load_map
+
 def load_vegetation_from_csv(path, max_val=4):
-    arr = np.genfromtxt(path, delimiter=",", dtype=float)
-    arr = np.nan_to_num(arr, nan=0.0)
-    v = np.rint(arr).astype(np.int16)
-    np.clip(v, 0, max_val, out=v)
-    return v
+    return load_map(path, "vegetation", max_val=max_val)
 
 def load_vegetation_from_json(path, max_val=4):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    v = np.array(data, dtype=np.int16)
-    np.clip(v, 0, max_val, out=v)
-    return v
+    return load_map(path, "vegetation", max_val=max_val)
 
 def load_mask_from_png(path, threshold=128):
-    from PIL import Image  # pip install pillow
-    img = Image.open(path).convert("L")
-    a = np.array(img, dtype=np.uint8)
-    return (a >= threshold)
+    return load_map(path, "river", threshold=threshold)
 
 def load_vegetation_from_png(path, scale=4):
-    from PIL import Image
-    img = Image.open(path).convert("L")
-    a = np.array(img, dtype=np.float32) / 255.0
-    v = np.rint(a * scale).astype(np.int16)
-    np.clip(v, 0, scale, out=v)
-    return v
+    return load_map(path, "vegetation", max_val=scale)
 
 # ---- main GUI app ----
 def launch_gui():
@@ -64,7 +50,8 @@ def launch_gui():
     import matplotlib.pyplot as plt
     from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
     from src.model import FeralCatModel
-    from src.visual2d import animate_grid
+    from src.visual2d import animate_grid, reanimate, show_state
+    from src.replay import ReplayRecorder
 
     class App:
         def __init__(self, root):
@@ -77,6 +64,16 @@ def launch_gui():
             self.display = ttk.Frame(root, padding=10); self.display.grid(row=0, column=1, sticky="nsew")
             root.columnconfigure(1, weight=1); root.rowconfigure(0, weight=1)
 
+            # timeline under the grid: drag to look at any earlier step of the current run
+            # (rebuilt from replay keyframes, the live run pauses meanwhile)
+            self.timeline = ttk.Frame(self.display); self.timeline.pack(side="bottom", fill="x", pady=(6, 0))
+            self.timeline_var = tk.DoubleVar(value=0)
+            self.timeline_label_var = tk.StringVar(value="Step 0")
+            self.timeline_scale = ttk.Scale(self.timeline, from_=0, to=1, variable=self.timeline_var,
+                                            command=self.on_timeline)
+            self.timeline_scale.pack(side="left", fill="x", expand=True)
+            ttk.Label(self.timeline, textvariable=self.timeline_label_var, width=16).pack(side="right")
+
             # vars
             self.width_var  = tk.StringVar(value="25")
             self.height_var = tk.StringVar(value="25")
@@ -123,6 +120,8 @@ def launch_gui():
 
             self.scent_var = tk.BooleanVar(value=False)  # scent display toggle
             ttk.Checkbutton(self.params, text="Show cat scent", variable=self.scent_var).grid(row=r, column=0, columnspan=2, sticky="w", pady=(6, 0)); r += 1
+            self.hud_var = tk.BooleanVar(value=False)  # frame-time overlay toggle
+            ttk.Checkbutton(self.params, text="Performance HUD", variable=self.hud_var).grid(row=r, column=0, columnspan=2, sticky="w"); r += 1
             self.river_exist = tk.BooleanVar(value=True)  # river toggle
             ttk.Checkbutton(self.params, text="River Area", variable=self.river_exist).grid(row=r, column=0, columnspan=2, sticky="w", pady=(0, 6)); r += 1
 
@@ -130,6 +129,12 @@ def launch_gui():
             self.canvas_widget = None
             self.current_fig = None
             self.current_anim = None
+            self.current_model = None
+            self.current_maps = None   # (V, R) the current model was built with
+            self.replay = None         # keyframes of the current run
+            self._timeline_hook = None
+            self._timeline_busy = False
+            self._seek_pending = None
             self.is_running = False
             self.is_paused = False
             self.V = None
@@ -147,8 +152,8 @@ def launch_gui():
         def load_vegetation(self):
             from tkinter import filedialog, messagebox
             path = filedialog.askopenfilename(
-                title="Select vegetation (CSV/JSON/PNG)",
-                filetypes=[("CSV","*.csv"),("JSON","*.json"),("PNG","*.png"),("All","*.*")]
+                title="Select vegetation (CSV/JSON/PNG/NPY)",
+                filetypes=[("CSV","*.csv"),("JSON","*.json"),("PNG","*.png"),("NPY","*.npy"),("All","*.*")]
             )
             if not path: return
             try:
@@ -158,8 +163,10 @@ def launch_gui():
                     v = load_vegetation_from_json(path, max_val=4)
                 elif path.lower().endswith(".png"):
                     v = load_vegetation_from_png(path, scale=4)
+                elif path.lower().endswith(".npy"):
+                    v = load_map(path, "vegetation", max_val=4)
                 else:
-                    messagebox.showerror("Unsupported", "CSV / JSON / PNG only"); return
+                    messagebox.showerror("Unsupported", "CSV / JSON / PNG / NPY only"); return
                 self.V = v
                 h, w = v.shape
                 self.width_var.set(str(w)); self.height_var.set(str(h))
@@ -170,17 +177,13 @@ def launch_gui():
         def load_river(self):
             from tkinter import filedialog, messagebox
             path = filedialog.askopenfilename(
-                title="Select river mask (PNG/CSV)",
-                filetypes=[("PNG","*.png"),("CSV","*.csv"),("All","*.*")]
+                title="Select river mask (PNG/CSV/NPY)",
+                filetypes=[("PNG","*.png"),("CSV","*.csv"),("NPY","*.npy"),("All","*.*")]
             )
             if not path: return
             try:
-                if path.lower().endswith(".png"):
-                    m = load_mask_from_png(path, threshold=128)
-                else:
-                    arr = np.genfromtxt(path, delimiter=",", dtype=float)
-                    arr = np.nan_to_num(arr, nan=0.0); m = (arr > 0.5)
-                self.R = m.astype(bool)
+                m = load_map(path, "river", threshold=128)
+                self.R = m
                 self.river_label_var.set(f"River: {os.path.basename(path)} shape={m.shape} true={m.sum()}")
             except Exception as e:
                 messagebox.showerror("Load error", f"Failed to load river：\n{e}")
@@ -213,6 +216,47 @@ def launch_gui():
             if self.canvas_widget is not None:
                 self.canvas_widget.destroy()
                 self.canvas_widget = None
+            if self.current_fig is not None:
+                plt.close(self.current_fig)
+            self.current_fig = None
+            self.current_model = None
+
+        def close_plot_windows(self):
+            # result plots only; the simulation figure is kept for the next run
+            for num in plt.get_fignums():
+                if plt.figure(num) is not self.current_fig:
+                    plt.close(num)
+
+        # ----- timeline -----
+        def update_timeline(self, step):
+            self._timeline_busy = True   # programmatic move, not a user seek
+            try:
+                self.timeline_scale.config(to=max(1, step))
+                self.timeline_var.set(step)
+                self.timeline_label_var.set(f"Step {step}")
+            finally:
+                self._timeline_busy = False
+
+        def on_timeline(self, value):
+            if self._timeline_busy or self.replay is None or self.current_fig is None:
+                return
+            if self.is_running and not self.is_paused:
+                self.pause_resume()
+            # coalesce drag events: seek once per idle period
+            if self._seek_pending is None:
+                self.root.after(30, self._seek)
+            self._seek_pending = int(round(float(value)))
+
+        def _seek(self):
+            step, self._seek_pending = self._seek_pending, None
+            last = self.replay.last_step or 0
+            step = max(0, min(step, last))
+            try:
+                m = self.replay.seek(step)
+            except KeyError:
+                return
+            show_state(self.current_fig, m)
+            self.timeline_label_var.set(f"Step {step} / {last}")
 
         def show_plots(self, model):
             df = model.datacollector.get_model_vars_dataframe().reset_index(drop=True)
@@ -291,37 +335,64 @@ def launch_gui():
                 messagebox.showerror("Shape mismatch", f"River shape {self.R.shape} != Grid ({h},{w})")
                 return
 
-            # clean previous
-            import matplotlib.pyplot as plt
-            plt.close('all'); self.stop_anim(); self.clear_canvas()
-
-            # build model
-            model = FeralCatModel(
-                width=w, height=h,
-                n_cats=nc, n_prey=np_,
-                predation_base=pb, predation_coef=pc, prey_flee_prob=pf,
-                seed=seed,
-                vegetation=self.V, river=self.R,
-                river_exist  = self.river_exist.get(),
-            )
+            self.stop_anim(); self.close_plot_windows()
+
+            # same maps as the previous run: reset that model in place and restart its figure
+            # (rebuilding thousands of patches and the Tk canvas is what makes Start slow)
+            model = anim = None
+            prev = self.current_model
+            if (prev is not None and self.current_maps is not None
+                    and self.current_maps[0] is self.V and self.current_maps[1] is self.R):
+                model = prev
+                model.reset(seed=seed, width=w, height=h, n_cats=nc, n_prey=np_,
+                            predation_base=pb, predation_coef=pc, prey_flee_prob=pf,
+                            river_exist=self.river_exist.get())
+            else:
+                model = FeralCatModel(
+                    width=w, height=h,
+                    n_cats=nc, n_prey=np_,
+                    predation_base=pb, predation_coef=pc, prey_flee_prob=pf,
+                    seed=seed,
+                    vegetation=self.V, river=self.R,
+                    river_exist  = self.river_exist.get(),
+                )
             model.datacollector.collect(model)
 
+            # replay keyframes for the timeline (replacing the previous run's)
+            model.step_hooks = [h for h in model.step_hooks
+                                if h is not self.replay and h is not self._timeline_hook]
+            self.replay = ReplayRecorder(every=25).attach(model)
+            self._timeline_hook = lambda m: self.update_timeline(m.steps)
+            model.step_hooks.append(self._timeline_hook)
+            self.update_timeline(0)
+
             def _on_finished():
                 self.show_plots(model)
 
-            fig, anim = animate_grid(model, steps=st+1, interval_ms=300,
-                                     title=f"Feral Cats vs Prey ({model.width}x{model.height})",
-                                     scent_enabled=lambda: self.scent_var.get(),
-                                     on_finished=_on_finished)
-
-            canvas = FigureCanvasTkAgg(fig, master=self.display)
-            canvas.draw()
-            widget = canvas.get_tk_widget(); widget.pack(fill="both", expand=True)
+            if self.current_fig is not None and self.canvas_widget is not None:
+                anim = reanimate(self.current_fig, model, st+1, on_finished=_on_finished)
+            if anim is not None:
+                self.canvas_widget.pack(fill="both", expand=True)
+                self.current_fig.canvas.draw_idle()
+            else:
+                # clean previous
+                self.clear_canvas()
+                fig, anim = animate_grid(model, steps=st+1, interval_ms=300,
+                                         title=f"Feral Cats vs Prey ({model.width}x{model.height})",
+                                         scent_enabled=lambda: self.scent_var.get(),
+                                         hud=lambda: self.hud_var.get(),
+                                         on_finished=_on_finished)
+
+                canvas = FigureCanvasTkAgg(fig, master=self.display)
+                canvas.draw()
+                widget = canvas.get_tk_widget(); widget.pack(fill="both", expand=True)
+                self.current_fig = fig
+                self.canvas_widget = widget
 
             # keep refs
-            self.current_fig = fig
             self.current_anim = anim
-            self.canvas_widget = widget
+            self.current_model = model
+            self.current_maps = (self.V, self.R)
 
             self.set_running_state(True)
 
@@ -337,8 +408,10 @@ def launch_gui():
                 self.pause_btn.config(text="Resume")
 
         def reset_sim(self):
-            import matplotlib.pyplot as plt
-            plt.close('all'); self.stop_anim(); self.clear_canvas()
+            # hide the figure rather than destroying it, so the next Start can reuse it
+            self.stop_anim(); self.close_plot_windows()
+            if self.canvas_widget is not None:
+                self.canvas_widget.pack_forget()
             self.set_running_state(False)
 
         def on_close(self):
@@ -1,7 +1,11 @@
 from mesa import Agent
 
+from . import streams as st
+
 class Prey(Agent):
-    def __init__(self, model,sex=None):
+    # count > 1: a super-individual standing for `count` prey of the same sex on one cell
+    # (see superprey.py); every other prey is an ordinary individual with count = 1
+    def __init__(self, model,sex=None, count: int = 1):
         super().__init__(model)
         if sex in ("F","M"):
             self.sex = sex
@@ -10,6 +14,26 @@ class Prey(Agent):
             self.sex = "F" if self.model.random.random() < p_f else "M"
 
         self.since_repro = 0
+        self.count = int(count)
+        self.stream_id = self.unique_id   # key of its draws with streams on (streams.py)
+        # live prey counter on the model (cheap reporters read it instead of scanning agents)
+        self.counted = True
+        self.model.n_prey += self.count
+
+    def remove(self):
+        # an eaten prey can be hit by remove() more than once; count it out only once
+        if self.counted:
+            self.counted = False
+            self.model.n_prey -= self.count
+        super().remove()
+
+    def eat_one(self):
+        """One individual eaten: a super-individual shrinks, a single prey is removed (left on the grid)."""
+        if self.count > 1 and self.counted:
+            self.count -= 1
+            self.model.n_prey -= 1
+        else:
+            self.remove()
 
     def get_smile(self):
         pass
@@ -33,7 +57,7 @@ class Prey(Agent):
         dest = None
         flee_prob = self.model.prey_flee_prob
 
-        if sensed and self.model.random.random() < flee_prob and cat_positions:
+        if sensed and self.model.draw(st.FLEE, self) < flee_prob and cat_positions:
             # escape mode: from valid, choose the cell that maximizes distance to nearest cat
             best_d = -1
             best_positions = []
@@ -44,12 +68,12 @@ class Prey(Agent):
                     best_positions = [pos]
                 elif d == best_d:
                     best_positions.append(pos)
-            dest = self.model.random.choice(best_positions)
+            dest = self.model.pick(st.MOVE, self, best_positions)
             x, y = self.pos
             if vegetation is not None:
                 x, y = self.pos
                 if vegetation[x, y] > 0:
-                    vegetation[x, y] = max(1, vegetation[x, y] - 1)
+                    vegetation[x, y] = max(1, vegetation[x, y] - self.count)
             if hasattr(self.model, "prey_trail"):
                 self.model.prey_trail[x, y] = 1
             self.since_repro += 1
@@ -65,9 +89,9 @@ class Prey(Agent):
                         veg_val = vegetation[x, y]
                         weights.append(1 + veg_val)
                 # move to grid with higher vegetation
-                dest = self.model.random.choices(valid, weights=weights, k=1)[0]
+                dest = self.model.pick(st.MOVE, self, valid, weights)
             else:
-                dest = self.model.random.choice(valid)
+                dest = self.model.pick(st.MOVE, self, valid)
             grid.move_agent(self, dest)
             # left trail
             x, y = self.pos
@@ -78,7 +102,7 @@ class Prey(Agent):
             if vegetation is not None:
                 x, y = self.pos
                 if vegetation[x, y] > 0:
-                    vegetation[x, y] = max(1, vegetation[x, y] - 2)
+                    vegetation[x, y] = max(1, vegetation[x, y] - 2 * self.count)
 
             # Check Reproduction conditions
             # gender
@@ -97,11 +121,30 @@ class Prey(Agent):
             if self.since_repro < 30:
                 return
 
-            n_offspring = self.model.random.randint(0, 2)
             spawn_pos = self.pos
-            for _ in range(n_offspring):
-                baby_sex = "F" if self.model.random.random() < getattr(self.model, "prey_female_ratio", 0.5) else "M"
+            if self.count > 1:
+                # super-individual: each female has 0, 1 or 2 offspring, drawn in one go; the
+                # young are placed as one group per sex and merged at the end of the step
+                p_f = getattr(self.model, "prey_female_ratio", 0.5)
+                rng = self.model.rng_for(st.BIRTH, self.stream_id, self.model.steps)
+                _, one, two = rng.multinomial(self.count, [1 / 3] * 3)
+                n_offspring = int(one + 2 * two)
+                n_f = int(rng.binomial(n_offspring, p_f))
+                for i, (sex, k) in enumerate((("F", n_f), ("M", n_offspring - n_f))):
+                    if k:
+                        young = Prey(self.model, sex=sex, count=k)
+                        young.stream_id = st.child_id(self.stream_id, self.model.steps, i)
+                        grid.place_agent(young, spawn_pos)
+                if n_offspring and hasattr(self.model, "prey_trail"):
+                    self.model.prey_trail[spawn_pos[0], spawn_pos[1]] = 1
+                self.since_repro = 0
+                return
+
+            n_offspring = self.model.pick(st.BIRTH, self, (0, 1, 2))   # = random.randint(0, 2)
+            for i in range(n_offspring):
+                baby_sex = "F" if self.model.draw(st.SEX, self, i) < getattr(self.model, "prey_female_ratio", 0.5) else "M"
                 baby = Prey(self.model, sex=baby_sex)
+                baby.stream_id = st.child_id(self.stream_id, self.model.steps, i)
                 grid.place_agent(baby, spawn_pos)
 
                 # optioanal: leave trail at birth position
@@ -121,6 +164,14 @@ class Cat(Agent):
         self.energy = 3
         self.counter = 0
         self.alive = True
+        self.stream_id = self.unique_id
+        self.model.n_cats += 1
+
+    def remove(self):
+        if self.alive:
+            self.alive = False
+            self.model.n_cats -= 1
+        super().remove()
 
     def spread_smile(self):
         pass
@@ -131,7 +182,7 @@ class Cat(Agent):
 
         grid = self.model.grid
 
-        for _ in range(self.energy):
+        for move in range(self.energy):
             # move: Moore neighborhood, step size=1
             neighborhood = grid.get_neighborhood(self.pos, moore=True, include_center=True, radius=1)
             dest = None
@@ -143,25 +194,37 @@ class Cat(Agent):
                     v = int(trail[x, y])
                     w = max(6 - v, 1)
                     weights.append(w)
-                dest = self.model.random.choices(valid, weights=weights, k=1)[0]
+                dest = self.model.pick(st.MOVE, self, valid, weights, move)
             else:
-                dest = self.random.choice(valid)
+                dest = self.model.pick(st.MOVE, self, valid, k=move)
 
             grid.move_agent(self, dest)
 
             # prey: check the cell after move
             cellmates = grid.get_cell_list_contents([self.pos])
             prey_here = [a for a in cellmates if isinstance(a, Prey)]
+            if self.model.streams is not None:
+                prey_here.sort(key=lambda a: a.stream_id)   # not arrival order, which differs between runs
 
             if prey_here:
-                # select one prey to attempt predation (once per step)
-                target = self.model.random.choice(prey_here)
+                # select one prey to attempt predation (once per step); a super-individual is
+                # picked in proportion to the prey it stands for
+                if any(a.count > 1 for a in prey_here):
+                    target = self.model.pick(st.TARGET, self, prey_here, [a.count for a in prey_here], move)
+                else:
+                    target = self.model.pick(st.TARGET, self, prey_here, k=move)
                 prob = self.model.predation_prob_at(self.pos)
-                if self.model.random.random() < prob:
+                if self.model.draw(st.PREDATION, self, move) < prob:
                     # successful predation
-                    target.remove()
+                    target.eat_one()
                     self.model.predation_events_this_step += 1
                     self.model.predation_events_total += 1
+                    log = self.model.predation_log
+                    if log is not None:
+                        x, y = self.pos
+                        veg = self.model.vegetation
+                        log.append(self.model.steps, x, y, veg[x, y] if veg is not None else 0,
+                                   self.unique_id, target.sex)
 
                     self.energy = min(self.energy + 1, 3)
                     self.counter = 0
@@ -174,4 +237,5 @@ class Cat(Agent):
         if self.energy <= 0:
             grid.remove_agent(self)
             self.alive = False
+            self.model.n_cats -= 1
 
@@ -0,0 +1,127 @@
+"""
+Batch helpers: run one (scenario, seed) of FeralCatModel and summarise it the same way the
+project notebook does, or run a whole sweep of scenarios x seeds.
+
+A scenario is a plain dict as in the notebook's SCENARIOS list, e.g.
+    dict(group="S0_Baseline", width=25, height=25, n_cats=8, n_prey=80,
+         predation_base=0.20, predation_coef=0.10, prey_flee_prob=0.40)
+Every key except "group" is passed to FeralCatModel (so river_exist etc. work too).
+Array values (vegetation / river maps, density maps) are published once to shared memory when
+a process pool is used, so workers map them instead of receiving pickled copies.
+"""
+
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .model import FeralCatModel
+from .resources import SUMMARY_AGGREGATES, ResourceMonitor
+
+
+def build_model(scenario: dict, seed: int | None, step_hooks=()):
+    params = {k: v for k, v in scenario.items() if k != "group"}
+    if step_hooks:
+        params["step_hooks"] = list(params.get("step_hooks", ())) + list(step_hooks)
+    return FeralCatModel(seed=seed, **params)
+
+
+def summarize_trace(df, group, seed, steps, max_steps):
+    """Per-run metrics from a model trace (columns step/Cats/Prey/predation_events_this_step)."""
+    extinct_mask = (df["Prey"] <= 0)
+    extinct = bool(extinct_mask.any())
+    tte = int(df.loc[extinct_mask, "step"].min()) if extinct else max_steps
+    # the running total is exact even when only some steps were collected
+    if "predation_events_total" in df.columns:
+        pred_total = int(df["predation_events_total"].iloc[-1])
+    elif "predation_events_this_step" in df.columns:
+        pred_total = int(df["predation_events_this_step"].sum())
+    else:
+        pred_total = np.nan
+    return dict(group=group, seed=seed, extinct=extinct, tte=tte,
+                final_prey=int(df["Prey"].iloc[-1]), final_cats=int(df["Cats"].iloc[-1]),
+                pred_events_total=pred_total, steps=steps)
+
+
+def run_once(scenario: dict, seed: int, max_steps: int = 200, telemetry=None, resources: bool = True,
+             time_limit: float | None = None):
+    """
+    Run one scenario with one seed; returns (summary dict, per-step DataFrame).
+    telemetry: optional (host, udp_port) of a telemetry server to publish live counters to.
+    resources: add CPU time, RSS and model memory figures to the summary (see resources.py).
+    time_limit: stop stepping after this many wall-clock seconds; the summary then also has
+                truncated (True if the run was cut short before max_steps / extinction).
+    """
+    t0 = time.perf_counter()
+    monitor = ResourceMonitor() if resources else None
+    hooks = [monitor] if monitor is not None else []
+    if telemetry is not None:
+        from .telemetry import TelemetryPublisher
+        hooks.append(TelemetryPublisher(*telemetry, run_id=f"{scenario.get('group', '')}/seed{seed}"))
+    m = build_model(scenario, seed, step_hooks=hooks)
+    steps = 0
+    truncated = False
+    while m.running and steps < max_steps:
+        if time_limit is not None and time.perf_counter() - t0 > time_limit:
+            truncated = True
+            break
+        m.step()
+        steps += 1
+    m.finalize()
+    for h in hooks:
+        if hasattr(h, "close"):
+            h.close()
+
+    group = scenario.get("group", "")
+    df = m.datacollector.get_step_dataframe()
+    df["group"], df["seed"], df["total_steps"] = group, seed, steps
+    summary = summarize_trace(df, group, seed, steps, max_steps)
+    if time_limit is not None:
+        summary["truncated"] = truncated
+    if monitor is not None:
+        summary.update(monitor.report(m))
+    return summary, df
+
+
+def _run_task(task):
+    scenario, seed, max_steps, telemetry = task
+    return run_once(scenario, seed, max_steps, telemetry=telemetry)
+
+
+def run_batch(scenarios, seeds, max_steps: int = 200, processes: int | None = 1, telemetry=None,
+              cost_model=None, memory_budget_mb: float | None = None, deadline: float | None = None):
+    """
+    Run every scenario with every seed. processes > 1 (or None = all cores) uses a process pool,
+    fed longest-predicted-run first (see scheduling.py); cost_model, memory_budget_mb and
+    deadline (seconds) go to the scheduler, which then also handles processes=1.
+    Returns (runs_df, traces_df) like the notebook: one row per run, and all traces concatenated.
+    """
+    if processes != 1 or cost_model is not None or memory_budget_mb is not None or deadline is not None:
+        from .scheduling import run_scheduled
+        runs_df, traces_df, report = run_scheduled(
+            scenarios, seeds, max_steps, processes, cost_model=cost_model,
+            memory_budget_mb=memory_budget_mb, deadline=deadline, telemetry=telemetry)
+        if report["skipped"]:
+            warnings.warn(f"deadline: {len(report['skipped'])} runs skipped", RuntimeWarning)
+        return runs_df, traces_df
+
+    tasks = [(sc, s, max_steps, telemetry) for sc in scenarios for s in seeds]
+    results = [_run_task(t) for t in tasks]
+    run_rows = [{**sc, **res} for (sc, *_), (res, _) in zip(tasks, results)]
+    runs_df = pd.DataFrame(run_rows)
+    traces_df = pd.concat([df for _, df in results], ignore_index=True) if results else pd.DataFrame()
+    return runs_df, traces_df
+
+
+def summarize_runs(runs_df):
+    """Scenario-level summary table, as printed by the notebook (plus resource columns if recorded)."""
+    extra = {k: v for k, v in SUMMARY_AGGREGATES.items() if v[0] in runs_df.columns}
+    return (runs_df.groupby("group", as_index=False)
+            .agg(extinction_rate=("extinct", "mean"),
+                 avg_tte=("tte", "mean"),
+                 final_prey_mean=("final_prey", "mean"),
+                 final_cats_mean=("final_cats", "mean"),
+                 pred_events_avg=("pred_events_total", "mean"),
+                 **extra)
+            .sort_values(["group"]))
@@ -0,0 +1,154 @@
+"""
+Data collection policies and cheap recorders.
+
+FeralCatModel(collect=...) decides on which steps the DataCollector records a row:
+    collect=1 / None   every step (default, same as before)
+    collect=10         every 10th step
+    collect="change"   only when Cats or Prey changed since the last row
+    collect="final"    only the final state (when the model stops, or on model.finalize())
+    collect=callable   custom predicate, called as pred(model) -> bool
+    collect=<CollectionPolicy instance>
+
+Rows carry their step number (StepDataCollector.get_step_dataframe), so decimated traces
+stay aligned. For extra per-step series without DataCollector overhead, CounterRecorder
+stores attributes / callables into preallocated NumPy columns and is registered as a step hook.
+"""
+
+import numpy as np
+import pandas as pd
+from mesa.datacollection import DataCollector
+
+
+# ---- policies ----
+class CollectionPolicy:
+    """Base policy: collect every step."""
+    def should_collect(self, model) -> bool:
+        return True
+
+    def collect_final(self, model) -> bool:
+        """Whether the last state must be recorded when the run ends (if not already)."""
+        return False
+
+
+class Every(CollectionPolicy):
+    def __init__(self, n: int = 1, offset: int = 0):
+        self.n, self.offset = max(1, int(n)), offset
+
+    def should_collect(self, model):
+        return (model.steps - self.offset) % self.n == 0
+
+    def collect_final(self, model):
+        return self.n > 1
+
+
+class OnChange(CollectionPolicy):
+    """Collect when any of the watched model attributes differ from the last collected row."""
+    def __init__(self, attrs=("n_cats", "n_prey")):
+        self.attrs = tuple(attrs)
+        self._last = None
+
+    def should_collect(self, model):
+        now = tuple(getattr(model, a, None) for a in self.attrs)
+        if now == self._last:
+            return False
+        self._last = now
+        return True
+
+    def collect_final(self, model):
+        return True
+
+
+class FinalOnly(CollectionPolicy):
+    def should_collect(self, model):
+        return not model.running
+
+    def collect_final(self, model):
+        return True
+
+
+class When(CollectionPolicy):
+    def __init__(self, predicate, final: bool = True):
+        self.predicate, self.final = predicate, final
+
+    def should_collect(self, model):
+        return bool(self.predicate(model))
+
+    def collect_final(self, model):
+        return self.final
+
+
+def make_policy(spec) -> CollectionPolicy:
+    if spec is None:
+        return Every(1)
+    if isinstance(spec, CollectionPolicy):
+        return spec
+    if isinstance(spec, bool):
+        raise ValueError("collect must be an int, 'change', 'final', a callable or a CollectionPolicy")
+    if isinstance(spec, int):
+        return Every(spec)
+    if spec == "final":
+        return FinalOnly()
+    if spec == "change":
+        return OnChange()
+    if callable(spec):
+        return When(spec)
+    raise ValueError(f"unknown collection policy: {spec!r}")
+
+
+# ---- collectors ----
+class StepDataCollector(DataCollector):
+    """DataCollector that also remembers the model step of every collected row."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.collected_steps = []
+
+    def collect(self, model):
+        super().collect(model)
+        self.collected_steps.append(model.steps)
+
+    def get_step_dataframe(self):
+        """Model variables with a leading 'step' column holding the model step of each row."""
+        df = self.get_model_vars_dataframe().reset_index(drop=True)
+        df.insert(0, "step", self.collected_steps[:len(df)])
+        return df
+
+
+class CounterRecorder:
+    """
+    Step hook recording cheap per-step values into growable NumPy columns.
+        rec = CounterRecorder({"prey": "n_prey", "veg": lambda m: m.vegetation.mean()}, policy=10)
+        m = FeralCatModel(..., step_hooks=[rec])
+        ...
+        rec.to_dataframe()
+    Reporters are model attribute names or callables taking the model.
+    """
+    def __init__(self, reporters: dict, policy=None, capacity: int = 1024, dtype=np.float64):
+        self.names = list(reporters)
+        self.getters = [
+            (lambda m, a=r: getattr(m, a)) if isinstance(r, str) else r for r in reporters.values()
+        ]
+        self.policy = make_policy(policy)
+        self.steps = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty((capacity, len(self.names)), dtype=dtype)
+        self.n = 0
+
+    def __call__(self, model):
+        if self.policy.should_collect(model) or (not model.running and self.policy.collect_final(model)):
+            self.record(model)
+
+    def record(self, model):
+        if self.n and self.steps[self.n - 1] == model.steps:
+            return  # already have this step
+        if self.n == len(self.steps):
+            cap = 2 * len(self.steps)
+            self.steps = np.resize(self.steps, cap)
+            self.values = np.resize(self.values, (cap, len(self.names)))
+        self.steps[self.n] = model.steps
+        for j, get in enumerate(self.getters):
+            self.values[self.n, j] = get(model)
+        self.n += 1
+
+    def to_dataframe(self):
+        df = pd.DataFrame(self.values[:self.n], columns=self.names)
+        df.insert(0, "step", self.steps[:self.n])
+        return df
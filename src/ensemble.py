@@ -0,0 +1,372 @@
+"""
+Streaming ensemble statistics across replicates.
+
+Instead of concatenating every per-seed trace and grouping afterwards (memory grows with
+replicates x steps, and nothing is available until the whole sweep is done), runs are folded
+into per-scenario, per-step accumulators as they finish:
+    mean / variance (Welford), min / max, quantile sketches (P-squared, 5 markers per quantile),
+    extinction-time histogram and survival curve, and the notebook's run-level summary.
+Memory is O(steps) per scenario whatever the number of replicates.
+
+    agg = EnsembleAggregator(max_steps=200)
+    for sc in SCENARIOS:
+        for s in SEEDS:
+            agg.add_result(sc["group"], run_once(sc, s))
+            agg.frame("S0_Baseline")              # partial results, any time
+    agg.summary()                                 # same columns as batch.summarize_runs
+    agg.plot_trends(["S0_Baseline", "S1_HighPred", "S2_FleeRescue"])
+
+run_ensemble() does the same with a process pool, folding results in as workers return them
+and optionally writing a snapshot (.npz) that another process can open with
+EnsembleAggregator.load() while the batch is still running.
+
+Runs that stop early (prey extinct) are an absorbing state: by default (fill="last") their final
+row is carried forward to max_steps, so every step averages over all runs. fill=None only
+counts the runs that actually reached a step.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_VARIABLES = ("Cats", "Prey", "predation_events_this_step")
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+
+
+# ---- quantile sketch ----
+class P2Quantile:
+    """
+    P-squared quantile estimator (Jain & Chlamtac) for many independent streams at once:
+    one stream per slot (here: per variable x step). Constant memory per slot.
+    """
+    def __init__(self, size: int, p: float):
+        self.p = p
+        self.q = np.zeros((size, 5))                       # marker heights
+        self.n = np.tile(np.arange(5, dtype=np.float64), (size, 1))   # marker positions
+        self.ns = np.tile([0, 2 * p, 4 * p, 2 + 2 * p, 4], (size, 1))  # desired positions
+        self.dn = np.array([0, p / 2, p, (1 + p) / 2, 1])
+        self.count = np.zeros(size, dtype=np.int64)
+
+    def update(self, idx, x):
+        """Add x[i] to stream idx[i] (each stream at most once per call)."""
+        idx = np.asarray(idx)
+        x = np.asarray(x, dtype=np.float64)
+        c = self.count[idx]
+
+        warm = c < 5
+        if warm.any():
+            wi = idx[warm]
+            self.q[wi, c[warm]] = x[warm]
+            self.count[wi] += 1
+            full = wi[self.count[wi] == 5]
+            self.q[full] = np.sort(self.q[full], axis=1)
+        hot = ~warm
+        if not hot.any():
+            return
+
+        i, x = idx[hot], x[hot]
+        q, n = self.q[i], self.n[i]
+        rows = np.arange(len(i))
+        # extend the extremes, find the cell k the new value falls into
+        q[:, 0] = np.minimum(q[:, 0], x)
+        q[:, 4] = np.maximum(q[:, 4], x)
+        k = (x[:, None] >= q[:, 1:4]).sum(axis=1)
+        n += np.arange(5)[None, :] > k[:, None]
+        ns = self.ns[i] + self.dn
+
+        for j in (1, 2, 3):
+            d = ns[:, j] - n[:, j]
+            move = ((d >= 1) & (n[:, j + 1] - n[:, j] > 1)) | ((d <= -1) & (n[:, j - 1] - n[:, j] < -1))
+            if not move.any():
+                continue
+            r = rows[move]
+            s = np.sign(d[r])
+            qm, nm = q[r], n[r]
+            qp = qm[:, j] + s / (nm[:, j + 1] - nm[:, j - 1]) * (
+                (nm[:, j] - nm[:, j - 1] + s) * (qm[:, j + 1] - qm[:, j]) / (nm[:, j + 1] - nm[:, j])
+                + (nm[:, j + 1] - nm[:, j] - s) * (qm[:, j] - qm[:, j - 1]) / (nm[:, j] - nm[:, j - 1]))
+            nb = np.where(s > 0, j + 1, j - 1)
+            lin = qm[:, j] + s * (qm[np.arange(len(r)), nb] - qm[:, j]) / (nm[np.arange(len(r)), nb] - nm[:, j])
+            ok = (qm[:, j - 1] < qp) & (qp < qm[:, j + 1])
+            q[r, j] = np.where(ok, qp, lin)
+            n[r, j] += s
+
+        self.q[i], self.n[i], self.ns[i] = q, n, ns
+        self.count[i] += 1
+
+    def value(self):
+        """Current estimate per stream (exact for fewer than 5 values, NaN for empty streams)."""
+        out = self.q[:, 2].copy()
+        for i in np.flatnonzero(self.count < 5):
+            c = self.count[i]
+            out[i] = np.quantile(self.q[i, :c], self.p) if c else np.nan
+        return out
+
+    def state(self):
+        return dict(q=self.q, n=self.n, ns=self.ns, count=self.count)
+
+    def set_state(self, st):
+        self.q, self.n, self.ns, self.count = st["q"], st["n"], st["ns"], st["count"]
+
+
+# ---- per-scenario accumulators ----
+class ScenarioStats:
+    """Running statistics of one scenario: arrays of shape (n_variables, max_steps + 1)."""
+
+    _RUN_FIELDS = ("extinct", "tte", "final_prey", "final_cats", "pred_events_total")
+
+    def __init__(self, max_steps: int, variables=DEFAULT_VARIABLES, quantiles=DEFAULT_QUANTILES):
+        self.max_steps = max_steps
+        self.variables = tuple(variables)
+        self.quantiles = tuple(quantiles)
+        shape = (len(self.variables), max_steps + 1)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+        self.sketches = [P2Quantile(self.count.size, p) for p in self.quantiles]
+        # extinction step histogram; the last bin counts runs that never went extinct
+        self.extinctions = np.zeros(max_steps + 2, dtype=np.int64)
+        self.runs = 0
+        self.run_sums = dict.fromkeys(self._RUN_FIELDS, 0.0)
+
+    def add_trace(self, df, fill="last"):
+        """Fold one run's trace (DataFrame with a 'step' column) into the statistics."""
+        S = self.max_steps
+        steps = df["step"].to_numpy(dtype=np.int64)
+        keep = (steps >= 0) & (steps <= S)
+        vals = df[list(self.variables)].to_numpy(dtype=np.float64)
+
+        X = np.full((S + 1, len(self.variables)), np.nan)
+        X[steps[keep]] = vals[keep]
+        if fill == "last" and len(steps) and steps[keep].size:
+            last = steps[keep].max()
+            X[last + 1:] = vals[keep][-1]
+        X = X.T
+        mask = ~np.isnan(X)
+
+        # Welford
+        self.count[mask] += 1
+        x = X[mask]
+        d = x - self.mean[mask]
+        self.mean[mask] += d / self.count[mask]
+        self.m2[mask] += d * (x - self.mean[mask])
+        np.fmin(self.min, X, out=self.min)
+        np.fmax(self.max, X, out=self.max)
+
+        flat = np.flatnonzero(mask.ravel())
+        xf = X.ravel()[flat]
+        for sk in self.sketches:
+            sk.update(flat, xf)
+
+        # extinction time, run-level summary (as batch.summarize_trace)
+        prey = df["Prey"].to_numpy()
+        dead = np.flatnonzero(prey <= 0)
+        extinct = dead.size > 0
+        tte = int(steps[dead[0]]) if extinct else S
+        self.extinctions[min(tte, S) if extinct else S + 1] += 1
+        if "predation_events_total" in df.columns:
+            pred_total = float(df["predation_events_total"].iloc[-1])
+        elif "predation_events_this_step" in df.columns:
+            pred_total = float(df["predation_events_this_step"].sum())
+        else:
+            pred_total = np.nan
+        self.runs += 1
+        for k, v in zip(self._RUN_FIELDS, (extinct, tte, prey[-1], df["Cats"].iloc[-1], pred_total)):
+            self.run_sums[k] += float(v)
+
+    # ---- views ----
+    def variance(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+
+    def frame(self):
+        """Per-step statistics: step, n, and <var>_mean/_std/_min/_max/_qNN for every variable."""
+        cols = {"step": np.arange(self.max_steps + 1), "n": self.count.max(axis=0)}
+        std = np.sqrt(self.variance())
+        qs = [sk.value().reshape(self.count.shape) for sk in self.sketches]
+        empty = self.count == 0
+        for v, name in enumerate(self.variables):
+            cols[f"{name}_mean"] = np.where(empty[v], np.nan, self.mean[v])
+            cols[f"{name}_std"] = std[v]
+            cols[f"{name}_min"] = np.where(empty[v], np.nan, self.min[v])
+            cols[f"{name}_max"] = np.where(empty[v], np.nan, self.max[v])
+            for p, qv in zip(self.quantiles, qs):
+                cols[f"{name}_q{round(p * 100):02d}"] = qv[v]
+        df = pd.DataFrame(cols)
+        return df[df["n"] > 0].reset_index(drop=True)
+
+    def extinction(self):
+        """Extinctions per step and the survival curve (share of runs with prey alive after the step)."""
+        steps = np.arange(self.max_steps + 1)
+        ext = self.extinctions[:-1]
+        survival = 1.0 - np.cumsum(ext) / max(1, self.runs)
+        return pd.DataFrame({"step": steps, "extinctions": ext, "survival": survival})
+
+    def summary(self):
+        n = max(1, self.runs)
+        s = self.run_sums
+        return dict(runs=self.runs,
+                    extinction_rate=s["extinct"] / n,
+                    avg_tte=s["tte"] / n,
+                    final_prey_mean=s["final_prey"] / n,
+                    final_cats_mean=s["final_cats"] / n,
+                    pred_events_avg=s["pred_events_total"] / n)
+
+    # ---- (de)serialisation ----
+    def state(self):
+        st = dict(count=self.count, mean=self.mean, m2=self.m2, min=self.min, max=self.max,
+                  extinctions=self.extinctions, runs=np.int64(self.runs),
+                  run_sums=np.array([self.run_sums[k] for k in self._RUN_FIELDS]))
+        for j, sk in enumerate(self.sketches):
+            st.update({f"p2_{j}_{k}": v for k, v in sk.state().items()})
+        return st
+
+    def set_state(self, st):
+        self.count, self.mean, self.m2 = st["count"], st["mean"], st["m2"]
+        self.min, self.max, self.extinctions = st["min"], st["max"], st["extinctions"]
+        self.runs = int(st["runs"])
+        self.run_sums = dict(zip(self._RUN_FIELDS, map(float, st["run_sums"])))
+        for j, sk in enumerate(self.sketches):
+            sk.set_state({k: st[f"p2_{j}_{k}"] for k in ("q", "n", "ns", "count")})
+
+
+class EnsembleAggregator:
+    """Streaming statistics for many scenarios; see the module docstring."""
+
+    def __init__(self, max_steps: int = 200, variables=DEFAULT_VARIABLES,
+                 quantiles=DEFAULT_QUANTILES, fill="last"):
+        self.max_steps = max_steps
+        self.variables = tuple(variables)
+        self.quantiles = tuple(quantiles)
+        self.fill = fill
+        self.scenarios = {}   # group -> ScenarioStats
+
+    def __getitem__(self, group):
+        return self.scenarios[group]
+
+    @property
+    def groups(self):
+        return list(self.scenarios)
+
+    def add(self, group, df):
+        """Fold one run's per-step trace into its scenario."""
+        st = self.scenarios.get(group)
+        if st is None:
+            st = self.scenarios[group] = ScenarioStats(self.max_steps, self.variables, self.quantiles)
+        st.add_trace(df, self.fill)
+
+    def add_result(self, group, result):
+        """Fold a (summary, trace) pair as returned by batch.run_once."""
+        self.add(group, result[1])
+
+    def frame(self, group=None):
+        """Per-step statistics of one scenario, or all scenarios stacked with a 'group' column."""
+        if group is not None:
+            return self.scenarios[group].frame()
+        parts = [st.frame().assign(group=g) for g, st in self.scenarios.items()]
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+    def extinction(self, group):
+        return self.scenarios[group].extinction()
+
+    def summary(self):
+        """Scenario-level table with the same columns as batch.summarize_runs (plus 'runs')."""
+        rows = [dict(group=g, **st.summary()) for g, st in self.scenarios.items()]
+        return pd.DataFrame(rows).sort_values("group").reset_index(drop=True) if rows else pd.DataFrame()
+
+    # ---- snapshots ----
+    def save(self, path):
+        """Write the current state to an .npz (atomically, so readers never see a partial file)."""
+        path = Path(path)
+        meta = dict(max_steps=self.max_steps, variables=self.variables, quantiles=self.quantiles,
+                    fill=self.fill, groups=self.groups)
+        arrays = {"meta": np.array(json.dumps(meta))}
+        for i, st in enumerate(self.scenarios.values()):
+            arrays.update({f"g{i}/{k}": v for k, v in st.state().items()})
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            meta = json.loads(str(z["meta"]))
+            agg = cls(meta["max_steps"], meta["variables"], meta["quantiles"], meta["fill"])
+            for i, g in enumerate(meta["groups"]):
+                prefix = f"g{i}/"
+                st = ScenarioStats(agg.max_steps, agg.variables, agg.quantiles)
+                st.set_state({k[len(prefix):]: z[k] for k in z.files if k.startswith(prefix)})
+                agg.scenarios[g] = st
+        return agg
+
+    # ---- plots ----
+    def plot_trends(self, groups=None, variables=("Cats", "Prey"), band=None, axes=None):
+        """
+        Mean trajectories with a quantile band per scenario (one row per scenario), like the
+        notebook's S0/S1/S2 trend figure. band: (low, high) quantiles, default outermost sketched.
+        """
+        import matplotlib.pyplot as plt
+        groups = list(groups) if groups is not None else self.groups
+        lo, hi = band if band is not None else (min(self.quantiles), max(self.quantiles))
+        if axes is None:
+            _, axes = plt.subplots(nrows=len(groups), ncols=1, figsize=(7, 3 * len(groups)),
+                                   squeeze=False, constrained_layout=True)
+            axes = axes[:, 0]
+        for ax, g in zip(axes, groups):
+            df = self.frame(g)
+            for v in variables:
+                line, = ax.plot(df["step"], df[f"{v}_mean"], label=f"{v} mean")
+                ax.fill_between(df["step"], df[f"{v}_q{round(lo * 100):02d}"],
+                                df[f"{v}_q{round(hi * 100):02d}"], color=line.get_color(), alpha=0.2)
+            ax.set_title(f"{g} (n={self.scenarios[g].runs})")
+            ax.set_xlabel("Step"); ax.set_ylabel("Count"); ax.legend()
+        return axes
+
+
+# ---- batch driver ----
+def run_ensemble(scenarios, seeds, max_steps: int = 200, processes: int | None = 1,
+                 aggregator=None, snapshot=None, snapshot_every: int = 10, on_result=None,
+                 telemetry=None):
+    """
+    Run scenarios x seeds and fold each run into an EnsembleAggregator as soon as it finishes
+    (in completion order when processes != 1). Traces are dropped after folding.
+    snapshot: path of an .npz rewritten every snapshot_every runs and at the end.
+    on_result(summary, aggregator): optional callback after every run.
+    Returns (aggregator, runs_df) where runs_df has one summary row per run.
+    """
+    from .batch import _run_task
+
+    agg = aggregator if aggregator is not None else EnsembleAggregator(max_steps)
+    tasks = [(sc, s, max_steps, telemetry) for sc in scenarios for s in seeds]
+    rows = []
+
+    def fold(res):
+        summary, df = res
+        agg.add(summary["group"], df)
+        rows.append(summary)
+        if on_result is not None:
+            on_result(summary, agg)
+        if snapshot is not None and len(rows) % snapshot_every == 0:
+            agg.save(snapshot)
+
+    if processes == 1:
+        for t in tasks:
+            fold(_run_task(t))
+    else:
+        from multiprocessing import Pool
+        from .shared_maps import SharedMaps
+        with SharedMaps() as maps, Pool(processes) as pool:
+            shared = [(maps.share_scenario(sc), *rest) for sc, *rest in tasks]
+            for res in pool.imap_unordered(_run_task, shared):
+                fold(res)
+
+    if snapshot is not None:
+        agg.save(snapshot)
+    return agg, pd.DataFrame(rows)
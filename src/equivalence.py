@@ -0,0 +1,294 @@
+"""
+Statistical equivalence harness for alternative engines.
+
+A faster implementation (vectorised agents, the sync scheduler, the tiled multi-process model,
+...) consumes random numbers differently, so it cannot be compared with FeralCatModel run for
+run. Instead both engines are run over many seeds for a standard scenario set and their
+outcome distributions are compared:
+
+    metric              test                         effect (checked against tolerance)
+    extinction time     Mann-Whitney U + KS          |mean difference| / max_steps
+    extinction rate     Fisher exact                 |rate difference|
+    predation total     Mann-Whitney U + KS          |mean difference| / reference mean
+    final prey / cats   Mann-Whitney U               |mean difference| / initial count
+    prey trajectory     KS at checkpoint steps       max |mean difference| / n_prey over all steps
+
+p-values are Holm-corrected within each scenario. A metric FAILs when its effect is outside
+tolerance, whether or not its test rejects (too few seeds is no evidence of equivalence),
+WARNs when the test rejects but the effect is within tolerance, and PASSes otherwise; an
+engine is accepted when no metric fails. Wall-clock time per run is recorded for both
+engines and reported as a speedup.
+
+    from src.equivalence import compare_engines, ENGINES
+    report = compare_engines(ENGINES["reference"], ENGINES["sync"], seeds=range(30))
+    report.table          # one row per scenario x metric
+    report.summary()      # per-scenario verdict and speedup
+    report.accepted
+
+CLI: python -m src.equivalence --engine sync --seeds 30 [--scenarios S0_Baseline S1_HighPred]
+"""
+
+import argparse
+import sys
+import time
+import warnings
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from .batch import build_model, summarize_trace
+
+
+# the notebook's scenario set
+STANDARD_SCENARIOS = [
+    dict(group="S0_Baseline", width=25, height=25, n_cats=8, n_prey=80,
+         predation_base=0.20, predation_coef=0.10, prey_flee_prob=0.40),
+    dict(group="S1_HighPred", width=25, height=25, n_cats=8, n_prey=80,
+         predation_base=0.40, predation_coef=0.20, prey_flee_prob=0.20),
+    dict(group="S2_FleeRescue", width=25, height=25, n_cats=8, n_prey=80,
+         predation_base=0.40, predation_coef=0.20, prey_flee_prob=0.80),
+    dict(group="S3_SmallArena", width=15, height=15, n_cats=8, n_prey=80,
+         predation_base=0.20, predation_coef=0.10, prey_flee_prob=0.40),
+    dict(group="S3_LargeArena", width=40, height=40, n_cats=8, n_prey=80,
+         predation_base=0.20, predation_coef=0.10, prey_flee_prob=0.40),
+    dict(group="S4_coef_0.16", width=25, height=25, n_cats=8, n_prey=80,
+         predation_base=0.20, predation_coef=0.16, prey_flee_prob=0.40),
+    dict(group="S4_coef_0.20", width=25, height=25, n_cats=8, n_prey=80,
+         predation_base=0.20, predation_coef=0.20, prey_flee_prob=0.40),
+    dict(group="S5_River", width=25, height=25, n_cats=8, n_prey=80,
+         predation_base=0.20, predation_coef=0.10, prey_flee_prob=0.40, river_exist=True),
+    dict(group="S5_NoRiver", width=25, height=25, n_cats=8, n_prey=80,
+         predation_base=0.20, predation_coef=0.10, prey_flee_prob=0.40, river_exist=False),
+]
+
+DEFAULT_TOLERANCES = dict(
+    alpha=0.01,          # family-wise, per scenario (Holm)
+    tte=0.10,            # of max_steps
+    extinction_rate=0.20,
+    pred_total=0.10,     # relative to the reference mean
+    final_count=0.10,    # of the initial population
+    trajectory=0.10,     # of n_prey
+)
+CHECKPOINTS = (0.25, 0.5, 0.75, 1.0)   # trajectory KS tests at these fractions of max_steps
+
+
+# ---- engines ----
+@dataclass
+class Engine:
+    """
+    A way to build a model for (scenario, seed). build must return an object with step(),
+    running, finalize() and datacollector.get_step_dataframe(); close() is called if present.
+    """
+    name: str
+    build: callable
+
+
+def _reference(scenario, seed):
+    return build_model(scenario, seed)
+
+
+def _with_kwargs(**extra):
+    return lambda scenario, seed: build_model({**scenario, **extra}, seed)
+
+
+def _tiled(scenario, seed, n_workers=2):
+    from .parallel import TiledFeralCatModel
+    params = {k: v for k, v in scenario.items() if k != "group"}
+    return TiledFeralCatModel(seed=seed, n_workers=n_workers, **params)
+
+
+ENGINES = {
+    "reference": Engine("reference", _reference),
+    "sync": Engine("sync", _with_kwargs(scheduler="sync")),
+    "tiled": Engine("tiled", _tiled),
+}
+
+
+def run_engine(engine: Engine, scenarios, seeds, max_steps: int = 200):
+    """Run every scenario x seed; returns (runs_df with a 'seconds' column, traces_df)."""
+    rows, traces = [], []
+    for sc in scenarios:
+        group = sc.get("group", "")
+        for seed in seeds:
+            t0 = time.perf_counter()
+            m = engine.build(sc, seed)
+            steps = 0
+            try:
+                while m.running and steps < max_steps:
+                    m.step()
+                    steps += 1
+                m.finalize()
+                df = m.datacollector.get_step_dataframe()
+            finally:
+                if hasattr(m, "close"):
+                    m.close()
+            seconds = time.perf_counter() - t0
+            df["group"], df["seed"] = group, seed
+            rows.append({**summarize_trace(df, group, seed, steps, max_steps), "seconds": seconds})
+            traces.append(df)
+    return pd.DataFrame(rows), pd.concat(traces, ignore_index=True)
+
+
+# ---- tests ----
+def _holm(pvals):
+    p = np.asarray(pvals, dtype=np.float64)
+    out = np.full_like(p, np.nan)
+    ok = ~np.isnan(p)
+    idx = np.flatnonzero(ok)[np.argsort(p[ok])]
+    m = len(idx)
+    running = 0.0
+    for rank, i in enumerate(idx):
+        running = max(running, min(1.0, (m - rank) * p[i]))
+        out[i] = running
+    return out
+
+
+def _mwu(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if np.all(a == a[0]) and np.all(b == a[0]):
+        return 1.0
+    return float(stats.mannwhitneyu(a, b, alternative="two-sided").pvalue)
+
+
+def _ks(a, b):
+    with warnings.catch_warnings():
+        # heavy ties (integer counts) make scipy fall back from the exact to the asymptotic p
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return float(stats.ks_2samp(a, b).pvalue)
+
+
+def _prey_matrix(traces, seeds, max_steps, n_prey):
+    """(n_seeds, max_steps + 1) prey counts, finished runs carried forward."""
+    wide = traces.pivot_table(index="step", columns="seed", values="Prey").reindex(range(max_steps + 1))
+    wide.iloc[0] = wide.iloc[0].fillna(n_prey)
+    return wide.ffill().reindex(columns=list(seeds)).to_numpy().T
+
+
+def compare_scenario(sc, ref_runs, ref_traces, alt_runs, alt_traces, seeds, max_steps, tol):
+    """Rows (metric, p_value, effect, tolerance) for one scenario, before the Holm correction."""
+    n_prey, n_cats = sc["n_prey"], sc["n_cats"]
+    rows = []
+
+    def add(metric, p, effect, limit, ref_value, alt_value):
+        rows.append(dict(metric=metric, p_value=p, effect=effect, tolerance=limit,
+                         reference=ref_value, alternative=alt_value))
+
+    a, b = ref_runs["tte"].to_numpy(), alt_runs["tte"].to_numpy()
+    add("tte_mwu", _mwu(a, b), abs(a.mean() - b.mean()) / max_steps, tol["tte"], a.mean(), b.mean())
+    add("tte_ks", _ks(a, b), abs(a.mean() - b.mean()) / max_steps, tol["tte"], a.mean(), b.mean())
+
+    ea, eb = ref_runs["extinct"].astype(int), alt_runs["extinct"].astype(int)
+    table = [[ea.sum(), len(ea) - ea.sum()], [eb.sum(), len(eb) - eb.sum()]]
+    add("extinction_rate", float(stats.fisher_exact(table).pvalue), abs(ea.mean() - eb.mean()),
+        tol["extinction_rate"], ea.mean(), eb.mean())
+
+    a, b = ref_runs["pred_events_total"].to_numpy(float), alt_runs["pred_events_total"].to_numpy(float)
+    rel = abs(a.mean() - b.mean()) / max(1.0, abs(a.mean()))
+    add("pred_total_mwu", _mwu(a, b), rel, tol["pred_total"], a.mean(), b.mean())
+    add("pred_total_ks", _ks(a, b), rel, tol["pred_total"], a.mean(), b.mean())
+
+    for col, n0 in (("final_prey", n_prey), ("final_cats", n_cats)):
+        a, b = ref_runs[col].to_numpy(float), alt_runs[col].to_numpy(float)
+        add(col, _mwu(a, b), abs(a.mean() - b.mean()) / max(1, n0), tol["final_count"], a.mean(), b.mean())
+
+    A = _prey_matrix(ref_traces, seeds, max_steps, n_prey)
+    B = _prey_matrix(alt_traces, seeds, max_steps, n_prey)
+    envelope = np.nanmax(np.abs(np.nanmean(A, axis=0) - np.nanmean(B, axis=0))) / n_prey
+    for frac in CHECKPOINTS:
+        s = max(1, int(round(frac * max_steps)))
+        add(f"prey_at_{s}", _ks(A[:, s], B[:, s]), envelope, tol["trajectory"],
+            np.nanmean(A[:, s]), np.nanmean(B[:, s]))
+    return rows
+
+
+@dataclass
+class EquivalenceReport:
+    reference: str
+    alternative: str
+    table: pd.DataFrame
+    timing: pd.DataFrame
+    tolerances: dict = field(default_factory=dict)
+
+    @property
+    def accepted(self) -> bool:
+        return not (self.table["status"] == "FAIL").any()
+
+    def summary(self):
+        """Per-scenario verdict (worst metric status) with mean run times and speedup."""
+        order = {"PASS": 0, "WARN": 1, "FAIL": 2}
+        worst = (self.table.assign(rank=self.table["status"].map(order))
+                 .groupby("group")["rank"].max().map({v: k for k, v in order.items()}))
+        out = self.timing.copy()
+        out["verdict"] = out["group"].map(worst)
+        return out
+
+    def speedup(self) -> float:
+        t = self.timing
+        return float(t["reference_s"].sum() / t["alternative_s"].sum())
+
+    def __str__(self):
+        lines = [f"{self.alternative} vs {self.reference}: "
+                 f"{'ACCEPTED' if self.accepted else 'REJECTED'}, overall speedup x{self.speedup():.2f}",
+                 self.summary().to_string(index=False)]
+        bad = self.table[self.table["status"] != "PASS"]
+        if len(bad):
+            lines += ["", "metrics not passing:", bad.to_string(index=False)]
+        return "\n".join(lines)
+
+
+def compare_engines(reference: Engine, alternative: Engine, scenarios=None, seeds=range(30),
+                    max_steps: int = 200, tolerances=None):
+    """Run both engines over scenarios x seeds and test their outcome distributions."""
+    scenarios = STANDARD_SCENARIOS if scenarios is None else scenarios
+    tol = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    seeds = list(seeds)
+    ref_runs, ref_traces = run_engine(reference, scenarios, seeds, max_steps)
+    alt_runs, alt_traces = run_engine(alternative, scenarios, seeds, max_steps)
+
+    parts, timing = [], []
+    for sc in scenarios:
+        g = sc.get("group", "")
+        rr, ar = ref_runs[ref_runs["group"] == g], alt_runs[alt_runs["group"] == g]
+        rows = pd.DataFrame(compare_scenario(sc, rr, ref_traces[ref_traces["group"] == g],
+                                             ar, alt_traces[alt_traces["group"] == g],
+                                             seeds, max_steps, tol))
+        rows.insert(0, "group", g)
+        rows["p_holm"] = _holm(rows["p_value"])
+        rejected = rows["p_holm"] < tol["alpha"]
+        outside = rows["effect"] > rows["tolerance"]
+        rows["status"] = np.where(outside, "FAIL", np.where(rejected, "WARN", "PASS"))
+        parts.append(rows)
+        timing.append(dict(group=g, reference_s=rr["seconds"].mean(), alternative_s=ar["seconds"].mean(),
+                           speedup=rr["seconds"].mean() / ar["seconds"].mean()))
+    return EquivalenceReport(reference.name, alternative.name, pd.concat(parts, ignore_index=True),
+                             pd.DataFrame(timing), tol)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare an alternative engine with FeralCatModel")
+    parser.add_argument("--engine", default="sync", choices=sorted(ENGINES), help="Engine to validate")
+    parser.add_argument("--reference", default="reference", choices=sorted(ENGINES))
+    parser.add_argument("--seeds", type=int, default=30, help="Seeds per scenario")
+    parser.add_argument("--max-steps", type=int, default=200)
+    parser.add_argument("--scenarios", nargs="*", help="Scenario groups to run (default: all)")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_TOLERANCES["alpha"])
+    parser.add_argument("--out", default=None, help="Optional CSV of the per-metric table")
+    args = parser.parse_args()
+
+    scenarios = STANDARD_SCENARIOS
+    if args.scenarios:
+        scenarios = [sc for sc in STANDARD_SCENARIOS if sc["group"] in args.scenarios]
+    report = compare_engines(ENGINES[args.reference], ENGINES[args.engine], scenarios,
+                             seeds=range(args.seeds), max_steps=args.max_steps,
+                             tolerances=dict(alpha=args.alpha))
+    pd.set_option("display.width", 200)
+    print(report)
+    if args.out:
+        report.table.to_csv(args.out, index=False)
+    sys.exit(0 if report.accepted else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Append-only predation event log.
+
+Every successful predation is written as one record (step, x, y, vegetation level, cat id,
+prey sex) into a preallocated NumPy record buffer. When the buffer fills it is either flushed
+to disk as a numbered .npy chunk (path given) or grown (in-memory log). Appending is a single
+record assignment, so the log can stay on during production sweeps.
+
+    m = FeralCatModel(..., predation_log=PredationLog(path="out/run1_kills"))
+    ... run ...
+    m.finalize()                              # flushes the tail of the buffer
+    ev = load_predation_log("out/run1_kills")  # or m.predation_log.to_array()
+    heat = kill_density(ev, (m.width, m.height), downsample=5)
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+
+PREDATION_DTYPE = np.dtype([
+    ("step", np.int32),
+    ("x", np.int32),
+    ("y", np.int32),
+    ("vegetation", np.int8),
+    ("cat_id", np.int64),
+    ("prey_sex", "S1"),
+])
+
+
+class PredationLog:
+    def __init__(self, path=None, chunk_size: int = 65536):
+        self.path = Path(path) if path is not None else None
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.buffer = np.empty(chunk_size, dtype=PREDATION_DTYPE)
+        self.n = 0              # records in the buffer
+        self.n_flushed = 0      # records already on disk
+        self.n_chunks = 0
+
+    def __len__(self):
+        return self.n_flushed + self.n
+
+    def append(self, step, x, y, vegetation, cat_id, prey_sex):
+        if self.n == len(self.buffer):
+            self._overflow()
+        self.buffer[self.n] = (step, x, y, vegetation, cat_id, prey_sex)
+        self.n += 1
+
+    def _overflow(self):
+        if self.path is not None:
+            self.flush()
+        else:
+            self.buffer = np.resize(self.buffer, 2 * len(self.buffer))
+
+    def flush(self):
+        """Write buffered records as the next chunk file (no-op for in-memory logs)."""
+        if self.path is None or self.n == 0:
+            return
+        np.save(self.path / f"chunk_{self.n_chunks:05d}.npy", self.buffer[:self.n])
+        self.n_chunks += 1
+        self.n_flushed += self.n
+        self.n = 0
+
+    def to_array(self):
+        """All events so far (disk chunks + buffer) as one record array."""
+        parts = [load_predation_log(self.path)] if self.path is not None and self.n_chunks else []
+        parts.append(self.buffer[:self.n])
+        return np.concatenate(parts) if len(parts) > 1 else parts[0].copy()
+
+
+def load_predation_log(path):
+    files = sorted(Path(path).glob("chunk_*.npy"))
+    if not files:
+        return np.empty(0, dtype=PREDATION_DTYPE)
+    return np.concatenate([np.load(f) for f in files])
+
+
+# ---- analysis ----
+def kill_density(events, shape, downsample: int = 1, steps=None):
+    """
+    Kill counts per cell (or per downsample x downsample block) as a 2D array in model
+    orientation [x, y]. steps: optional (first, last) step range to include.
+    """
+    ev = events
+    if steps is not None:
+        ev = ev[(ev["step"] >= steps[0]) & (ev["step"] <= steps[1])]
+    w, h = shape
+    bw, bh = -(-w // downsample), -(-h // downsample)
+    idx = (ev["x"] // downsample) * bh + (ev["y"] // downsample)
+    return np.bincount(idx, minlength=bw * bh).reshape(bw, bh)
+
+
+def kills_by_vegetation(events, vegetation=None, levels: int = 5):
+    """
+    Kills per vegetation level (as recorded at kill time). With the vegetation map, also the
+    kill rate per cell of each level (kills / number of cells at that level).
+    """
+    kills = np.bincount(events["vegetation"].astype(np.int64), minlength=levels)[:levels]
+    if vegetation is None:
+        return kills
+    cells = np.bincount(np.asarray(vegetation).ravel().astype(np.int64), minlength=levels)[:levels]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(cells > 0, kills / cells, np.nan)
+    return kills, rate
+
+
+def plot_kill_density(density, ax=None, vegetation=None, title="Kill density"):
+    """Heatmap of kill_density() output, optionally over a faded vegetation base map."""
+    import matplotlib.pyplot as plt
+    if ax is None:
+        _, ax = plt.subplots(figsize=(5, 5))
+    if vegetation is not None:
+        ax.imshow(np.asarray(vegetation).T, cmap="Greens", alpha=0.35, origin="upper",
+                  extent=(0, vegetation.shape[0], vegetation.shape[1], 0))
+        extent = (0, vegetation.shape[0], vegetation.shape[1], 0)
+    else:
+        extent = None
+    im = ax.imshow(np.ma.masked_equal(density, 0).T, cmap="Reds", origin="upper",
+                   extent=extent, alpha=0.85, interpolation="nearest")
+    ax.set_title(title)
+    ax.figure.colorbar(im, ax=ax, label="kills")
+    return ax
@@ -0,0 +1,318 @@
+"""
+SQLite-backed job queue for running (scenario, seed) sweeps of FeralCatModel on many
+processes / machines that share a filesystem.
+
+- The coordinator enqueues jobs (one per scenario x seed) into a single .sqlite file.
+- Any number of workers lease a job, run it, heartbeat while running, and commit the result.
+- A lease that is not renewed before it expires (worker killed, node lost) makes the job
+  available again; after max_attempts leases the job is marked failed.
+
+No server is needed: SQLite's file locking serialises leases, so a local file is enough to
+test everything on one box. On network filesystems keep the default rollback journal (WAL
+mode does not work across hosts).
+
+Coordinator:
+    q = JobQueue("sweep.sqlite")
+    q.enqueue_sweep(SCENARIOS, SEEDS, max_steps=200)
+    ...
+    runs_df, traces_df = q.results()
+
+Workers (any node):
+    python -m src.jobqueue worker --db sweep.sqlite
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+import pandas as pd
+
+from .batch import run_once
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    group_name    TEXT    NOT NULL,
+    scenario_key  TEXT    NOT NULL,                    -- scenario_key(scenario)
+    seed          INTEGER NOT NULL,
+    max_steps     INTEGER NOT NULL,
+    scenario      TEXT    NOT NULL,
+    status        TEXT    NOT NULL DEFAULT 'pending',  -- pending / leased / done / failed
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    worker        TEXT,
+    lease_expires REAL,
+    heartbeat     REAL,
+    created       REAL    NOT NULL,
+    finished      REAL,
+    result        TEXT,
+    error         TEXT,
+    UNIQUE (scenario_key, seed, max_steps)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+"""
+
+
+def scenario_key(scenario: dict) -> str:
+    """Dedup key of a scenario: hash of its canonical JSON (key order doesn't matter)."""
+    text = json.dumps(scenario, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _migrate(conn):
+    """Queue files from before scenario_key (unique on group, seed, max_steps): rebuild the table."""
+    cols = [r["name"] for r in conn.execute("PRAGMA table_info(jobs)")]
+    if not cols or "scenario_key" in cols:
+        return
+    conn.create_function("scenario_key", 1, lambda text: scenario_key(json.loads(text)))
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("ALTER TABLE jobs RENAME TO jobs_old")
+        conn.execute("DROP INDEX IF EXISTS jobs_status")
+        for stmt in _SCHEMA.split(";"):
+            if stmt.strip():
+                conn.execute(stmt)
+        names = ", ".join(cols)
+        conn.execute(f"INSERT INTO jobs ({names}, scenario_key) "
+                     f"SELECT {names}, scenario_key(scenario) FROM jobs_old")
+        conn.execute("DROP TABLE jobs_old")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+class JobQueue:
+    """
+    Thin wrapper over one SQLite file. Each instance holds its own connection, so create
+    one per process/thread (they are cheap).
+    """
+    def __init__(self, path, timeout: float = 30.0):
+        self.path = os.fspath(path)
+        self.conn = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        _migrate(self.conn)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ---- coordinator side ----
+    def enqueue(self, scenario: dict, seed: int, max_steps: int = 200, max_attempts: int = 3):
+        """
+        Add one run; enqueueing the same (scenario, seed, max_steps) twice is a no-op. Scenarios
+        are compared by content (scenario_key), so two scenarios sharing a group name are both kept.
+        """
+        cur = self.conn.execute(
+            "INSERT OR IGNORE INTO jobs (group_name, scenario_key, seed, max_steps, scenario, "
+            "max_attempts, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (scenario.get("group", ""), scenario_key(scenario), int(seed), int(max_steps),
+             json.dumps(scenario), int(max_attempts), time.time()),
+        )
+        return cur.lastrowid if cur.rowcount else None
+
+    def enqueue_sweep(self, scenarios, seeds, max_steps: int = 200, max_attempts: int = 3):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sc in scenarios:
+                for s in seeds:
+                    self.enqueue(sc, s, max_steps, max_attempts)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def counts(self):
+        rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        out = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        out.update({r["status"]: r["n"] for r in rows})
+        return out
+
+    def results(self):
+        """(runs_df, traces_df) for all finished jobs, same layout as batch.run_batch."""
+        run_rows, traces = [], []
+        for r in self.conn.execute("SELECT scenario, result FROM jobs WHERE status = 'done' ORDER BY id"):
+            sc, res = json.loads(r["scenario"]), json.loads(r["result"])
+            run_rows.append({**sc, **res["summary"]})
+            traces.append(pd.DataFrame(res["trace"]))
+        runs_df = pd.DataFrame(run_rows)
+        traces_df = pd.concat(traces, ignore_index=True) if traces else pd.DataFrame()
+        return runs_df, traces_df
+
+    def failures(self):
+        return pd.read_sql_query(
+            "SELECT id, group_name, seed, attempts, worker, error FROM jobs WHERE status = 'failed'",
+            self.conn)
+
+    # ---- worker side ----
+    def lease(self, worker_id: str, lease_seconds: float = 60.0):
+        """
+        Atomically take the oldest runnable job: pending, or leased with an expired lease.
+        Expired jobs that already used all attempts are marked failed instead.
+        Returns the job row as a dict, or None when nothing is runnable.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'failed', finished = ?, "
+                "error = COALESCE(error, 'lease expired after ' || attempts || ' attempts') "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now))
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_expires < ?) ORDER BY id LIMIT 1",
+                (now,)).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, attempts = attempts + 1, "
+                "lease_expires = ?, heartbeat = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"]))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        job = dict(row)
+        job["scenario"] = json.loads(job["scenario"])
+        job["attempts"] += 1
+        return job
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float = 60.0) -> bool:
+        """Extend the lease; False means the lease was lost (expired and taken by another worker)."""
+        now = time.time()
+        cur = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ?, heartbeat = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (now + lease_seconds, now, job_id, worker_id))
+        return cur.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: dict) -> bool:
+        cur = self.conn.execute(
+            "UPDATE jobs SET status = 'done', finished = ?, result = ?, error = NULL "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time(), json.dumps(result), job_id, worker_id))
+        return cur.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Give the job back (or mark it failed once it has used all attempts)."""
+        cur = self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+            "finished = CASE WHEN attempts >= max_attempts THEN ? ELSE NULL END, "
+            "worker = NULL, lease_expires = NULL, error = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time(), error, job_id, worker_id))
+        return cur.rowcount == 1
+
+
+class _Heartbeat(threading.Thread):
+    """Renews a lease in the background while the job runs (own connection, sqlite is per-thread)."""
+    def __init__(self, path, job_id, worker_id, lease_seconds, every):
+        super().__init__(daemon=True)
+        self.args = (path, job_id, worker_id, lease_seconds, every)
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self):
+        path, job_id, worker_id, lease_seconds, every = self.args
+        q = JobQueue(path)
+        try:
+            while not self.stopped.wait(every):
+                if not q.heartbeat(job_id, worker_id, lease_seconds):
+                    self.lost = True
+                    return
+        finally:
+            q.close()
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def run_job(job):
+    """Execute one leased job; the result is JSON-serialisable."""
+    summary, df = run_once(job["scenario"], job["seed"], job["max_steps"])
+    return {"summary": summary, "trace": df.to_dict(orient="list")}
+
+
+def run_worker(path, worker_id: str | None = None, lease_seconds: float = 60.0,
+               heartbeat_every: float = 10.0, poll: float = 2.0, exit_when_idle: bool = True,
+               max_jobs: int | None = None):
+    """
+    Worker loop: lease -> run (with heartbeat) -> commit, until the queue has nothing runnable
+    (exit_when_idle) or max_jobs jobs were processed. Returns the number of jobs completed.
+    """
+    worker_id = worker_id or default_worker_id()
+    q = JobQueue(path)
+    done = 0
+    try:
+        while max_jobs is None or done < max_jobs:
+            job = q.lease(worker_id, lease_seconds)
+            if job is None:
+                c = q.counts()
+                if exit_when_idle and c["pending"] == 0 and c["leased"] == 0:
+                    break
+                time.sleep(poll)  # leased jobs may still expire and come back
+                continue
+
+            hb = _Heartbeat(path, job["id"], worker_id, lease_seconds, heartbeat_every)
+            hb.start()
+            try:
+                result = run_job(job)
+            except Exception:
+                hb.stopped.set(); hb.join()
+                q.fail(job["id"], worker_id, traceback.format_exc())
+                continue
+            hb.stopped.set(); hb.join()
+
+            if hb.lost or not q.complete(job["id"], worker_id, result):
+                continue  # someone else owns the job now; drop our result
+            done += 1
+    finally:
+        q.close()
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feral Cats ABM job queue")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    w = sub.add_parser("worker", help="Lease and run jobs until the queue is drained")
+    w.add_argument("--db", required=True, help="Path to the queue .sqlite file")
+    w.add_argument("--lease", type=float, default=60.0, help="Lease length in seconds")
+    w.add_argument("--heartbeat", type=float, default=10.0, help="Heartbeat interval in seconds")
+    w.add_argument("--processes", type=int, default=1, help="Worker processes to start on this node")
+    w.add_argument("--keep-alive", action="store_true", help="Keep polling when the queue is empty")
+
+    s = sub.add_parser("status", help="Print job counts per status")
+    s.add_argument("--db", required=True)
+    args = parser.parse_args()
+
+    if args.cmd == "status":
+        print(JobQueue(args.db).counts())
+        return
+
+    kwargs = dict(lease_seconds=args.lease, heartbeat_every=args.heartbeat,
+                  exit_when_idle=not args.keep_alive)
+    if args.processes <= 1:
+        print("jobs done:", run_worker(args.db, **kwargs))
+        return
+    from multiprocessing import Process
+    procs = [Process(target=run_worker, args=(args.db,), kwargs=kwargs) for _ in range(args.processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()
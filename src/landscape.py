@@ -0,0 +1,210 @@
+"""
+Procedural landscapes: vegetation from multi-octave value noise and meandering river masks,
+all vectorised with NumPy and generated tile by tile, so extents far larger than memory can be
+written straight to the .npy map format (see src/maps.py) the model loads.
+
+Everything is a pure function of (seed, global cell coordinates): any tile can be generated
+on its own and tiles always line up, whatever the chunk size.
+
+Arrays follow the model convention: shape (width, height), indexed [x, y]; the river runs
+along y and meanders in x, like FeralCatModel's default river.
+
+    from src.landscape import generate_landscape
+    veg, river = generate_landscape(1000, 1000, seed=7, patch_size=40)
+    m = FeralCatModel(width=1000, height=1000, ..., vegetation=veg, river=river)
+
+    # very large extents: written chunk by chunk to data/maps/big/{vegetation,river}.npy
+    generate_landscape(20000, 20000, seed=7, out_dir="data/maps/big")
+
+CLI: python -m src.landscape --width 5000 --height 5000 --seed 7 --out data/maps/big5k
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+
+# same level frequencies as the model's uniform random vegetation (levels 0..4)
+DEFAULT_PROPORTIONS = (0.4, 0.2, 0.15, 0.15, 0.1)
+
+
+# ---- hashed value noise ----
+def _hash_unit(ix, iy, seed):
+    """Deterministic pseudo-random value in [0, 1) for integer lattice points (vectorised)."""
+    h = (ix.astype(np.uint32) * np.uint32(0x8DA6B343)
+         ^ iy.astype(np.uint32) * np.uint32(0xD8163841)
+         ^ np.uint32(seed & 0xFFFFFFFF) * np.uint32(0xCB1AB31F))
+    # integer finaliser (lowbias32)
+    h ^= h >> np.uint32(16)
+    h *= np.uint32(0x7FEB352D)
+    h ^= h >> np.uint32(15)
+    h *= np.uint32(0x846CA68B)
+    h ^= h >> np.uint32(16)
+    return h.astype(np.float64) / 4294967296.0
+
+
+def value_noise(xs, ys, scale: float, seed: int):
+    """
+    Smooth noise in [0, 1) on the grid xs x ys (1D integer coordinate arrays), with features
+    about `scale` cells across. Returns shape (len(xs), len(ys)).
+    """
+    fx = np.asarray(xs, dtype=np.float64) / scale
+    fy = np.asarray(ys, dtype=np.float64) / scale
+    ix, iy = np.floor(fx).astype(np.int64), np.floor(fy).astype(np.int64)
+    tx, ty = fx - ix, fy - iy
+    # smoothstep fade
+    tx = (tx * tx * (3 - 2 * tx))[:, None]
+    ty = (ty * ty * (3 - 2 * ty))[None, :]
+
+    # hash only the lattice points covering this tile, then interpolate separably (x, then y)
+    lx = np.arange(ix.min(), ix.max() + 2)
+    ly = np.arange(iy.min(), iy.max() + 2)
+    with np.errstate(over="ignore"):
+        lattice = _hash_unit(lx[:, None], ly[None, :], seed)
+    rx, ry = ix - lx[0], iy - ly[0]
+    along_x = lattice[rx] + (lattice[rx + 1] - lattice[rx]) * tx        # (len(xs), len(ly))
+    a, b = along_x[:, ry], along_x[:, ry + 1]
+    return a + (b - a) * ty
+
+
+def fbm(xs, ys, patch_size: float = 16.0, octaves: int = 4, persistence: float = 0.5,
+        lacunarity: float = 2.0, seed: int = 0):
+    """
+    Fractal (multi-octave) value noise normalised to [0, 1].
+    patch_size: size of the largest patches in cells; persistence: weight of finer octaves
+    (higher = rougher, more broken-up patches).
+    """
+    total = np.zeros((len(xs), len(ys)))
+    amp, scale, norm = 1.0, float(patch_size), 0.0
+    for o in range(octaves):
+        total += amp * value_noise(xs, ys, max(scale, 1.0), seed + 1013 * o)
+        norm += amp
+        amp *= persistence
+        scale /= lacunarity
+    return total / norm
+
+
+def _fbm_1d(ts, scale, octaves, seed):
+    """fbm along one axis, centred on 0 (range about [-0.5, 0.5])."""
+    return fbm(np.asarray(ts), np.zeros(1, dtype=np.int64), scale, octaves, 0.5, 2.0, seed)[:, 0] - 0.5
+
+
+# ---- vegetation ----
+def vegetation_thresholds(width, height, proportions=DEFAULT_PROPORTIONS, sample: int = 256, **noise):
+    """
+    Noise cut points giving the requested share of each vegetation level. Estimated once on a
+    sparse lattice spread over the whole extent, so every tile is quantised the same way.
+    """
+    xs = np.linspace(0, width - 1, min(width, sample)).astype(np.int64)
+    ys = np.linspace(0, height - 1, min(height, sample)).astype(np.int64)
+    field = fbm(xs, ys, **noise)
+    cum = np.cumsum(proportions)[:-1] / np.sum(proportions)
+    return np.quantile(field, cum)
+
+
+def vegetation_tile(x0, x1, y0, y1, thresholds, **noise):
+    field = fbm(np.arange(x0, x1), np.arange(y0, y1), **noise)
+    return np.searchsorted(thresholds, field, side="right").astype(np.int16)
+
+
+# ---- river ----
+def river_tile(x0, x1, y0, y1, width, height, thickness: int = 2, amplitude: float | None = None,
+               wavelength: float | None = None, meander: float = 0.0, gaps=None, seed: int = 0):
+    """
+    River mask for the tile [x0, x1) x [y0, y1): the centre line follows
+        cx + amplitude * sin(2*pi*y / wavelength) + meander * noise(y)
+    and cells closer than thickness/2 to it are water. gaps: list of (y_start, y_end) ranges
+    left dry (crossings). None -> one gap like the model's default (at height/3).
+    """
+    if amplitude is None:
+        amplitude = max(2.0, width / 50)
+    if wavelength is None:
+        wavelength = max(1, height)
+    if gaps is None:
+        gap_len = max(3, height // 6)
+        g0 = max(0, height // 3 - gap_len // 2)
+        gaps = [(g0, min(height, g0 + gap_len))]
+
+    ys = np.arange(y0, y1)
+    centre = width // 2 + amplitude * np.sin(2 * np.pi * ys / wavelength)
+    if meander:
+        centre = centre + meander * 2 * _fbm_1d(ys, max(8.0, wavelength / 4), 3, seed + 7)
+    left = np.floor(centre - thickness / 2).astype(np.int64)
+    xs = np.arange(x0, x1)[:, None]
+    mask = (xs >= left[None, :]) & (xs < left[None, :] + thickness)
+    for g0, g1 in gaps:
+        mask[:, max(g0, y0) - y0:max(min(g1, y1) - y0, 0)] = False
+    return mask
+
+
+# ---- whole landscapes ----
+def iter_tiles(width, height, chunk: int = 1024):
+    for x0 in range(0, width, chunk):
+        for y0 in range(0, height, chunk):
+            yield x0, min(width, x0 + chunk), y0, min(height, y0 + chunk)
+
+
+def generate_landscape(width: int, height: int, seed: int = 0, patch_size: float = 16.0,
+                       octaves: int = 4, persistence: float = 0.5, proportions=DEFAULT_PROPORTIONS,
+                       river: bool = True, river_thickness: int = 2, river_amplitude: float | None = None,
+                       river_wavelength: float | None = None, river_meander: float = 0.0,
+                       river_gaps=None, chunk: int = 1024, out_dir=None):
+    """
+    Build a (width, height) vegetation map (int16, 0..4) and river mask (bool).
+    Tiles of chunk x chunk cells are generated one at a time; with out_dir the result is written
+    straight into out_dir/vegetation.npy and out_dir/river.npy (memory-mapped, so only one tile
+    is in memory) and the memmaps are returned.
+    """
+    noise = dict(patch_size=patch_size, octaves=octaves, persistence=persistence, seed=seed)
+    thresholds = vegetation_thresholds(width, height, proportions, **noise)
+    river_kw = dict(thickness=river_thickness, amplitude=river_amplitude, wavelength=river_wavelength,
+                    meander=river_meander, gaps=river_gaps, seed=seed)
+
+    if out_dir is not None:
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        veg = np.lib.format.open_memmap(out_dir / "vegetation.npy", mode="w+", dtype=np.int16,
+                                        shape=(width, height))
+        riv = np.lib.format.open_memmap(out_dir / "river.npy", mode="w+", dtype=np.bool_,
+                                        shape=(width, height))
+    else:
+        veg = np.empty((width, height), dtype=np.int16)
+        riv = np.zeros((width, height), dtype=bool)
+
+    for x0, x1, y0, y1 in iter_tiles(width, height, chunk):
+        veg[x0:x1, y0:y1] = vegetation_tile(x0, x1, y0, y1, thresholds, **noise)
+        if river:
+            riv[x0:x1, y0:y1] = river_tile(x0, x1, y0, y1, width, height, **river_kw)
+
+    if out_dir is not None:
+        veg.flush()
+        riv.flush()
+    return veg, riv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a procedural landscape (.npy maps)")
+    parser.add_argument("--width", type=int, default=1000, help="Grid width")
+    parser.add_argument("--height", type=int, default=1000, help="Grid height")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--patch-size", type=float, default=16.0, help="Largest vegetation patch size (cells)")
+    parser.add_argument("--octaves", type=int, default=4, help="Noise octaves")
+    parser.add_argument("--persistence", type=float, default=0.5, help="Roughness of finer octaves (0-1)")
+    parser.add_argument("--no-river", action="store_true", help="Do not draw a river")
+    parser.add_argument("--river-thickness", type=int, default=2)
+    parser.add_argument("--river-meander", type=float, default=0.0, help="Random meander amplitude (cells)")
+    parser.add_argument("--chunk", type=int, default=1024, help="Tile size used while generating")
+    parser.add_argument("--out", required=True, help="Output directory for vegetation.npy / river.npy")
+    args = parser.parse_args()
+
+    veg, riv = generate_landscape(
+        args.width, args.height, seed=args.seed, patch_size=args.patch_size, octaves=args.octaves,
+        persistence=args.persistence, river=not args.no_river, river_thickness=args.river_thickness,
+        river_meander=args.river_meander, chunk=args.chunk, out_dir=args.out)
+    print("vegetation:", veg.shape, "levels:", np.bincount(np.asarray(veg).ravel(), minlength=5))
+    print("river cells:", int(np.count_nonzero(riv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Map loading: vegetation (int16, 0..max_val) and river masks (bool) from CSV / JSON / PNG / NPY.
+
+Text and image maps are parsed once, converted to the binary .npy form and cached on disk:
+- a small ".ref" file keyed by (absolute path, mtime, size, conversion) remembers the content
+  hash of the source file, so unchanged files are found without reading them again;
+- the converted array is stored under the content hash, so a copied or touched file with the
+  same bytes reuses the existing conversion.
+Arrays are also memoised in-process, so repeated runs (e.g. every Start in the GUI) reuse
+the same read-only array. .npy files are the native format and are loaded directly.
+
+Vegetation values are rounded to the nearest integer for CSV and PNG maps and truncated
+towards zero for JSON maps (2.7 -> 2), as the GUI's loaders always did.
+
+Cache location: $FERALCATS_MAP_CACHE, default ~/.cache/feralcats/maps
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+_memo = {}  # (abspath, mtime_ns, size, kind, params) -> read-only array
+
+
+def cache_dir() -> Path:
+    d = Path(os.environ.get("FERALCATS_MAP_CACHE", Path.home() / ".cache" / "feralcats" / "maps"))
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def clear_memo():
+    _memo.clear()
+
+
+# ---- parsers ----
+def read_csv_grid(path) -> np.ndarray:
+    """Numeric CSV (no header) -> float32 2D array, empty/NaN cells as 0. Uses pandas' C reader."""
+    import pandas as pd
+    arr = pd.read_csv(path, header=None, dtype=np.float32, engine="c").to_numpy()
+    return np.nan_to_num(arr, nan=0.0, copy=False)
+
+
+def read_json_grid(path) -> np.ndarray:
+    """JSON 2D list -> float64 array, parsed in bulk without building Python lists when possible."""
+    text = Path(path).read_text(encoding="utf-8")
+    n_rows = text.count("[") - 1
+    flat = np.fromstring(text.replace("[", " ").replace("]", " "), dtype=np.float64, sep=",") \
+        if n_rows > 0 else np.empty(0)
+    if n_rows > 0 and flat.size and flat.size % n_rows == 0 and _rows_have(text, flat.size // n_rows):
+        return flat.reshape(n_rows, -1)
+    # ragged / nested differently: fall back to the generic path
+    return np.array(json.loads(text), dtype=np.float64)
+
+
+def _rows_have(text, n_cols) -> bool:
+    """True when every inner [...] of a 2D JSON list holds exactly n_cols values."""
+    for row in text.split("[")[2:]:
+        end = row.find("]")
+        if end < 0 or row.count(",", 0, end) != n_cols - 1:
+            return False
+    return True
+
+
+def read_png_gray(path) -> np.ndarray:
+    from PIL import Image  # pip install pillow
+    return np.array(Image.open(path).convert("L"), dtype=np.uint8)
+
+
+def _parse(path, kind, max_val, threshold):
+    ext = Path(path).suffix.lower()
+    if kind == "vegetation":
+        if ext == ".png":
+            a = read_png_gray(path).astype(np.float32) / 255.0 * max_val
+        elif ext == ".json":
+            a = read_json_grid(path)
+        elif ext == ".csv":
+            a = read_csv_grid(path)
+        else:
+            raise ValueError(f"unsupported vegetation map format: {ext}")
+        # JSON maps have always been truncated (np.array(data, dtype=np.int16)), the others rounded
+        v = (np.trunc(a) if ext == ".json" else np.rint(a)).astype(np.int16)
+        np.clip(v, 0, max_val, out=v)
+        return v
+
+    if kind == "river":
+        if ext == ".png":
+            return read_png_gray(path) >= threshold
+        elif ext == ".csv":
+            return read_csv_grid(path) > 0.5
+        elif ext == ".json":
+            return read_json_grid(path) > 0.5
+        raise ValueError(f"unsupported river mask format: {ext}")
+
+    raise ValueError(f"unknown map kind: {kind}")
+
+
+# ---- cache ----
+def _file_hash(path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 22), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _atomic_save(path: Path, arr):
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
+def load_map(path, kind: str = "vegetation", max_val: int = 4, threshold: int = 128,
+             use_cache: bool = True) -> np.ndarray:
+    """
+    Load a vegetation map or river mask. Returns a read-only array; copy it if you need to edit it
+    (FeralCatModel makes its own working copy of vegetation).
+    """
+    path = os.path.abspath(path)
+    if Path(path).suffix.lower() == ".npy":
+        arr = np.load(path)
+        arr = arr.astype(bool) if kind == "river" else np.clip(arr, 0, max_val).astype(np.int16, copy=False)
+        arr.flags.writeable = False
+        return arr
+
+    st = os.stat(path)
+    params = f"{kind}:{max_val}" if kind == "vegetation" else f"{kind}:{threshold}"
+    if kind == "vegetation" and Path(path).suffix.lower() == ".json":
+        params += ":trunc"   # don't reuse conversions cached while JSON was rounded
+    memo_key = (path, st.st_mtime_ns, st.st_size, params)
+    if use_cache and memo_key in _memo:
+        return _memo[memo_key]
+    if not use_cache:
+        arr = _parse(path, kind, max_val, threshold)
+        arr.flags.writeable = False
+        return arr
+
+    cdir = cache_dir()
+    ref = cdir / (hashlib.blake2b("|".join(map(str, memo_key)).encode(), digest_size=16).hexdigest() + ".ref")
+    content = ref.read_text().strip() if ref.exists() else None
+    if content is None:
+        content = _file_hash(path)
+    npy = cdir / f"{content}-{params.replace(':', '_')}.npy"
+
+    arr = None
+    if npy.exists():
+        try:
+            arr = np.load(npy)
+        except (OSError, ValueError):
+            arr = None  # truncated / corrupt entry: rebuild
+    if arr is None:
+        arr = _parse(path, kind, max_val, threshold)
+        _atomic_save(npy, arr)
+    if not ref.exists():
+        ref.write_text(content)
+
+    arr.flags.writeable = False
+    for k in [k for k in _memo if k[0] == path and k[3] == params]:
+        del _memo[k]   # an earlier version of the file
+    _memo[memo_key] = arr
+    return arr
+
+
+def load_vegetation(path, max_val: int = 4, use_cache: bool = True) -> np.ndarray:
+    return load_map(path, "vegetation", max_val=max_val, use_cache=use_cache)
+
+
+def load_river(path, threshold: int = 128, use_cache: bool = True) -> np.ndarray:
+    return load_map(path, "river", threshold=threshold, use_cache=use_cache)
+
+
+def load_maps(vegetation_path=None, river_path=None, use_cache: bool = True):
+    """Load a vegetation map and/or river mask and check they have the same shape."""
+    V = load_vegetation(vegetation_path, use_cache=use_cache) if vegetation_path else None
+    R = load_river(river_path, use_cache=use_cache) if river_path else None
+    if V is not None and R is not None and V.shape != R.shape:
+        raise ValueError(f"River {R.shape} != Vegetation {V.shape}")
+    return V, R
+
+
+def save_map(path, arr):
+    """Write a map in the binary format load_map reads natively (.npy)."""
+    path = Path(path)
+    if path.suffix.lower() != ".npy":
+        path = path.with_suffix(".npy")
+    np.save(path, np.asarray(arr))
+    return path
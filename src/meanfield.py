@@ -0,0 +1,298 @@
+"""
+Mean-field approximation of FeralCatModel for cheap parameter pre-screening.
+
+The agent model is reduced to a few numbers per parameter point (prey count, cat energy /
+hunger-counter distribution, share of cells at each vegetation level) that follow the same
+per-step rules as agents.py, in expectation:
+
+- cats move `energy` times per step; each move lands on a cell holding prey with probability
+  1 - exp(-encounter_bias * prey density) (encounter_bias > 1 stands in for trail following;
+  the default 1.5 is fit_encounter_bias() on the notebook scenarios),
+  and the attack succeeds with probability predation_base + predation_coef * vegetation;
+- a kill restores one energy (max 3) and resets the hunger counter; every 15 steps without a
+  kill costs one energy; cats at 0 energy die;
+- prey inside cat scent (5x5 square around each cat) flee with prey_flee_prob: they stay put,
+  graze their cell by 1 and skip reproduction; the others move towards vegetation (weight
+  1 + level), graze the cell they enter by 2 (never below 1) and may reproduce there if the
+  grazed vegetation is still above 2, a male is nearby and 30 steps have passed;
+- vegetation cells above 0 regrow by 1 with probability 0.5 per step (max 4).
+- prey that were eaten are removed from the model but stay on the grid (Agent.remove() does
+  not touch the MultiGrid), so cats keep finding and re-"eating" them; `ghosts=True` (default)
+  tracks them, since they feed the cats and shield live prey in shared cells.
+
+With the default rules grazing always leaves a cell at 2 or less, so no prey are ever born;
+the birth term is kept so the approximation follows if those constants change.
+
+Everything is vectorised over parameter points, so a sweep of thousands of points x 200 steps
+takes well under a second:
+
+    from src.meanfield import simulate, screen, calibrate
+    out = simulate(predation_base=np.linspace(0, .5, 1000), predation_coef=0.1, prey_flee_prob=0.4)
+    table = screen(points_df)                   # predicted extinction / persistence per point
+    check = calibrate(SCENARIOS, SEEDS)         # mean field vs ABM on a few scenarios
+
+CLI: python -m src.meanfield --points 5000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from .model import make_default_river
+
+
+VEG_LEVELS = 5
+VEG_PROPORTIONS = (0.4, 0.2, 0.15, 0.15, 0.1)   # FeralCatModel's random vegetation
+MAX_ENERGY = 3
+HUNGER_STEPS = 15        # steps without a kill before losing one energy
+REPRO_COOLDOWN = 30
+GRAZE_MOVE = 2           # vegetation eaten by a prey entering a cell
+GRAZE_FLEE = 1           # ... and by a prey that freezes in place
+REPRO_MIN_VEG = 2        # reproduction needs vegetation strictly above this (after grazing)
+SCENT_CELLS = 25         # (2 * radius + 1) ** 2, radius 2
+EXTINCT_BELOW = 1.0      # fewer than one prey left in expectation = extinct
+
+_free_cells_cache = {}
+
+
+def free_cells(width: int, height: int, river_exist: bool = True) -> int:
+    """Number of non-river cells of the default map."""
+    key = (int(width), int(height), bool(river_exist))
+    if key not in _free_cells_cache:
+        n = key[0] * key[1]
+        if river_exist:
+            n -= int(make_default_river(key[0], key[1]).sum())
+        _free_cells_cache[key] = n
+    return _free_cells_cache[key]
+
+
+def _grazed(levels, amount):
+    """Vegetation level after grazing `amount` (levels above 0 never drop below 1)."""
+    return np.where(levels > 0, np.maximum(1, levels - amount), 0)
+
+
+def _graze_shift(f, p, amount):
+    """Move a share p[:, v] of the cells at every level v to its grazed level."""
+    out = f * (1 - p)
+    moved = f * p
+    to = _grazed(np.arange(VEG_LEVELS), amount)
+    for v in range(VEG_LEVELS):
+        out[:, to[v]] += moved[:, v]
+    return out
+
+
+def simulate(predation_base, predation_coef, prey_flee_prob, width=25, height=25, n_cats=8,
+             n_prey=80, steps: int = 200, river_exist=True, veg_proportions=VEG_PROPORTIONS,
+             encounter_bias: float = 1.5, ghosts: bool = True, prey_female_ratio: float = 0.5):
+    """
+    Run the mean-field model for every parameter point (all arguments broadcast together).
+    Returns a dict of (steps + 1, N) trajectories "prey", "cats", "events" (predation events
+    per step, incl. re-kills), "ghosts", and per-point arrays "extinct", "tte", "final_prey",
+    "final_cats", "pred_events_total" (tte = steps when prey never go extinct, as in batch).
+    """
+    base, coef, flee, W, H, C0, P0, river, bias = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=np.float64)) for a in
+          (predation_base, predation_coef, prey_flee_prob, width, height, n_cats, n_prey,
+           river_exist, encounter_bias)))
+    N = base.size
+    A = np.array([free_cells(w, h, r) for w, h, r in zip(W, H, river)], dtype=np.float64)
+
+    levels = np.arange(VEG_LEVELS)
+    f = np.tile(np.asarray(veg_proportions, dtype=np.float64) / np.sum(veg_proportions), (N, 1))
+    # attack success by level, untouched and just grazed (cat arrives before / after the prey)
+    p_raw = np.clip(base[:, None] + coef[:, None] * levels[None, :], 0, 1)
+    p_grazed = np.clip(base[:, None] + coef[:, None] * _grazed(levels, GRAZE_MOVE)[None, :], 0, 1)
+    repro_ok = (_grazed(levels, GRAZE_MOVE) > REPRO_MIN_VEG).astype(np.float64)
+
+    # cats: mass over (energy 0..3, hunger counter 0..14)
+    cats = np.zeros((N, MAX_ENERGY + 1, HUNGER_STEPS))
+    cats[:, MAX_ENERGY, 0] = C0
+    P = P0.copy()
+    G = np.zeros(N)
+    cooldown = np.zeros(N)   # share of females still in their reproduction cooldown
+
+    out = {k: np.zeros((steps + 1, N)) for k in ("prey", "cats", "events", "ghosts")}
+    out["prey"][0], out["cats"][0] = P, C0
+    alive = P >= EXTINCT_BELOW
+    tte = np.full(N, steps, dtype=np.int64)
+
+    for t in range(1, steps + 1):
+        C = cats.sum(axis=(1, 2))
+        # prey: who senses scent and freezes, where the rest move (weight 1 + vegetation)
+        fleeing = (1 - np.exp(-SCENT_CELLS * C / A)) * flee
+        movers = (1 - fleeing) * P
+        w = f * (1 + levels)
+        w /= w.sum(axis=1, keepdims=True)
+
+        # cats: per-move chance to find prey (live or left on the grid) and kill one
+        total = P + G if ghosts else P
+        p_find = 1 - np.exp(-bias * total / A)
+        h = np.clip(p_find * (w * 0.5 * (p_raw + p_grazed)).sum(axis=1), 0, 1)
+        live_share = np.divide(P, total, out=np.zeros(N), where=total > 0)
+
+        new = np.zeros_like(cats)
+        events = np.zeros(N)
+        for e in range(1, MAX_ENERGY + 1):
+            mass = cats[:, e, :]
+            miss = (1 - h) ** e
+            events += mass.sum(axis=1) * e * h
+            # at least one kill: +k energy (capped), counter reset to 0 then +1
+            for k in range(1, e + 1):
+                pk = _binom(e, k, h)
+                new[:, min(e + k, MAX_ENERGY), 1] += mass.sum(axis=1) * pk
+            # no kill: counter + 1, every HUNGER_STEPS costs one energy
+            new[:, e, 1:] += mass[:, :-1] * miss[:, None]
+            new[:, e - 1, 0] += mass[:, -1] * miss
+        new[:, 0, :] = 0    # starved cats are removed
+        cats = np.where(alive[:, None, None], new, cats)   # finished runs stay frozen
+
+        kills = np.minimum(events * live_share, P)
+        # births: moving females on cells still above REPRO_MIN_VEG, male nearby, out of cooldown
+        males = (1 - prey_female_ratio) * P
+        male_near = 1 - np.exp(-8 * males / A)
+        ready = np.clip((t >= REPRO_COOLDOWN) * (1 - cooldown), 0, 1)
+        breeding = prey_female_ratio * movers * (w * repro_ok).sum(axis=1) * male_near * ready
+        births = breeding * 1.0   # randint(0, 2) -> one offspring on average
+        cooldown = np.clip(cooldown + np.divide(breeding, prey_female_ratio * P, out=np.zeros(N), where=P > 0)
+                           - 1.0 / REPRO_COOLDOWN, 0, 1)
+
+        P = np.where(alive, P - kills + births, P)
+        if ghosts:
+            G = np.where(alive, G + kills, G)
+
+        # vegetation: grazing by moving / freezing prey, then regrowth of levels 1..3
+        with np.errstate(divide="ignore", invalid="ignore"):
+            load = np.where(f > 0, w / f, 0) / A[:, None]
+        f = _graze_shift(f, 1 - np.exp(-movers[:, None] * load), GRAZE_MOVE)
+        f = _graze_shift(f, 1 - np.exp(-(fleeing * P)[:, None] * load), GRAZE_FLEE)
+        grow = 0.5 * f[:, 1:4]
+        f[:, 1:4] -= grow
+        f[:, 2:5] += grow
+
+        died = alive & (P < EXTINCT_BELOW)
+        tte[died] = t
+        alive &= ~died
+        out["prey"][t], out["cats"][t], out["ghosts"][t] = P, cats.sum(axis=(1, 2)), G
+        out["events"][t] = np.where(alive | died, events, 0)
+        if not alive.any():
+            for k in ("prey", "cats", "ghosts"):
+                out[k][t + 1:] = out[k][t]
+            break
+
+    extinct = tte < steps
+    extinct |= out["prey"][-1] < EXTINCT_BELOW
+    out.update(extinct=extinct, tte=tte, final_prey=out["prey"][-1], final_cats=out["cats"][-1],
+               pred_events_total=out["events"].sum(axis=0))
+    return out
+
+
+def _binom(n, k, p):
+    from math import comb
+    return comb(n, k) * p ** k * (1 - p) ** (n - k)
+
+
+# ---- screening ----
+_POINT_KEYS = ("predation_base", "predation_coef", "prey_flee_prob", "width", "height",
+               "n_cats", "n_prey", "river_exist")
+
+
+def screen(points, steps: int = 200, margin: float = 0.15, **kw):
+    """
+    Classify parameter points (a DataFrame or list of scenario dicts) before running the ABM.
+    label: "extinct" if prey die out before (1 - margin) * steps, "persist" if more than
+    margin * n_prey survive to the end, else "uncertain" (worth an ABM run).
+    Returns the points with mf_tte, mf_final_prey, mf_final_cats and label columns added.
+    """
+    df = pd.DataFrame(points).reset_index(drop=True)
+    args = {k: df[k].to_numpy() for k in _POINT_KEYS if k in df.columns}
+    if "river_exist" in args:
+        args["river_exist"] = pd.Series(args["river_exist"]).fillna(True).to_numpy(dtype=bool)
+    res = simulate(steps=steps, **args, **kw)
+    n_prey = df["n_prey"].to_numpy() if "n_prey" in df.columns else 80
+    df["mf_tte"] = res["tte"]
+    df["mf_final_prey"] = res["final_prey"]
+    df["mf_final_cats"] = res["final_cats"]
+    label = np.full(len(df), "uncertain", dtype=object)
+    label[res["extinct"] & (res["tte"] < (1 - margin) * steps)] = "extinct"
+    label[~res["extinct"] & (res["final_prey"] > margin * n_prey)] = "persist"
+    df["label"] = label
+    return df
+
+
+def parameter_grid(predation_base, predation_coef, prey_flee_prob, **fixed):
+    """All combinations of the three predation parameters as a DataFrame (fixed: other columns)."""
+    b, c, f = np.meshgrid(predation_base, predation_coef, prey_flee_prob, indexing="ij")
+    df = pd.DataFrame(dict(predation_base=b.ravel(), predation_coef=c.ravel(), prey_flee_prob=f.ravel()))
+    for k, v in fixed.items():
+        df[k] = v
+    return df
+
+
+# ---- calibration against the ABM ----
+def calibrate(scenarios, seeds, max_steps: int = 200, processes: int | None = 1, traces=None, **kw):
+    """
+    Compare the mean field with the ABM ensemble mean for each scenario.
+    traces: optional traces_df from batch.run_batch (otherwise the ABM runs are done here).
+    Returns one row per scenario: ABM vs mean-field final prey / cats, extinction rate vs
+    predicted extinction, and prey_rmse (trajectory RMSE relative to n_prey).
+    """
+    if traces is None:
+        from .batch import run_batch
+        _, traces = run_batch(scenarios, seeds, max_steps, processes=processes)
+
+    rows = []
+    for sc in scenarios:
+        g = sc.get("group", "")
+        mf = simulate(steps=max_steps, **{k: sc[k] for k in _POINT_KEYS if k in sc}, **kw)
+        tr = traces[traces["group"] == g]
+        # carry finished runs forward (extinct prey stay extinct) and average over seeds
+        wide = tr.pivot_table(index="step", columns="seed", values="Prey").reindex(range(max_steps + 1))
+        wide.iloc[0] = wide.iloc[0].fillna(sc["n_prey"])
+        abm_prey = wide.ffill().mean(axis=1).to_numpy()
+        finals = tr.groupby("seed").last()
+        rows.append(dict(
+            group=g,
+            abm_final_prey=finals["Prey"].mean(), mf_final_prey=float(mf["final_prey"][0]),
+            abm_final_cats=finals["Cats"].mean(), mf_final_cats=float(mf["final_cats"][0]),
+            abm_extinction_rate=float((finals["Prey"] <= 0).mean()), mf_extinct=bool(mf["extinct"][0]),
+            prey_rmse=float(np.sqrt(np.nanmean((abm_prey - mf["prey"][:, 0]) ** 2)) / sc["n_prey"]),
+        ))
+    return pd.DataFrame(rows)
+
+
+def fit_encounter_bias(scenarios, traces, max_steps: int = 200, grid=np.linspace(0.5, 6, 45)):
+    """Encounter bias minimising the mean prey_rmse over the scenarios (simple grid search)."""
+    errs = [calibrate(scenarios, None, max_steps, traces=traces, encounter_bias=b)["prey_rmse"].mean()
+            for b in grid]
+    i = int(np.argmin(errs))
+    return float(grid[i]), float(errs[i])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mean-field pre-screen of predation parameters")
+    parser.add_argument("--points", type=int, default=2000, help="Approximate number of parameter points")
+    parser.add_argument("--steps", type=int, default=200, help="Steps per point")
+    parser.add_argument("--width", type=int, default=25)
+    parser.add_argument("--height", type=int, default=25)
+    parser.add_argument("--n-cats", type=int, default=8)
+    parser.add_argument("--n-prey", type=int, default=80)
+    parser.add_argument("--encounter-bias", type=float, default=1.5)
+    parser.add_argument("--out", default=None, help="Optional CSV of the screened points")
+    args = parser.parse_args()
+
+    k = max(2, round(args.points ** (1 / 3)))
+    pts = parameter_grid(np.linspace(0, 0.6, k), np.linspace(0, 0.3, k), np.linspace(0, 1, k),
+                         width=args.width, height=args.height, n_cats=args.n_cats, n_prey=args.n_prey)
+    t0 = time.perf_counter()
+    df = screen(pts, steps=args.steps, encounter_bias=args.encounter_bias)
+    dt = time.perf_counter() - t0
+    print(f"{len(df)} points x {args.steps} steps in {dt:.2f}s ({len(df) / dt:.0f} points/s)")
+    print(df["label"].value_counts().to_string())
+    if args.out:
+        df.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
-from mesa import Model
+import itertools
+
+from mesa import Agent, Model
 from mesa.space import MultiGrid
-from mesa.datacollection import DataCollector
 from .agents import Cat, Prey
+from .collection import StepDataCollector, make_policy
+from .sync import sync_step
+from .shared_maps import resolve
+from .scent import make_scent
+from .superprey import make_super_prey
+from . import streams as st
 import numpy as np
 
 
@@ -10,7 +17,25 @@ class FeralCatModel(Model):
     Minimum runable ABM
     MultiGrid & RandomActivation
     Rule: both cat and prey randomly move; if in same cell, try to hunt once with given probability
-    Optional parameters: river_exist (bool)
+    Optional parameters: river_exist (bool),
+                         step_hooks (list of callables, each called as hook(model) after every step),
+                         prey_density / cat_density (array or "vegetation": initial placement weights),
+                         placement ("bulk" default, "rejection" = old per-agent retry loop; placement
+                                    only - seeded runs still differ from older versions),
+                         collect (collection policy: N, "change", "final", predicate; see collection.py),
+                         predation_log (True or an events.PredationLog: record every kill),
+                         occupancy (True, a downsample factor or an OccupancyAccumulator: habitat-use maps),
+                         scheduler ("random" default = random sequential activation, "sync" = all agents
+                                    decide on a frozen snapshot, then commit together; see sync.py),
+                         trajectory (True, a directory or a trajectory.TrajectoryRecorder: per-agent
+                                     positions and states every step, delta-encoded),
+                         scent_mode ("radius" default = binary radius-2 mask, "field" / "fft" or a
+                                     scent.ScentField = deposited scent that diffuses and decays),
+                         super_prey (True, a density or a superprey.SuperPrey: same-sex prey on a
+                                     dense cell merge into one agent standing for many),
+                         streams (True: every decision draws from its own keyed random stream, so
+                                  runs with the same seed stay paired across parameter values;
+                                  see streams.py)
     """
     def __init__(
         self,
@@ -27,64 +52,234 @@ class FeralCatModel(Model):
         **kwargs
     ):
         super().__init__(seed=seed)
-
-        # vegetation is a 2D array of int (0-4), same size as map
-        if vegetation is not None:
-            V = np.array(vegetation, dtype=np.int16)
-            assert V.ndim == 2, "vegetation should be a 2D array"
-            np.clip(V, 0, 4, out=V)
-            self.width, self.height = V.shape
-        else:
-            self.width, self.height = width, height
-
-        # use size determined above
-        self.grid = MultiGrid(self.width, self.height, torus=False)
+        # per-purpose keyed random streams (None = everything from model.random / model.rng)
+        self.streams = self._make_streams() if kwargs.get("streams") else None
 
         self.predation_base = predation_base
         self.predation_coef = predation_coef
         self.prey_flee_prob = prey_flee_prob
         self.running = True
         self.predation_events_total = 0
+        self.predation_events_this_step = 0
+        # live counters, kept up to date by the agents themselves
+        self.n_cats = 0
+        self.n_prey = 0
+
+        # what reset() needs to start the same run again
+        self._run_config = dict(
+            width=width, height=height, n_cats=n_cats, n_prey=n_prey,
+            river_exist=kwargs.get("river_exist", True),
+            placement=kwargs.get("placement", "bulk"),
+            prey_density=kwargs.get("prey_density"), cat_density=kwargs.get("cat_density"),
+        )
+        self.grid = None
+        self._setup_maps(vegetation, river)
+        # super-individual prey (None = one agent per prey)
+        self.super_prey = make_super_prey(kwargs.get("super_prey"))
+        self._populate()
+
+        # continuous scent field (None = the binary mask of refresh_cat_scent)
+        self.scent_field = make_scent(kwargs.get("scent_mode"))
+        if self.scent_field is not None:
+            self.scent_field.bind(self)
+
+        # per-kill event log (off by default)
+        log = kwargs.get("predation_log")
+        if log is True:
+            from .events import PredationLog
+            log = PredationLog()
+        self.predation_log = log if log is not None and log is not False else None
+
+        self.scheduler = kwargs.get("scheduler", "random")
+        if self.scheduler not in ("random", "sync"):
+            raise ValueError(f"unknown scheduler: {self.scheduler!r}")
+        self.leftover_prey = []   # eaten prey still on the grid (sync scheduler only)
+
+        # observers (telemetry, recorders, ...) called at the end of every step
+        self.step_hooks = list(kwargs.get("step_hooks", ()))
+
+        # per-cell habitat-use accumulators (off by default)
+        occ = kwargs.get("occupancy")
+        if occ is not None and occ is not False:
+            from .occupancy import OccupancyAccumulator
+            if not isinstance(occ, OccupancyAccumulator):
+                occ = OccupancyAccumulator(downsample=1 if occ is True else int(occ))
+            self.step_hooks.append(occ)
+        else:
+            occ = None
+        self.occupancy = occ
+
+        # per-agent trajectories (off by default); step 0 is recorded right away
+        traj = kwargs.get("trajectory")
+        if traj is not None and traj is not False:
+            from .trajectory import TrajectoryRecorder
+            if not isinstance(traj, TrajectoryRecorder):
+                traj = TrajectoryRecorder(path=None if traj is True else traj)
+            traj.record(self)
+            self.step_hooks.append(traj)
+        else:
+            traj = None
+        self.trajectory = traj
+
+        self.collect_policy = make_policy(kwargs.get("collect"))
+        self.datacollector = self._make_datacollector()
+
+    def _make_datacollector(self):
+        # attribute-name reporters: reading a counter instead of scanning all agents
+        return StepDataCollector(
+            model_reporters={
+                "Cats": "n_cats",
+                "Prey": "n_prey",
+                "predation_events_this_step": "predation_events_this_step",
+                "predation_events_total": "predation_events_total",
+            }
+        )
+
+    def _buffer(self, name, shape, dtype):
+        """The model's own array `name` if it can be reused for shape / dtype, else a new one."""
+        arr = getattr(self, name, None)
+        if (isinstance(arr, np.ndarray) and arr.shape == shape and arr.dtype == dtype
+                and arr.flags.writeable and arr.flags.owndata):
+            return arr
+        return np.empty(shape, dtype=dtype)
+
+    def _setup_maps(self, vegetation, river):
+        """Grid, river, vegetation and trail for a new run; same-shape arrays and grid are reused."""
+        # base maps may be shared (shared_maps.SharedMap handles or read-only views)
+        vegetation, river = resolve(vegetation), resolve(river)
+        self._base_maps = (vegetation, river)
+        cfg = self._run_config
+
+        if vegetation is not None:
+            assert np.ndim(vegetation) == 2, "vegetation should be a 2D array"
+            shape = tuple(np.shape(vegetation))
+        else:
+            shape = (cfg["width"], cfg["height"])
+
+        # use size determined above
+        if self.grid is not None and (self.grid.width, self.grid.height) == shape:
+            # clearing the cell lists is ~10x cheaper than a new MultiGrid and keeps its
+            # neighbourhood cache (eaten prey are still on the grid, so every cell is checked)
+            for col in self.grid._grid:
+                for cell in col:
+                    if cell:
+                        cell.clear()
+        else:
+            self.grid = MultiGrid(shape[0], shape[1], torus=False)
+        self.width, self.height = shape
 
         # --- river --- default or none or load from file
-        river_exist = kwargs.get("river_exist", True)
         if river is not None:
-            R = np.array(river, dtype=bool)
-            assert R.shape == (self.width, self.height), "river should be same as map"
+            # the river is never written: read-only bool arrays (shared maps) are used without a copy
+            assert np.shape(river) == shape, "river should be same as map"
+            R = np.asarray(river, dtype=bool)
+            if R is river and R.flags.writeable:
+                R = self._buffer("river", shape, bool)
+                R[...] = river
             self.river = R
+        elif cfg["river_exist"]:
+            self.river = make_default_river(self.width, self.height)
         else:
-            self.river = np.zeros((self.width, self.height), dtype=bool)
-            if river_exist:
-                # create a river in the middle, 2 cells thick, meandering like a sine wave
-                # with a gap in the middle
-                thickness = 2
-                cx = self.width // 2
-                x0, x1 = max(0, cx - thickness // 2), min(self.width, cx + (thickness + 1) // 2)
-                for y in range(self.height):
-                    rx = int(cx + 2 * np.sin(2 * np.pi * y / max(1, self.height)))
-                    half = thickness // 2
-                    xL = max(0, rx - half)
-                    xR = min(self.width, rx + (thickness + 1) // 2)
-                    self.river[xL:xR, y] = True
-                gap_len = max(3, self.height // 6)
-                gap_center = self.height // 3
-                g0 = max(0, gap_center - gap_len // 2)
-                g1 = min(self.height, g0 + gap_len)
-                self.river[x0 - 1:x1 + 1, g0:g1] = False
-
-        # --- vegetation ---
+            self.river = self._buffer("river", shape, bool)
+            self.river.fill(False)
+
+        # --- vegetation --- 2D array of int (0-4); grazing edits it, so this is the model's
+        # own working copy
         if vegetation is not None:
+            V = self._buffer("vegetation", shape, np.int16)
+            V[...] = vegetation
+            np.clip(V, 0, 4, out=V)
             self.vegetation = V
         else:
-            self.vegetation = np.random.choice(
+            V = self._buffer("vegetation", shape, np.dtype(int))
+            V[...] = self.rng_for(st.VEGETATION).choice(
                 [0, 1, 2, 3, 4],
                 size=(self.width, self.height),
                 p=[0.4, 0.2, 0.15, 0.15, 0.1]
             )
+            self.vegetation = V
 
        # trail 1-5, 1 means just visited, 5 means long ago
-        self.prey_trail = np.full((self.width, self.height), 5, dtype=int)
+        self.prey_trail = self._buffer("prey_trail", shape, np.dtype(int))
+        self.prey_trail.fill(5)
 
+    def _populate(self):
+        # place agents: one-shot sampling from the free (non-river) cells, optionally weighted by
+        # a density map (array of shape (width, height), or "vegetation"); placement="rejection"
+        # restores the old per-agent retry loop. That is only the placement algorithm: vegetation
+        # and regrowth now draw from model.rng, so it doesn't reproduce older seeded runs
+        cfg = self._run_config
+        if cfg["placement"] == "rejection":
+            self._place_rejection(cfg["n_prey"], cfg["n_cats"])
+        else:
+            self.place_agents_bulk(Prey, cfg["n_prey"], density=resolve(cfg["prey_density"]))
+            self.place_agents_bulk(Cat, cfg["n_cats"], density=resolve(cfg["cat_density"]))
+        if self.super_prey is not None:
+            self.super_prey(self)
+
+    def reset(self, seed=None, vegetation=None, river=None, **params):
+        """
+        Start a new run on this model object instead of building a new one: agents, counters,
+        RNGs, vegetation and the DataCollector are reinitialized; the grid and the arrays are
+        reused when the map shape is unchanged. vegetation / river default to the maps of the
+        previous run; params override width, height, n_cats, n_prey, river_exist, placement,
+        prey_density, cat_density, predation_base, predation_coef, prey_flee_prob.
+        Step hooks, the predation log and the occupancy accumulator are kept as they are (the
+        accumulator starts over if width / height change); the trajectory recorder starts a new
+        recording.
+        A reset with seed s gives the same run as FeralCatModel(..., seed=s).
+        """
+        for k in ("predation_base", "predation_coef", "prey_flee_prob"):
+            if k in params:
+                setattr(self, k, params.pop(k))
+        unknown = set(params) - set(self._run_config)
+        if unknown:
+            raise TypeError(f"unknown reset parameters: {sorted(unknown)}")
+        self._run_config.update(params)
+
+        self.random.seed(seed)
+        self._seed = seed
+        self.reset_rng(seed)
+        if self.streams is not None:
+            self.streams = self._make_streams()
+        self.remove_all_agents()
+        Agent._ids[self] = itertools.count(1)   # unique_ids restart at 1, as in a new model
+        self.steps = 0
+        self.running = True
+        self.predation_events_total = 0
+        self.predation_events_this_step = 0
+        self.n_cats = 0
+        self.n_prey = 0
+        self.leftover_prey = []
+
+        base_veg, base_river = self._base_maps
+        self._setup_maps(base_veg if vegetation is None else vegetation,
+                         base_river if river is None else river)
+        self._populate()
+        if self.scent_field is not None:
+            self.scent_field.bind(self)
+        if self.trajectory is not None:
+            self.trajectory.record(self)   # step 0 of the new run; the old recording is dropped
+        self.datacollector = self._make_datacollector()
+
+    def place_agents_bulk(self, agent_cls, n: int, density=None):
+        """Create n agents of agent_cls on free cells sampled in one call; returns the new agents."""
+        if isinstance(density, str) and density == "vegetation":
+            density = self.vegetation
+        rng = self.rng_for(st.PLACE_PREY if agent_cls is Prey else st.PLACE_CATS)
+        xs, ys = sample_free_cells(self.river, n, rng, density=density)
+        if agent_cls is Prey:
+            p_f = getattr(self, "prey_female_ratio", 0.5)
+            sexes = np.where(rng.random(len(xs)) < p_f, "F", "M").tolist()
+            agents = [Prey(self, sex=sx) for sx in sexes]
+        else:
+            agents = [agent_cls(self) for _ in range(len(xs))]
+        place = self.grid.place_agent
+        for a, x, y in zip(agents, xs.tolist(), ys.tolist()):
+            place(a, (x, y))
+        return agents
+
+    def _place_rejection(self, n_prey: int, n_cats: int):
         # place prey
         for _ in range(n_prey):
             while True:
@@ -103,15 +298,6 @@ class FeralCatModel(Model):
                     self.grid.place_agent(a, (x, y))
                     break
 
-        self.datacollector = DataCollector(
-            model_reporters={
-                "Cats": count_cats,
-                "Prey": count_prey,
-                "predation_events_this_step": lambda m: getattr(m, "predation_events_this_step", 0),
-                "predation_events_total": lambda m: m.predation_events_total,
-            }
-        )
-
     def refresh_cat_scent(self, radius: int = 2):
         """
         Generate a 'scent' Boolean graph using the current positions of all surviving cats 
@@ -144,24 +330,75 @@ class FeralCatModel(Model):
 
     def step(self):
         self.predation_events_this_step = 0
-        self.refresh_cat_scent(radius=2)
-        self.prey_trail = np.minimum(self.prey_trail + 1, 5)
+        if self.scent_field is not None:
+            self.scent_field.update(self)
+        else:
+            self.refresh_cat_scent(radius=2)
+        np.add(self.prey_trail, 1, out=self.prey_trail)
+        np.minimum(self.prey_trail, 5, out=self.prey_trail)
 
-        self.agents.shuffle_do("step")
+        if self.scheduler == "sync":
+            sync_step(self)
+        elif self.streams is not None:
+            for a in self.streams.order(self.agents, self.steps):
+                a.step()
+        else:
+            self.agents.shuffle_do("step")
+        if self.super_prey is not None:
+            self.super_prey(self)
 
         # plant regrow: each cell has independent 0.5 prob to regrow if veg>0 and not river; cap at 4
         if hasattr(self, "vegetation") and self.vegetation is not None:
             v = self.vegetation
-            rand_mask = (np.random.rand(self.width, self.height) < 0.5)
+            rand_mask = (self.rng_for(st.REGROWTH, self.steps).random((self.width, self.height)) < 0.5)
             regen_mask = (v > 0) & (~self.river) & rand_mask
             v[regen_mask] += 1
             np.minimum(v, 4, out=v)
 
-        self.datacollector.collect(self)
-
-        if not any(isinstance(a, Prey) for a in self.agents):
+        if self.n_prey == 0:
             self.running = False
 
+        policy = self.collect_policy
+        if policy.should_collect(self) or (not self.running and policy.collect_final(self)):
+            self.datacollector.collect(self)
+
+        for hook in self.step_hooks:
+            hook(self)
+
+    def finalize(self):
+        """Record the final state (if the collection policy asks for it) and flush event logs."""
+        steps = self.datacollector.collected_steps
+        if self.collect_policy.collect_final(self) and (not steps or steps[-1] != self.steps):
+            self.datacollector.collect(self)
+        if self.predation_log is not None:
+            self.predation_log.flush()
+        if self.trajectory is not None:
+            self.trajectory.flush()
+
+    # ---- random draws (shared sequence, or keyed streams with streams=True) ----
+    def _make_streams(self):
+        return st.RandomStreams(self._seed if self._seed is not None else int(self.rng.integers(2**63)))
+
+    def rng_for(self, purpose, *key):
+        """Generator for a bulk draw: model.rng, or its own keyed stream."""
+        return self.rng if self.streams is None else self.streams.generator(purpose, *key)
+
+    def draw(self, purpose, agent, k: int = 0) -> float:
+        """Uniform in [0, 1) for one decision of an agent."""
+        s = self.streams
+        if s is None:
+            return self.random.random()
+        return s.uniform(purpose, agent.stream_id, self.steps, k)
+
+    def pick(self, purpose, agent, options, weights=None, k: int = 0):
+        """random.choice / random.choices(..., k=1)[0] for one decision of an agent."""
+        s = self.streams
+        if s is None:
+            if weights is None:
+                return self.random.choice(options)
+            return self.random.choices(options, weights=weights, k=1)[0]
+        return s.pick(purpose, agent.stream_id, self.steps, options, weights, k)
+
     def predation_prob_at(self, pos: tuple[int, int]) -> float:
         veg = getattr(self, "vegetation", None)
         v = 0
@@ -172,8 +409,57 @@ class FeralCatModel(Model):
         return p
 
 
+def sample_free_cells(river, n: int, rng, density=None):
+    """
+    Sample n cells (with replacement) that are not river, uniformly or proportional to `density`
+    (same shape as river, non-negative). Returns (xs, ys) integer arrays.
+    """
+    free = np.flatnonzero(~np.asarray(river, dtype=bool).ravel())
+    if n <= 0 or free.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if density is None:
+        cells = free[rng.integers(free.size, size=n)]
+    else:
+        w = np.asarray(density, dtype=np.float64).ravel()[free]
+        w = np.clip(w, 0, None)
+        total = w.sum()
+        if total <= 0:
+            cells = free[rng.integers(free.size, size=n)]
+        else:
+            # inverse-CDF sampling: O(cells + n log cells), no per-agent retries
+            cdf = np.cumsum(w)
+            cells = free[np.searchsorted(cdf, rng.random(n) * cdf[-1], side="right").clip(max=free.size - 1)]
+    return np.unravel_index(cells, np.shape(river))
+
+
+def make_default_river(width: int, height: int) -> np.ndarray:
+    """
+    Default river: in the middle, 2 cells thick, meandering like a sine wave,
+    with a gap at one third of the height. Returns a (width, height) bool mask.
+    """
+    thickness = 2
+    cx = width // 2
+    x0, x1 = max(0, cx - thickness // 2), min(width, cx + (thickness + 1) // 2)
+    # centre column of the river for every row, then one broadcast compare instead of a row loop
+    rx = (cx + 2 * np.sin(2 * np.pi * np.arange(height) / max(1, height))).astype(int)
+    xL = np.maximum(0, rx - thickness // 2)
+    xR = np.minimum(width, rx + (thickness + 1) // 2)
+    xs = np.arange(width)[:, None]
+    river = (xs >= xL[None, :]) & (xs < xR[None, :])
+    gap_len = max(3, height // 6)
+    gap_center = height // 3
+    g0 = max(0, gap_center - gap_len // 2)
+    g1 = min(height, g0 + gap_len)
+    river[x0 - 1:x1 + 1, g0:g1] = False
+    return river
+
+
 def count_cats(model):
+    if hasattr(model, "n_cats"):
+        return model.n_cats
     return sum(isinstance(a, Cat) and getattr(a, "alive", True) for a in model.agents)
 
 def count_prey(model: "FeralCatModel"):
-    return sum(isinstance(a, Prey) for a in model.agents)
+    if hasattr(model, "n_prey"):
+        return model.n_prey
+    return sum(getattr(a, "count", 1) for a in model.agents if isinstance(a, Prey))
@@ -0,0 +1,113 @@
+"""
+In-situ habitat-use maps: running per-cell accumulators updated every step, so a run keeps a
+few W x H arrays instead of full position histories.
+
+Accumulated per cell (or per downsample x downsample block):
+    cat_visits      cat-steps spent in the cell
+    prey_visits     prey-steps spent in the cell
+    scent_exposure  steps the cell was inside cat scent
+    vegetation_sum  sum of the vegetation level (vegetation_mean() = time average)
+
+    m = FeralCatModel(..., occupancy=2)          # accumulate on 2x2 blocks
+    ... run ...
+    maps = m.occupancy.maps()                     # dict of arrays
+    m.occupancy.save("out/run1_occupancy.npz")
+
+Across model.reset() the maps keep accumulating while the grid size is unchanged; a reset to
+another size starts them over.
+"""
+
+import numpy as np
+
+from .agents import Cat, Prey
+
+
+def _block_sum(arr, d, out_shape):
+    """Sum a (W, H) array over d x d blocks (edge blocks may be partial)."""
+    if d == 1:
+        return arr
+    w, h = arr.shape
+    bw, bh = out_shape
+    padded = np.zeros((bw * d, bh * d), dtype=arr.dtype)
+    padded[:w, :h] = arr
+    return padded.reshape(bw, d, bh, d).sum(axis=(1, 3))
+
+
+class OccupancyAccumulator:
+    def __init__(self, downsample: int = 1, every: int = 1):
+        self.downsample = max(1, int(downsample))
+        self.every = max(1, int(every))
+        self.shape = None
+        self.samples = 0
+
+    def _allocate(self, model):
+        d = self.downsample
+        self.grid_shape = (model.width, model.height)
+        self.samples = 0
+        self.shape = (-(-model.width // d), -(-model.height // d))
+        self.cat_visits = np.zeros(self.shape, dtype=np.int64)
+        self.prey_visits = np.zeros(self.shape, dtype=np.int64)
+        self.scent_exposure = np.zeros(self.shape, dtype=np.int64)
+        self.vegetation_sum = np.zeros(self.shape, dtype=np.int64)
+
+    def _cell_index(self, positions):
+        d, bh = self.downsample, self.shape[1]
+        return (positions[:, 0] // d) * bh + positions[:, 1] // d
+
+    def __call__(self, model):
+        if self.shape is None or self.grid_shape != (model.width, model.height):
+            self._allocate(model)   # first step, or a reset to another map size: start over
+        if model.steps % self.every:
+            return
+        self.update(model)
+
+    def update(self, model):
+        by_type = model.agents_by_type
+        n_cells = self.shape[0] * self.shape[1]
+
+        prey = by_type.get(Prey, ())
+        if len(prey):
+            pos = np.array([a.pos for a in prey], dtype=np.int64)
+            counts = np.array([a.count for a in prey], dtype=np.int64)   # super-individuals
+            self.prey_visits += np.bincount(self._cell_index(pos), weights=counts,
+                                            minlength=n_cells).astype(np.int64).reshape(self.shape)
+
+        cats = [a.pos for a in by_type.get(Cat, ()) if a.alive and a.pos is not None]
+        if cats:
+            pos = np.array(cats, dtype=np.int64)
+            self.cat_visits += np.bincount(self._cell_index(pos), minlength=n_cells).reshape(self.shape)
+
+        scent = getattr(model, "cat_scent", None)
+        if scent is not None:
+            self.scent_exposure += _block_sum(scent.astype(np.int64, copy=False), self.downsample, self.shape)
+        veg = getattr(model, "vegetation", None)
+        if veg is not None:
+            self.vegetation_sum += _block_sum(veg.astype(np.int64, copy=False), self.downsample, self.shape)
+        self.samples += 1
+
+    # ---- results ----
+    def block_cells(self):
+        """Number of grid cells in each block (edge blocks can be smaller)."""
+        ones = np.ones(self.grid_shape, dtype=np.int64)
+        return _block_sum(ones, self.downsample, self.shape)
+
+    def vegetation_mean(self):
+        denom = np.maximum(1, self.samples * self.block_cells())
+        return self.vegetation_sum / denom
+
+    def maps(self):
+        n = max(1, self.samples)
+        return dict(
+            cat_visits=self.cat_visits,
+            prey_visits=self.prey_visits,
+            scent_exposure=self.scent_exposure,
+            cat_use=self.cat_visits / n,          # mean cats per block per sampled step
+            prey_use=self.prey_visits / n,
+            scent_fraction=self.scent_exposure / (n * self.block_cells()),
+            vegetation_mean=self.vegetation_mean(),
+            samples=self.samples,
+            downsample=self.downsample,
+        )
+
+    def save(self, path):
+        np.savez_compressed(path, **self.maps())
@@ -0,0 +1,418 @@
+"""
+Tiled (domain-decomposed) execution of a single FeralCatModel run on several cores.
+
+The grid is cut into rectangular tiles, each owned by one worker process. Vegetation,
+prey trail, cat counts and cat scent live in shared memory, so every worker reads and
+writes the global arrays directly and halo cells never need to be copied. Each worker
+keeps a private FeralCatModel over its tile plus a halo ring (local coordinates) and
+steps only the agents it owns; agents that end a step outside the tile core are sent
+back to the coordinator and handed to the tile that owns their new cell.
+
+Approximations compared with the single-process model:
+- agents only interact with agents owned by the same worker during a step
+  (a cat in the halo cannot catch prey owned by the neighbour tile until they meet
+  on one side of the border); cats in the halo are still visible as scent/flee targets
+- grazing on halo cells can race with the neighbour tile (last writer wins)
+- each tile uses its own random stream, so results are statistically, not bitwise,
+  comparable with FeralCatModel for the same seed
+
+Usage:
+    with TiledFeralCatModel(width=1000, height=1000, n_cats=800, n_prey=8000,
+                            predation_base=0.2, predation_coef=0.1, prey_flee_prob=0.4,
+                            seed=1, n_workers=32) as m:
+        for _ in range(200):
+            m.step()
+        df = m.datacollector.get_model_vars_dataframe()
+"""
+
+import math
+import os
+import multiprocessing as mp
+
+import numpy as np
+from scipy.ndimage import maximum_filter
+
+from .model import FeralCatModel, make_default_river, sample_free_cells
+from .agents import Cat, Prey
+from .collection import StepDataCollector, make_policy
+from .shared_maps import attach_shared as _attach_shared, create_shared as _create_shared, release, resolve
+
+
+# ---- tiling ----
+def _balanced_cuts(weights, n_parts):
+    """Cut a 1D weight profile into n_parts contiguous ranges of roughly equal weight."""
+    n = len(weights)
+    n_parts = max(1, min(n_parts, n))
+    cum = np.cumsum(weights, dtype=float)
+    total = cum[-1] if n else 0.0
+    if total <= 0:
+        edges = np.linspace(0, n, n_parts + 1).astype(int)
+    else:
+        targets = total * np.arange(1, n_parts) / n_parts
+        inner = np.searchsorted(cum, targets, side="left") + 1
+        edges = np.concatenate(([0], inner, [n]))
+    # every part keeps at least one row/column
+    for i in range(1, len(edges)):
+        edges[i] = max(edges[i], edges[i - 1] + 1)
+    for i in range(len(edges) - 2, -1, -1):
+        edges[i] = min(edges[i], edges[i + 1] - 1)
+    return [(int(edges[i]), int(edges[i + 1])) for i in range(n_parts)]
+
+
+def partition_grid(river, n_tiles_x: int, n_tiles_y: int):
+    """
+    Split a (width, height) grid into n_tiles_x * n_tiles_y rectangles, balancing the
+    number of non-river cells per tile (river cells carry no agents, so they carry no work).
+    Columns are cut on the x axis first, then each column is cut on y separately.
+    Returns a list of (x0, x1, y0, y1) half-open bounds.
+    """
+    free = ~np.asarray(river, dtype=bool)
+    tiles = []
+    for x0, x1 in _balanced_cuts(free.sum(axis=1), n_tiles_x):
+        for y0, y1 in _balanced_cuts(free[x0:x1].sum(axis=0), n_tiles_y):
+            tiles.append((x0, x1, y0, y1))
+    return tiles
+
+
+def _tile_shape_for(n_workers: int, width: int, height: int):
+    """Pick (n_tiles_x, n_tiles_y) with product n_workers and tiles as square as possible."""
+    best = (n_workers, 1)
+    best_score = math.inf
+    for nx in range(1, n_workers + 1):
+        if n_workers % nx:
+            continue
+        ny = n_workers // nx
+        if nx > width or ny > height:
+            continue
+        score = abs(math.log((width / nx) / (height / ny)))
+        if score < best_score:
+            best, best_score = (nx, ny), score
+    return best
+
+
+# ---- agent transfer ----
+# agents cross process boundaries as small tuples in global coordinates:
+#   ("P", x, y, sex, since_repro)  /  ("C", x, y, energy, counter)
+def _pack_agent(a, ox, oy):
+    x, y = a.pos
+    if isinstance(a, Cat):
+        return ("C", x + ox, y + oy, a.energy, a.counter)
+    return ("P", x + ox, y + oy, a.sex, a.since_repro)
+
+
+def _unpack_agent(model, rec, ox, oy):
+    kind, x, y, s0, s1 = rec
+    if kind == "C":
+        a = Cat(model)
+        a.energy, a.counter = s0, s1
+    else:
+        a = Prey(model, sex=s0)
+        a.since_repro = s1
+    model.grid.place_agent(a, (x - ox, y - oy))
+    return a
+
+
+# ---- worker side ----
+def _tile_worker(conn, spec):
+    """
+    Worker process loop. Owns the agents of one tile and answers coordinator commands:
+        ("arrive", records) -> place incoming agents, publish own cat counts
+        ("step", None)      -> run one model step on the tile, return emigrants + counters
+        ("stop", None)      -> exit
+    """
+    segments = {k: _attach_shared(d) for k, d in spec["shared"].items()}
+    veg, river, trail = segments["vegetation"][1], segments["river"][1], segments["prey_trail"][1]
+    cat_count, scent = segments["cat_count"][1], segments["cat_scent"][1]
+
+    W, H = river.shape
+    x0, x1, y0, y1 = spec["tile"]
+    halo, radius = spec["halo"], spec["scent_radius"]
+    # local window = tile core + halo, clipped to the global grid
+    wx0, wx1 = max(0, x0 - halo), min(W, x1 + halo)
+    wy0, wy1 = max(0, y0 - halo), min(H, y1 + halo)
+    # core in local coordinates
+    cx0, cx1, cy0, cy1 = x0 - wx0, x1 - wx0, y0 - wy0, y1 - wy0
+
+    m = FeralCatModel(
+        width=wx1 - wx0, height=wy1 - wy0, n_cats=0, n_prey=0,
+        predation_base=spec["predation_base"], predation_coef=spec["predation_coef"],
+        prey_flee_prob=spec["prey_flee_prob"], seed=spec["seed"], river_exist=False,
+    )
+    if "prey_female_ratio" in spec:
+        m.prey_female_ratio = spec["prey_female_ratio"]
+    # rebind model arrays to views of the shared global arrays
+    m.vegetation = veg[wx0:wx1, wy0:wy1]
+    m.river = river[wx0:wx1, wy0:wy1]
+    m.prey_trail = trail[wx0:wx1, wy0:wy1]
+    m.cat_scent = np.zeros((wx1 - wx0, wy1 - wy0), dtype=np.uint8)
+
+    veg_core = veg[x0:x1, y0:y1]
+    river_core = river[x0:x1, y0:y1]
+    trail_core = trail[x0:x1, y0:y1]
+    rng = np.random.default_rng(spec["seed"])
+
+    try:
+        while True:
+            cmd, payload = conn.recv()
+            if cmd == "stop":
+                break
+
+            if cmd == "arrive":
+                for rec in payload:
+                    _unpack_agent(m, rec, wx0, wy0)
+                cat_count[x0:x1, y0:y1] = 0
+                for a in m.agents:
+                    if isinstance(a, Cat) and a.alive:
+                        cx, cy = a.pos
+                        cat_count[cx + wx0, cy + wy0] += 1
+                conn.send(("ok", None))
+
+            elif cmd == "step":
+                m.predation_events_this_step = 0
+
+                # scent + cat positions from the shared cat counts (window + scent margin)
+                sx0, sx1 = max(0, wx0 - radius), min(W, wx1 + radius)
+                sy0, sy1 = max(0, wy0 - radius), min(H, wy1 + radius)
+                occupied = cat_count[sx0:sx1, sy0:sy1] > 0
+                dilated = maximum_filter(occupied, size=2 * radius + 1, mode="constant")
+                m.cat_scent[...] = dilated[wx0 - sx0:wx1 - sx0, wy0 - sy0:wy1 - sy0]
+                scent[x0:x1, y0:y1] = m.cat_scent[cx0:cx1, cy0:cy1]
+                cxs, cys = np.nonzero(occupied[wx0 - sx0:wx1 - sx0, wy0 - sy0:wy1 - sy0])
+                m.cat_positions = list(zip(cxs.tolist(), cys.tolist()))
+
+                # trail ages on the core only; neighbours age their own cells
+                np.minimum(trail_core + 1, 5, out=trail_core)
+
+                m.agents.shuffle_do("step")
+
+                # regrow the core
+                regen = (veg_core > 0) & (~river_core) & (rng.random(veg_core.shape) < 0.5)
+                veg_core[regen] += 1
+                np.minimum(veg_core, 4, out=veg_core)
+
+                # collect emigrants and drop dead cats
+                emigrants = []
+                n_cats = n_prey = 0
+                for a in list(m.agents):
+                    if isinstance(a, Cat) and not a.alive:
+                        a.remove()
+                        continue
+                    x, y = a.pos
+                    if cx0 <= x < cx1 and cy0 <= y < cy1:
+                        if isinstance(a, Cat):
+                            n_cats += 1
+                        else:
+                            n_prey += 1
+                        continue
+                    emigrants.append(_pack_agent(a, wx0, wy0))
+                    m.grid.remove_agent(a)
+                    a.remove()
+
+                conn.send(("done", (emigrants, n_cats, n_prey, m.predation_events_this_step)))
+    finally:
+        # shared mappings are released when the process exits; the coordinator unlinks them
+        conn.close()
+
+
+# ---- coordinator side ----
+class TiledFeralCatModel:
+    """
+    Coordinator for a domain-decomposed FeralCatModel run.
+    Same parameters as FeralCatModel, plus:
+        n_workers: number of tiles/processes (default: os.cpu_count())
+        tiles: optional (n_tiles_x, n_tiles_y), overrides n_workers
+        halo: width of the ghost ring around each tile; must cover one step of movement
+              (cats move up to 3 cells) plus prey flee range, 5 is safe
+    Exposes step(), running, the model counters and a DataCollector with the usual columns.
+    Call close() (or use as a context manager) to stop workers and free shared memory.
+    """
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        n_cats: int,
+        n_prey: int,
+        predation_base: float,
+        predation_coef: float,
+        prey_flee_prob: float,
+        seed: int | None = None,
+        vegetation=None,
+        river=None,
+        n_workers: int | None = None,
+        tiles: tuple[int, int] | None = None,
+        halo: int = 5,
+        **kwargs
+    ):
+        rng = np.random.default_rng(seed)
+        vegetation, river = resolve(vegetation), resolve(river)
+
+        # --- base maps, same conventions as FeralCatModel ---
+        if vegetation is not None:
+            V = np.array(vegetation, dtype=np.int16)
+            assert V.ndim == 2, "vegetation should be a 2D array"
+            np.clip(V, 0, 4, out=V)
+            self.width, self.height = V.shape
+        else:
+            self.width, self.height = width, height
+            V = rng.choice([0, 1, 2, 3, 4], size=(self.width, self.height),
+                           p=[0.4, 0.2, 0.15, 0.15, 0.1]).astype(np.int16)
+        if river is not None:
+            R = np.array(river, dtype=bool)
+            assert R.shape == (self.width, self.height), "river should be same as map"
+        elif kwargs.get("river_exist", True):
+            R = make_default_river(self.width, self.height)
+        else:
+            R = np.zeros((self.width, self.height), dtype=bool)
+
+        shape = (self.width, self.height)
+        self._shm = {}
+        self.vegetation = self._share("vegetation", shape, np.int16, src=V)
+        self.river = self._share("river", shape, np.bool_, src=R)
+        self.prey_trail = self._share("prey_trail", shape, np.int8, fill=5)
+        self.cat_count = self._share("cat_count", shape, np.int32, fill=0)
+        self.cat_scent = self._share("cat_scent", shape, np.uint8, fill=0)
+
+        # --- tiles ---
+        if tiles is None:
+            n_workers = n_workers or os.cpu_count() or 1
+            tiles = _tile_shape_for(n_workers, self.width, self.height)
+        self.tiles = partition_grid(R, *tiles)
+        self._owner = np.empty(shape, dtype=np.int32)
+        for i, (x0, x1, y0, y1) in enumerate(self.tiles):
+            self._owner[x0:x1, y0:y1] = i
+
+        self.predation_base = predation_base
+        self.predation_coef = predation_coef
+        self.prey_flee_prob = prey_flee_prob
+        self.running = True
+        self.steps = 0
+        self.n_cats = n_cats
+        self.n_prey = n_prey
+        self.predation_events_this_step = 0
+        self.predation_events_total = 0
+
+        # --- initial agents, routed to their tiles ---
+        prey_female_ratio = kwargs.get("prey_female_ratio", 0.5)
+        self._pending = [[] for _ in self.tiles]
+        for kind, n, density in (("P", n_prey, kwargs.get("prey_density")),
+                                 ("C", n_cats, kwargs.get("cat_density"))):
+            if isinstance(density, str) and density == "vegetation":
+                density = V
+            xs, ys = sample_free_cells(R, n, rng, density=density)
+            female = rng.random(len(xs)) < prey_female_ratio
+            for x, y, f in zip(xs.tolist(), ys.tolist(), female.tolist()):
+                rec = ("P", x, y, "F" if f else "M", 0) if kind == "P" else ("C", x, y, 3, 0)
+                self._pending[self._owner[x, y]].append(rec)
+
+        # --- workers ---
+        shared = {k: (shm.name, shape, arr.dtype.str) for k, (shm, arr) in self._shm.items()}
+        base_seed = int(rng.integers(np.iinfo(np.int32).max))
+        ctx = mp.get_context()
+        self._conns, self._procs = [], []
+        for i, tile in enumerate(self.tiles):
+            spec = dict(
+                tile=tile, halo=halo, scent_radius=2, shared=shared, seed=base_seed + i,
+                predation_base=predation_base, predation_coef=predation_coef,
+                prey_flee_prob=prey_flee_prob,
+            )
+            if "prey_female_ratio" in kwargs:
+                spec["prey_female_ratio"] = prey_female_ratio
+            parent, child = ctx.Pipe()
+            p = ctx.Process(target=_tile_worker, args=(child, spec), daemon=True)
+            p.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(p)
+
+        self.collect_policy = make_policy(kwargs.get("collect"))
+        self.datacollector = StepDataCollector(
+            model_reporters={
+                "Cats": "n_cats",
+                "Prey": "n_prey",
+                "predation_events_this_step": "predation_events_this_step",
+                "predation_events_total": "predation_events_total",
+            }
+        )
+
+    def _share(self, key, shape, dtype, fill=None, src=None):
+        shm, arr = _create_shared(shape, dtype, fill=fill, src=src)
+        self._shm[key] = (shm, arr)
+        return arr
+
+    def _broadcast(self, cmd, payloads):
+        for conn, payload in zip(self._conns, payloads):
+            conn.send((cmd, payload))
+        return [conn.recv()[1] for conn in self._conns]
+
+    def step(self):
+        if self._procs is None:
+            raise RuntimeError("TiledFeralCatModel is closed")
+
+        # phase 1: migrants arrive, every tile publishes its cat counts
+        self._broadcast("arrive", self._pending)
+        # phase 2: every tile steps its own agents against the shared arrays
+        results = self._broadcast("step", [None] * len(self._conns))
+
+        self._pending = [[] for _ in self.tiles]
+        n_cats = n_prey = events = 0
+        for emigrants, c, p, e in results:
+            n_cats += c
+            n_prey += p
+            events += e
+            for rec in emigrants:
+                self._pending[self._owner[rec[1], rec[2]]].append(rec)
+                if rec[0] == "C":
+                    n_cats += 1
+                else:
+                    n_prey += 1
+
+        self.steps += 1
+        self.n_cats, self.n_prey = n_cats, n_prey
+        self.predation_events_this_step = events
+        self.predation_events_total += events
+
+        if n_prey == 0:
+            self.running = False
+
+        policy = self.collect_policy
+        if policy.should_collect(self) or (not self.running and policy.collect_final(self)):
+            self.datacollector.collect(self)
+
+    def finalize(self):
+        steps = self.datacollector.collected_steps
+        if self.collect_policy.collect_final(self) and (not steps or steps[-1] != self.steps):
+            self.datacollector.collect(self)
+
+    def close(self):
+        if self._procs is not None:
+            for conn in self._conns:
+                try:
+                    conn.send(("stop", None))
+                except (BrokenPipeError, OSError):
+                    pass
+            for p in self._procs:
+                p.join(timeout=5)
+                if p.is_alive():
+                    p.terminate()
+            for conn in self._conns:
+                conn.close()
+            self._procs = None
+        # keep private copies of the final arrays so they stay readable after the segments go
+        segments = [shm for shm, _ in self._shm.values()]
+        for key in self._shm:
+            setattr(self, key, np.array(getattr(self, key)))
+        self._shm = {}
+        for shm in segments:
+            release(shm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
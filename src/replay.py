@@ -0,0 +1,147 @@
+"""
+Deterministic replay: keyframes of the full model state, so any step can be rebuilt without
+rerunning from step 0.
+
+    rec = ReplayRecorder(every=50)
+    m = FeralCatModel(..., step_hooks=[rec])      # or rec.attach(m) on an existing model
+    ... run ...
+    old = rec.seek(4000)      # a separate model object in the state after step 4000
+    old.vegetation, old.agents, old.datacollector ...
+    rec.verify(m)             # seek(m.steps) reproduces the live model, agent ids included
+
+A keyframe is the pickled model (agents, grid cells in their current order, eaten prey still
+on the grid, arrays, DataCollector rows and both RNG states - model.random and model.rng -
+which are the model's only sources of randomness). Step hooks, the predation log and the
+trajectory recorder are left out. The model's unique_id counter is stored with it, so agents
+created after a seek get the ids they would have got in the live run. seek(step) unpickles the nearest keyframe at or before the
+step and simulates forward, so the cost is at most `every` steps plus one unpickle; seeking
+past the last recorded step just simulates further from the last keyframe.
+
+Keyframes are kept in memory, or written as numbered files (path given). With max_bytes the
+oldest in-memory keyframes are dropped to stay under the budget (those steps can't be
+reached any more).
+"""
+
+import bisect
+import copy
+import itertools
+import pickle
+from pathlib import Path
+
+from mesa import Agent
+
+# observers that are not part of the simulated state
+_DETACHED = ("step_hooks", "predation_log", "trajectory", "occupancy")
+
+
+def snapshot(model) -> bytes:
+    """Pickled model state without observers, plus the next agent unique_id."""
+    saved = {k: getattr(model, k) for k in _DETACHED if hasattr(model, k)}
+    try:
+        model.step_hooks = []
+        for k in _DETACHED[1:]:
+            if k in saved:
+                setattr(model, k, None)
+        next_id = next(copy.copy(Agent._ids[model]))   # peek without advancing the live counter
+        return pickle.dumps((model, next_id), protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for k, v in saved.items():
+            setattr(model, k, v)
+
+
+def restore(blob: bytes):
+    """Model object from snapshot(), with its unique_id counter where the snapshot left it."""
+    state = pickle.loads(blob)
+    if isinstance(state, tuple):
+        model, next_id = state
+    else:
+        # bare pickled model: continue after the highest id in use (eaten prey stay on the grid)
+        model = state
+        on_grid = (a for cell in model.grid.coord_iter() for a in cell[0]) if model.grid is not None else ()
+        next_id = max(itertools.chain((a.unique_id for a in model.agents),
+                                      (a.unique_id for a in on_grid)), default=0) + 1
+    Agent._ids[model] = itertools.count(next_id)
+    return model
+
+
+class ReplayRecorder:
+    """Step hook taking a keyframe every `every` steps (and at the step it is attached)."""
+
+    def __init__(self, every: int = 50, path=None, max_bytes: int | None = None):
+        self.every = max(1, int(every))
+        self.path = Path(path) if path is not None else None
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.steps = []      # keyframe steps, ascending
+        self._frames = []    # bytes, or file paths
+        self.nbytes = 0
+        self.last_step = None
+
+    def attach(self, model):
+        """Register on a model and take its first keyframe now."""
+        if self not in model.step_hooks:
+            model.step_hooks.append(self)
+        self.keyframe(model)
+        return self
+
+    def __call__(self, model):
+        self.last_step = model.steps
+        if model.steps % self.every == 0 or not model.running:
+            self.keyframe(model)
+
+    def keyframe(self, model):
+        step = model.steps
+        self.last_step = max(step, self.last_step or 0)
+        if self.steps and step <= self.steps[-1]:
+            # a new run on the same recorder (reset model): start over
+            if step < self.steps[-1]:
+                self.clear()
+            else:
+                return
+        blob = snapshot(model)
+        if self.path is not None:
+            f = self.path / f"key_{step:08d}.pkl"
+            f.write_bytes(blob)
+            self._frames.append(f)
+        else:
+            self._frames.append(blob)
+        self.steps.append(step)
+        self.nbytes += len(blob)
+        if self.max_bytes is not None and self.path is None:
+            while self.nbytes > self.max_bytes and len(self._frames) > 1:
+                self.nbytes -= len(self._frames.pop(0))
+                self.steps.pop(0)
+
+    def clear(self):
+        self.steps, self._frames, self.nbytes = [], [], 0
+
+    def _blob(self, i):
+        f = self._frames[i]
+        return f.read_bytes() if isinstance(f, Path) else f
+
+    def seek(self, step: int):
+        """New model object in the state after `step` (step 0 = initial state)."""
+        if not self.steps or step < self.steps[0]:
+            raise KeyError(f"no keyframe at or before step {step}")
+        i = bisect.bisect_right(self.steps, step) - 1
+        model = restore(self._blob(i))
+        while model.steps < step and model.running:
+            model.step()
+        return model
+
+    def verify(self, model) -> bool:
+        """
+        Check that seek(model.steps) rebuilds the live model: same counters, agents (id, kind,
+        position) and next agent unique_id. Peeks at the live id counter without advancing it.
+        """
+        old = self.seek(model.steps)
+
+        def state(m):
+            agents = sorted((a.unique_id, type(a).__name__, a.pos) for a in m.agents)
+            return (m.steps, m.n_prey, m.n_cats, m.predation_events_total, agents,
+                    next(copy.copy(Agent._ids[m])))
+        return state(old) == state(model)
+
+    def __len__(self):
+        return len(self.steps)
@@ -0,0 +1,187 @@
+"""
+Per-run memory and resource accounting.
+
+    mon = ResourceMonitor(every=10)              # step hook
+    m = FeralCatModel(..., step_hooks=[mon])
+    ... run ...
+    mon.report(m)   # dict, see below
+
+batch.run_once attaches a monitor to every run and merges its report into the run summary, so
+the numbers show up in runs_df, in summarize_runs (mean / max per scenario), and in job queue
+results.
+
+Report fields
+    cpu_s, wall_s              CPU (process) and wall time since the monitor was created
+    peak_rss_mb                process peak RSS (ru_maxrss; in a pool worker this is the worker's
+                               peak so far, not only this run)
+    rss_mb, rss_growth_mb      RSS at the end of the run, and its growth during the run
+    max_rss_sampled_mb         highest RSS seen on sampled steps
+    array_bytes                bytes held by the model's grid arrays (vegetation, river,
+                               prey_trail, cat_scent); shared read-only maps are counted in
+                               shared_array_bytes instead
+    agents, peak_agents        registered agents at the end / highest on sampled steps
+    bytes_per_prey / _cat      measured footprint of one agent incl. model and grid bookkeeping
+    agent_bytes                agents x footprint
+    datacollector_bytes        rows x columns held by the DataCollector (Python objects)
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .agents import Cat, Prey
+
+
+MODEL_ARRAYS = ("vegetation", "river", "prey_trail", "cat_scent")
+MB = 1024 * 1024
+
+_agent_bytes = {}
+_cell_bytes = {}
+
+
+# ---- process memory ----
+def peak_rss_bytes() -> int:
+    try:
+        import resource
+    except ImportError:   # Windows
+        return rss_bytes()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # macOS reports bytes, Linux KiB
+
+
+def rss_bytes() -> int:
+    """Current resident set size (0 if it cannot be read)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return 0
+
+
+# ---- model memory ----
+def array_bytes(model):
+    """(private, shared) bytes of the model's grid arrays; read-only views count as shared."""
+    private = shared = 0
+    for name in MODEL_ARRAYS:
+        arr = getattr(model, name, None)
+        if not isinstance(arr, np.ndarray):
+            continue
+        if arr.flags.writeable or arr.base is None:
+            private += arr.nbytes
+        else:
+            shared += arr.nbytes
+    return private, shared
+
+
+def agent_bytes(cls) -> int:
+    """
+    Measured memory per agent of cls: the object and its attributes plus the model's agent
+    registries and the grid cell list entry. Measured once (tracemalloc on a scratch model).
+    """
+    if cls not in _agent_bytes:
+        from .model import FeralCatModel
+        n = 2000
+        scratch = FeralCatModel(10, 10, 0, 0, 0.0, 0.0, 0.0, seed=0, river_exist=False,
+                                 vegetation=np.zeros((10, 10)))   # no random vegetation draw
+        scratch.place_agents_bulk(cls, 1)   # create registries first
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        scratch.place_agents_bulk(cls, n)
+        after = tracemalloc.get_traced_memory()[0]
+        if not was_tracing:
+            tracemalloc.stop()
+        _agent_bytes[cls] = max(0, (after - before) // n)
+    return _agent_bytes[cls]
+
+
+def cell_bytes() -> int:
+    """
+    Measured memory per grid cell of a model without agents: the grid arrays, cat scent and the
+    MultiGrid cell lists (tracemalloc on a scratch 100x100 model, measured once).
+    """
+    if "cell" not in _cell_bytes:
+        from .model import FeralCatModel
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        scratch = FeralCatModel(100, 100, 0, 0, 0.0, 0.0, 0.0, seed=0)
+        scratch.refresh_cat_scent()
+        after = tracemalloc.get_traced_memory()[0]
+        if not was_tracing:
+            tracemalloc.stop()
+        del scratch
+        _cell_bytes["cell"] = max(0, (after - before) // 10_000)
+    return _cell_bytes["cell"]
+
+
+def datacollector_bytes(dc) -> int:
+    """Approximate size of the collected model variables (lists of Python scalars)."""
+    total = 0
+    for values in getattr(dc, "model_vars", {}).values():
+        total += sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values)
+    steps = getattr(dc, "collected_steps", None)
+    if steps is not None:
+        total += sys.getsizeof(steps) + 28 * len(steps)
+    return total
+
+
+def model_memory(model) -> dict:
+    private, shared = array_bytes(model)
+    by_type = model.agents_by_type
+    n_prey, n_cats = len(by_type.get(Prey, ())), len(by_type.get(Cat, ()))
+    bp, bc = agent_bytes(Prey), agent_bytes(Cat)
+    return dict(array_bytes=private, shared_array_bytes=shared, agents=n_prey + n_cats,
+                bytes_per_prey=bp, bytes_per_cat=bc, agent_bytes=n_prey * bp + n_cats * bc,
+                datacollector_bytes=datacollector_bytes(model.datacollector))
+
+
+# ---- per-run monitor ----
+class ResourceMonitor:
+    """Step hook sampling RSS and agent counts every `every` steps; report() sums up a run."""
+
+    def __init__(self, every: int = 10):
+        self.every = max(1, int(every))
+        self.cpu0 = time.process_time()
+        self.wall0 = time.perf_counter()
+        self.rss0 = rss_bytes()
+        self.max_rss = self.rss0
+        self.peak_agents = 0
+
+    def __call__(self, model):
+        if model.steps % self.every == 0 or not model.running:
+            self.max_rss = max(self.max_rss, rss_bytes())
+            self.peak_agents = max(self.peak_agents, len(model.agents))
+
+    def report(self, model) -> dict:
+        self(model)
+        rss = rss_bytes()
+        out = dict(cpu_s=time.process_time() - self.cpu0, wall_s=time.perf_counter() - self.wall0,
+                   peak_rss_mb=peak_rss_bytes() / MB, rss_mb=rss / MB,
+                   rss_growth_mb=(rss - self.rss0) / MB, max_rss_sampled_mb=max(self.max_rss, rss) / MB,
+                   peak_agents=self.peak_agents)
+        out.update(model_memory(model))
+        return out
+
+
+# summarize_runs aggregates these per scenario
+SUMMARY_AGGREGATES = {
+    "cpu_s_mean": ("cpu_s", "mean"),
+    "wall_s_mean": ("wall_s", "mean"),
+    "peak_rss_mb_max": ("peak_rss_mb", "max"),
+    "rss_growth_mb_max": ("rss_growth_mb", "max"),
+    "array_bytes_mean": ("array_bytes", "mean"),
+    "agent_bytes_max": ("agent_bytes", "max"),
+    "peak_agents_max": ("peak_agents", "max"),
+    "datacollector_bytes_mean": ("datacollector_bytes", "mean"),
+}
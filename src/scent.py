@@ -0,0 +1,151 @@
+"""
+Diffusing, decaying cat scent field.
+
+The default scent (FeralCatModel.refresh_cat_scent) is a binary mask of the cells within
+Chebyshev distance 2 of a cat, rebuilt from scratch every step. With scent_mode="field" the
+model keeps a continuous field instead:
+
+    every step   cats deposit `deposit` on their cell
+                 the field diffuses (3-tap kernel per axis, `passes` times) and decays by `decay`
+                 the river absorbs nothing and passes nothing on: diffusion is a normalized
+                 convolution over open cells, so scent neither leaks across nor into the river
+    prey         sense scent where field >= threshold (model.cat_scent, as before)
+
+    m = FeralCatModel(..., scent_mode="field")
+    m = FeralCatModel(..., scent_mode=ScentField(decay=0.9, threshold=0.1))
+    m.scent_field.field      # float32 (width, height)
+
+The field lives in two float32 buffers used ping-pong (read one, write the other, swap) plus
+two scratch buffers, so a step is a handful of in-place array passes whatever the number of
+cats. method="fft" replaces the passes by one Gaussian convolution (width `sigma`) through
+rfft2 with a precomputed kernel spectrum - cost independent of sigma, for wide spreads on big
+grids; the river then only masks the result, a wide kernel can reach across a narrow river.
+"""
+
+import numpy as np
+
+
+class ScentField:
+    # defaults: a resting cat is sensed on the same 5x5 square as the radius-2 mask, a moving
+    # one leaves a fading trail behind it
+    def __init__(self, deposit: float = 1.0, decay: float = 0.85, diffusion: float = 0.25,
+                 passes: int = 1, threshold: float = 0.05, method: str = "separable",
+                 sigma: float = 1.0):
+        if method not in ("separable", "fft"):
+            raise ValueError(f"unknown scent method: {method!r}")
+        if not 0 <= diffusion <= 1 / 3:
+            raise ValueError("diffusion must be in [0, 1/3]")
+        self.deposit, self.decay, self.diffusion = float(deposit), float(decay), float(diffusion)
+        self.passes, self.threshold = max(0, int(passes)), float(threshold)
+        self.method, self.sigma = method, float(sigma)
+        self.shape = None
+
+    # ---- setup ----
+    def bind(self, model):
+        """(Re)allocate buffers for the model's grid and river; clears the field."""
+        shape = (model.width, model.height)
+        if shape != self.shape:
+            self.field = np.zeros(shape, dtype=np.float32)
+            self._next = np.zeros(shape, dtype=np.float32)
+            self._tmp = np.zeros(shape, dtype=np.float32)
+            self._side = np.zeros(shape, dtype=np.float32)
+            self.shape = shape
+        else:
+            self.field.fill(0)
+        self.open = ~np.asarray(model.river, dtype=bool)
+        open_f = self.open.astype(np.float32)
+        if self.method == "fft":
+            self._kernel_fft = self._gaussian_spectrum(shape)
+            norm = self._fft_convolve(open_f)
+        else:
+            norm = open_f
+            for _ in range(self.passes):
+                norm = self._blur(norm, np.empty_like(norm))
+        # 1 / (weight of the open cells each cell averages over); 0 on the river
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._inv_norm = np.where(self.open & (norm > 1e-12), 1.0 / norm, 0.0).astype(np.float32)
+        model.cat_scent = np.zeros(shape, dtype=np.uint8)
+
+    # ---- kernels ----
+    def _blur(self, src, dst):
+        """3-tap [a, 1-2a, a] along both axes, zero outside the grid; src is left unchanged."""
+        a, tmp, side = self.diffusion, self._tmp, self._side
+        # x pass: src -> tmp
+        np.multiply(src, a, out=side)
+        np.multiply(src, 1 - 2 * a, out=tmp)
+        tmp[1:] += side[:-1]
+        tmp[:-1] += side[1:]
+        # y pass: tmp -> dst
+        np.multiply(tmp, a, out=side)
+        np.multiply(tmp, 1 - 2 * a, out=dst)
+        dst[:, 1:] += side[:, :-1]
+        dst[:, :-1] += side[:, 1:]
+        return dst
+
+    def _gaussian_spectrum(self, shape):
+        r = max(1, int(np.ceil(3 * self.sigma)))
+        self._pad = (shape[0] + r, shape[1] + r)   # zero padding: no wrap-around
+        g = np.exp(-0.5 * (np.arange(-r, r + 1) / self.sigma) ** 2)
+        g /= g.sum()
+        k = np.zeros(self._pad, dtype=np.float64)
+        k[:2 * r + 1, :2 * r + 1] = np.outer(g, g)
+        k = np.roll(k, (-r, -r), axis=(0, 1))     # centre the kernel on (0, 0)
+        return np.fft.rfft2(k)
+
+    def _fft_convolve(self, src, out=None):
+        spec = np.fft.rfft2(src, s=self._pad)
+        spec *= self._kernel_fft
+        full = np.fft.irfft2(spec, s=self._pad)
+        if out is None:
+            return full[:src.shape[0], :src.shape[1]].astype(np.float32)
+        out[...] = full[:src.shape[0], :src.shape[1]]
+        return out
+
+    # ---- per step ----
+    def update(self, model, cats=None):
+        """Deposit, diffuse, decay; refresh model.cat_scent (>= threshold) and model.cat_positions."""
+        if self.shape != (model.width, model.height):
+            self.bind(model)
+        if cats is None:
+            from .agents import Cat
+            cats = model.agents_by_type.get(Cat, ())
+        pos = [a.pos for a in cats if getattr(a, "alive", True) and a.pos is not None]
+        model.cat_positions = pos
+
+        f = self.field
+        if pos:
+            xs, ys = np.array(pos, dtype=np.intp).T
+            np.add.at(f, (xs, ys), self.deposit)
+        f *= self.open
+
+        if self.method == "fft":
+            nxt = self._fft_convolve(f, out=self._next)
+        else:
+            src, nxt = f, self._next
+            for _ in range(self.passes):
+                self._blur(src, nxt)
+                src, nxt = nxt, src
+            nxt = src
+        nxt *= self._inv_norm
+        nxt *= self.decay
+        if nxt is not f:
+            self.field, self._next = nxt, f   # swap the ping-pong buffers
+
+        np.greater_equal(self.field, self.threshold, out=model.cat_scent, casting="unsafe")
+        return self.field
+
+    def at(self, pos) -> float:
+        return float(self.field[pos[0], pos[1]])
+
+
+def make_scent(spec):
+    """scent_mode value -> ScentField or None ("radius" = the binary radius-2 mask)."""
+    if spec is None or spec == "radius":
+        return None
+    if isinstance(spec, ScentField):
+        return spec
+    if spec == "field":
+        return ScentField()
+    if spec == "fft":
+        return ScentField(method="fft")
+    raise ValueError(f"unknown scent_mode: {spec!r}")
@@ -0,0 +1,275 @@
+"""
+Cost-model-driven scheduling of batch sweeps.
+
+A pool mapping runs in submission order leaves cores idle at the end of a mixed sweep: a
+200x200 high-prey run costs ~100x a 25x25 one, and if it starts last every other worker waits
+for it. run_scheduled() instead
+
+    predicts    each run's CPU time from grid size, initial agent counts and max_steps
+                (CostModel: built-in coefficients, or fitted on earlier run summaries - the
+                cpu_s / steps columns batch.run_once records), and its memory (estimate_memory)
+    orders      longest predicted first (LPT): within 4/3 of the optimal makespan, and close to
+                total work / processes when there are many more runs than processes
+    dispatches  whenever a worker is free, the largest pending run whose memory estimate fits
+                in memory_budget_mb next to the runs in flight (a run over the budget on its own
+                waits for the workers to drain when its turn comes, then runs alone)
+    corrects    the predictions as runs finish: a speed factor (median observed / predicted
+                CPU time) absorbs a machine faster or slower than the coefficients
+    deadline    (seconds from the start) runs predicted to overrun it go behind runs that still
+                fit; once only those are left they start with a time limit and are cut short
+                (summary truncated=True); runs that can't even do min_steps are skipped
+
+    runs_df, traces_df, report = run_scheduled(SCENARIOS, range(20), max_steps=500, processes=8,
+                                               memory_budget_mb=6000, deadline=3600)
+    report["makespan_s"], report["lower_bound_s"], report["skipped"]
+
+    cm = CostModel().fit(old_runs_df)     # learn from previous timings
+    cm.save("cost_model.json")            # CostModel.load(...) next time
+
+batch.run_batch(..., processes=N) is dispatched through here; rows come back in task order.
+The memory budget covers the runs' own estimates, not the worker processes' baseline
+(interpreter + imports, ~100 MB each).
+"""
+
+import heapq
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from .batch import run_once
+from .resources import MB, agent_bytes, cell_bytes
+from .shared_maps import SharedMaps
+
+
+# predicted CPU seconds = features . coef
+# (a cat's moves cost more where the cells it lands on hold many prey: cat_steps x prey / cell)
+FEATURES = ("steps", "cell_steps", "prey_steps", "cat_steps", "cat_crowd_steps", "cells", "agents")
+# fitted on this project's runs (calibrate(), one core of a recent x86 machine)
+DEFAULT_COEF = (0.0, 1.6e-8, 1.25e-5, 1.2e-4, 3.8e-4, 7.0e-7, 6.7e-6)
+TRACE_BYTES_PER_STEP = 300   # DataCollector lists + the trace DataFrame row
+
+
+def _size(scenario):
+    veg = scenario.get("vegetation")
+    if veg is not None:
+        w, h = np.shape(veg)
+    else:
+        w, h = scenario["width"], scenario["height"]
+    return int(w) * int(h), int(scenario.get("n_prey", 0)), int(scenario.get("n_cats", 0))
+
+
+def _features(scenario, steps):
+    cells, prey, cats = _size(scenario)
+    return np.array([steps, steps * cells, steps * prey, steps * cats, steps * cats * prey / cells,
+                     cells, prey + cats], dtype=np.float64)
+
+
+def estimate_memory(scenario, max_steps: int) -> int:
+    """Bytes a run needs: grid arrays and cell lists, initial agents, collected trace."""
+    from .agents import Cat, Prey
+    cells, prey, cats = _size(scenario)
+    return (cells * cell_bytes() + prey * agent_bytes(Prey) + cats * agent_bytes(Cat)
+            + max_steps * TRACE_BYTES_PER_STEP)
+
+
+class CostModel:
+    """Linear model of a run's CPU time over FEATURES, times a speed factor learned online."""
+
+    def __init__(self, coef=None, speed: float = 1.0):
+        self.coef = np.array(DEFAULT_COEF if coef is None else coef, dtype=np.float64)
+        self.speed = float(speed)
+        self._ratios = []
+
+    def predict(self, scenario, steps: int) -> float:
+        return self.speed * float(_features(scenario, steps) @ self.coef)
+
+    def observe(self, scenario, steps: int, seconds: float):
+        """One finished run: update the speed factor."""
+        raw = float(_features(scenario, steps) @ self.coef)
+        if raw > 0 and seconds > 0:
+            self._ratios.append(seconds / raw)
+            self.speed = float(np.median(self._ratios))
+
+    def fit(self, runs_df, time_col: str = "cpu_s"):
+        """Non-negative least squares on run summaries (scenario columns + steps + time_col)."""
+        rows = runs_df.dropna(subset=[time_col, "steps"]).to_dict(orient="records")
+        if not rows:
+            return self
+        X = np.array([_features(r, r["steps"]) for r in rows])
+        y = np.array([r[time_col] for r in rows], dtype=np.float64)
+        self.coef = _nnls(X, y)
+        self.speed, self._ratios = 1.0, []
+        return self
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(dict(features=FEATURES, coef=self.coef.tolist(), speed=self.speed), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            d = json.load(f)
+        return cls(d["coef"], d.get("speed", 1.0))
+
+
+def _nnls(X, y):
+    norm = np.linalg.norm(X, axis=0)
+    norm[norm == 0] = 1.0
+    try:
+        from scipy.optimize import nnls
+        coef, _ = nnls(X / norm, y)
+    except ImportError:
+        coef = np.clip(np.linalg.lstsq(X / norm, y, rcond=None)[0], 0, None)
+    return coef / norm
+
+
+def calibrate(steps: int = 20, seed: int = 0):
+    """
+    CostModel from timings of model construction and of single FeralCatModel.step calls (with
+    the live agent counts of that step) on a 3 x 3 x 2 grid of sizes x prey x cats probes.
+    """
+    from .model import FeralCatModel
+    build, step_rows = [], []
+    for w in (25, 100, 200):
+        for p in (80, 1000, 4000):
+            for c in (4, 50):
+                t = time.process_time()
+                m = FeralCatModel(w, w, c, p, 0.2, 0.1, 0.4, seed=seed)
+                build.append((w * w, p + c, time.process_time() - t))
+                for _ in range(steps):
+                    row = (1.0, w * w, m.n_prey, m.n_cats, m.n_cats * m.n_prey / (w * w))
+                    t = time.process_time()
+                    m.step()
+                    step_rows.append((*row, time.process_time() - t))
+    S, B = np.array(step_rows, dtype=np.float64), np.array(build, dtype=np.float64)
+    return CostModel(np.concatenate([_nnls(S[:, :5], S[:, 5]), _nnls(B[:, :2], B[:, 2])]))
+
+
+def lpt_makespan(costs, processes: int) -> float:
+    """Makespan of longest-first list scheduling of costs on `processes` identical workers."""
+    finish = [0.0] * max(1, processes)
+    for c in sorted(costs, reverse=True):
+        heapq.heapreplace(finish, finish[0] + c)
+    return max(finish)
+
+
+# ---- dispatch ----
+def _scheduled_task(task):
+    scenario, seed, max_steps, telemetry, time_limit = task
+    return run_once(scenario, seed, max_steps, telemetry=telemetry, time_limit=time_limit)
+
+
+def _submit(pool, task):
+    if pool is not None:
+        return pool.submit(_scheduled_task, task)
+    f = Future()   # serial: run now, hand back a finished future
+    try:
+        f.set_result(_scheduled_task(task))
+    except Exception as e:
+        f.set_exception(e)
+    return f
+
+
+def run_scheduled(scenarios, seeds, max_steps: int = 200, processes: int | None = None,
+                  cost_model=None, memory_budget_mb: float | None = None,
+                  deadline: float | None = None, min_steps: int = 1, telemetry=None):
+    """
+    Run scenarios x seeds longest-first (see the module docstring).
+    Returns (runs_df, traces_df, report); runs_df / traces_df as batch.run_batch, in task order,
+    without skipped runs. report: makespan_s, work_s (sum of run wall times), processes,
+    lower_bound_s (max(work / processes, longest run)), efficiency (work / (makespan x
+    processes)), predicted_makespan_s, skipped [(group, seed)], truncated (count), schedule
+    (DataFrame: one row per run with predicted / measured times and memory), cost_model.
+    """
+    cm = cost_model if cost_model is not None else CostModel()
+    workers = 1 if processes == 1 else (processes or os.cpu_count() or 1)
+    tasks = [(sc, s) for sc in scenarios for s in seeds]
+    predicted = [cm.predict(sc, max_steps) for sc, _ in tasks]
+    memory = [estimate_memory(sc, max_steps) for sc, _ in tasks]
+    budget = None if memory_budget_mb is None else memory_budget_mb * MB
+    pending = sorted(range(len(tasks)), key=lambda i: -predicted[i])
+    results, rows, skipped = {}, {}, []
+    running = {}   # future -> task index
+    t0 = time.perf_counter()
+
+    def next_task():
+        """(index, time limit) of the run to start now, or None to wait."""
+        if budget is not None and memory[pending[0]] > budget:
+            # too big for the budget even alone: run it by itself, in its turn
+            if running:
+                return None
+            fits = pending[:1]
+        else:
+            in_use = sum(memory[j] for j in running.values())
+            fits = [i for i in pending if budget is None or in_use + memory[i] <= budget]
+            if not fits:
+                return None            # wait for memory to free up
+        if deadline is None:
+            return fits[0], None
+        left = deadline - (time.perf_counter() - t0)
+        for i in fits:
+            if cm.predict(tasks[i][0], max_steps) <= left:
+                return i, left         # the largest run that still fits in the time left
+        # nothing fits: drop runs that can't do min_steps, cut the largest other one short
+        for i in list(pending):
+            if cm.predict(tasks[i][0], min_steps) > left:
+                pending.remove(i)
+                skipped.append(i)
+        fits = [i for i in fits if i in pending]
+        return (fits[0], left) if fits else None
+
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        with SharedMaps() as maps:
+            shared = {}
+            while pending or running:
+                while pending and len(running) < workers:
+                    nxt = next_task()
+                    if nxt is None:
+                        break
+                    i, limit = nxt
+                    pending.remove(i)
+                    sc, seed = tasks[i]
+                    if pool is not None and id(sc) not in shared:
+                        shared[id(sc)] = maps.share_scenario(sc)
+                    rows[i] = dict(predicted_s=cm.predict(sc, max_steps), memory_mb=memory[i] / MB,
+                                   start_s=time.perf_counter() - t0, time_limit_s=limit)
+                    running[_submit(pool, (shared.get(id(sc), sc), seed, max_steps, telemetry, limit))] = i
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for f in done:
+                    i = running.pop(f)
+                    summary, df = results[i] = f.result()
+                    rows[i]["end_s"] = time.perf_counter() - t0
+                    cm.observe(tasks[i][0], summary["steps"],
+                               summary.get("cpu_s", rows[i]["end_s"] - rows[i]["start_s"]))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    makespan = time.perf_counter() - t0
+
+    order = [i for i in range(len(tasks)) if i in results]
+    runs_df = pd.DataFrame([{**tasks[i][0], **results[i][0]} for i in order])
+    traces_df = pd.concat([results[i][1] for i in order], ignore_index=True) if order else pd.DataFrame()
+
+    schedule = pd.DataFrame([dict(group=tasks[i][0].get("group", ""), seed=tasks[i][1], **rows[i],
+                                  cpu_s=results[i][0].get("cpu_s"), steps=results[i][0]["steps"],
+                                  truncated=results[i][0].get("truncated", False))
+                             for i in order])
+    if len(schedule):
+        schedule["wall_s"] = schedule["end_s"] - schedule["start_s"]
+    work = float(schedule["wall_s"].sum()) if len(schedule) else 0.0
+    longest = float(schedule["wall_s"].max()) if len(schedule) else 0.0
+    report = dict(makespan_s=makespan, work_s=work, processes=workers,
+                  lower_bound_s=max(work / workers, longest),
+                  efficiency=work / (makespan * workers) if makespan > 0 else np.nan,
+                  predicted_makespan_s=lpt_makespan(predicted, workers),
+                  skipped=[(tasks[i][0].get("group", ""), tasks[i][1]) for i in skipped],
+                  truncated=int(schedule["truncated"].sum()) if len(schedule) else 0,
+                  schedule=schedule, cost_model=cm)
+    return runs_df, traces_df, report
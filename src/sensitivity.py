@@ -0,0 +1,304 @@
+"""
+Global sensitivity analysis of FeralCatModel parameters with common random numbers.
+
+Comparing "coef 0.16" with "coef 0.20" on independent seeds buries the difference in run-to-run
+noise. Here every parameter point is run with the *same* seeds (common random numbers, CRN),
+and with streams=True (streams.py): placement, activation order, moves, flee and predation
+draws come from streams keyed by (seed, agent, step), so a parameter change flips individual
+outcomes - a kill that succeeds at one coefficient and not the other - without reshuffling
+every later draw. Paired outputs are correlated and their differences, which elementary
+effects and Sobol estimators are made of, carry less noise. How much less depends on the
+metric: near extinction one kill decides whether the last prey survive, so the gain is
+modest for end-of-run metrics and for large steps in a parameter. BASE, 60 seeds, 200 steps:
+
+    variance_reduction          tte    final_prey    pred_events_total
+    coef 0.16 vs 0.20   shared  1.3    1.3           1.4      (same seed, one shared stream)
+                        streams 1.5    2.8           1.5
+    coef 0.16 vs 0.17   shared  1.4    1.4           1.4
+                        streams 2.6    3.1           3.0
+
+    from src.sensitivity import morris, sobol, paired_difference
+    res = morris(trajectories=20, seeds=range(5), processes=4)     # mu*, sigma with bootstrap CIs
+    res = sobol(n=64, seeds=range(4), processes=4)                 # S1 / ST with bootstrap CIs
+    print(res.table)
+    d = paired_difference(BASE, dict(BASE, predation_coef=0.20), seeds=range(30))
+    d["variance_reduction"]   # how many times more runs independent seeds would need
+
+params: {name: (low, high)} over FeralCatModel keyword arguments (integer bounds = integer
+parameter); base: the rest of the scenario (its values for the parameters in params are
+overridden). metric: a run summary column (final_prey,
+tte, extinct, pred_events_total, final_cats - see batch.summarize_trace) or a callable
+summary -> float; a point's output is the mean over its seeds. crn=False gives every point its
+own seeds, for comparison. Runs get streams=True unless base sets streams itself.
+
+CLI: python -m src.sensitivity morris --trajectories 20 --seeds 5 --processes 4
+     python -m src.sensitivity sobol --n 64 --seeds 4 --metric tte
+"""
+
+import argparse
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .batch import run_once
+from .shared_maps import SharedMaps
+
+
+PARAMETERS = dict(predation_base=(0.05, 0.5), predation_coef=(0.0, 0.3), prey_flee_prob=(0.0, 1.0))
+BASE = dict(width=25, height=25, n_cats=8, n_prey=80,
+            predation_base=0.2, predation_coef=0.16, prey_flee_prob=0.4)
+SEED_STRIDE = 1_000_003   # independent (crn=False) seeds: point i uses seed + (i + 1) * stride
+
+
+# ---- evaluation ----
+def _summary_task(task):
+    scenario, seed, max_steps = task
+    summary, _ = run_once(scenario, seed, max_steps, resources=False)
+    return summary
+
+
+def _metric_value(summary, metric):
+    v = metric(summary) if callable(metric) else summary[metric]
+    return np.nan if v is None else float(v)
+
+
+def _integer(bounds):
+    return [isinstance(a, (int, np.integer)) and isinstance(b, (int, np.integer)) for a, b in bounds]
+
+
+def _scale(U, bounds):
+    """Unit-cube points -> parameter values (rounded for integer bounds)."""
+    lo = np.array([b[0] for b in bounds], dtype=np.float64)
+    hi = np.array([b[1] for b in bounds], dtype=np.float64)
+    X = lo + np.asarray(U) * (hi - lo)
+    for j, is_int in enumerate(_integer(bounds)):
+        if is_int:
+            X[:, j] = np.round(X[:, j])
+    return X
+
+
+def evaluate(X, names, base=BASE, seeds=range(5), max_steps: int = 200, processes: int | None = 1,
+             metric="final_prey", crn: bool = True, integer=None):
+    """
+    Run every parameter point (rows of X, columns = names) with every seed; returns Y of shape
+    (points, seeds). integer: per-name flags for parameters passed as int.
+    """
+    seeds = list(seeds)
+    integer = integer or [False] * len(names)
+    points = [{k: int(v) if is_int else float(v) for k, v, is_int in zip(names, x, integer)}
+              for x in np.asarray(X)]
+
+    def tasks(b):
+        return [({"streams": True, **b, **p}, s if crn else s + (i + 1) * SEED_STRIDE, max_steps)
+                for i, p in enumerate(points) for s in seeds]
+
+    if processes == 1:
+        summaries = [_summary_task(t) for t in tasks(base)]
+    else:
+        from multiprocessing import Pool
+        with SharedMaps() as maps, Pool(processes) as pool:
+            todo = tasks(maps.share_scenario(base))
+            summaries = pool.map(_summary_task, todo, chunksize=max(1, len(todo) // (8 * (processes or 4))))
+    Y = np.array([_metric_value(s, metric) for s in summaries], dtype=np.float64)
+    return Y.reshape(len(points), len(seeds))
+
+
+def _bootstrap(stat, n_rows, n_boot, rng, alpha=0.05):
+    """Percentile CI of stat(row indices) over rows resampled with replacement."""
+    if n_boot <= 0:
+        return None, None
+    draws = np.array([stat(rng.integers(n_rows, size=n_rows)) for _ in range(n_boot)])
+    return (np.nanpercentile(draws, 100 * alpha / 2, axis=0),
+            np.nanpercentile(draws, 100 * (1 - alpha / 2), axis=0))
+
+
+@dataclass
+class SensitivityResult:
+    method: str
+    table: pd.DataFrame          # one row per parameter
+    X: np.ndarray                # parameter points
+    Y: np.ndarray                # (points, seeds) outputs
+    seeds: list
+    crn: bool
+    info: dict = field(default_factory=dict)
+
+    @property
+    def runs(self) -> int:
+        return int(self.Y.size)
+
+    def __str__(self):
+        head = (f"{self.method} sensitivity, {len(self.X)} points x {len(self.seeds)} seeds = "
+                f"{self.runs} runs ({'common' if self.crn else 'independent'} random numbers)")
+        return head + "\n" + self.table.to_string(index=False, float_format=lambda v: f"{v:.4g}")
+
+
+# ---- Morris elementary effects ----
+def morris_trajectories(k: int, r: int, levels: int = 4, rng=None):
+    """r Morris trajectories in the unit cube: (r, k + 1, k) points and the step signs (r, k)."""
+    rng = np.random.default_rng(rng)
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels) / (levels - 1)
+    T = np.empty((r, k + 1, k))
+    order = np.empty((r, k), dtype=np.int64)
+    signs = np.empty((r, k))
+    for t in range(r):
+        x = rng.choice(grid, size=k)
+        up = x + delta <= 1 + 1e-12
+        down = x - delta >= -1e-12
+        s = np.where(up & down, rng.choice([-1.0, 1.0], size=k), np.where(up, 1.0, -1.0))
+        perm = rng.permutation(k)
+        T[t, 0] = x
+        for j, i in enumerate(perm):
+            x = x.copy()
+            x[i] += s[i] * delta
+            T[t, j + 1] = x
+        order[t], signs[t] = perm, s
+    return T, order, signs, delta
+
+
+def morris(params=PARAMETERS, base=BASE, trajectories: int = 20, levels: int = 4, seeds=range(5),
+           max_steps: int = 200, processes: int | None = 1, metric="final_prey", crn: bool = True,
+           n_boot: int = 1000, rng=0):
+    """
+    Morris screening: mu (mean effect), mu_star (mean |effect|), sigma (interaction /
+    non-linearity) per parameter, effects per unit of the parameter's range; CIs by
+    bootstrapping trajectories. Cost: trajectories x (k + 1) points x seeds runs.
+    """
+    names, bounds = list(params), list(params.values())
+    k = len(names)
+    gen = np.random.default_rng(rng)
+    T, order, signs, delta = morris_trajectories(k, trajectories, levels, gen)
+    X = _scale(T.reshape(-1, k), bounds)
+    Y = evaluate(X, names, base, seeds, max_steps, processes, metric, crn, _integer(bounds))
+    y = Y.mean(axis=1).reshape(trajectories, k + 1)
+
+    EE = np.empty((trajectories, k))
+    for t in range(trajectories):
+        for j, i in enumerate(order[t]):
+            EE[t, i] = (y[t, j + 1] - y[t, j]) / (signs[t, i] * delta)
+
+    def stats(rows):
+        e = EE[rows]
+        return np.stack([np.nanmean(np.abs(e), axis=0), np.nanmean(e, axis=0)])
+
+    lo, hi = _bootstrap(stats, trajectories, n_boot, gen)
+    table = pd.DataFrame(dict(parameter=names, mu=np.nanmean(EE, axis=0),
+                              mu_star=np.nanmean(np.abs(EE), axis=0),
+                              sigma=np.nanstd(EE, axis=0, ddof=1)))
+    if lo is not None:
+        table["mu_star_lo"], table["mu_star_hi"] = lo[0], hi[0]
+        table["mu_lo"], table["mu_hi"] = lo[1], hi[1]
+    table = table.sort_values("mu_star", ascending=False, ignore_index=True)
+    return SensitivityResult("morris", table, X, Y, list(seeds), crn,
+                             dict(metric=metric if isinstance(metric, str) else "custom",
+                                  elementary_effects=EE, levels=levels))
+
+
+# ---- Sobol indices (Saltelli sampling) ----
+def _unit_samples(n, d, rng):
+    try:
+        from scipy.stats import qmc
+        m = int(np.ceil(np.log2(max(2, n))))
+        return qmc.Sobol(d, scramble=True, seed=rng).random_base2(m)[:n]
+    except ImportError:
+        return rng.random((n, d))
+
+
+def sobol(params=PARAMETERS, base=BASE, n: int = 64, seeds=range(4), max_steps: int = 200,
+          processes: int | None = 1, metric="final_prey", crn: bool = True, n_boot: int = 1000, rng=0):
+    """
+    First-order (S1, Saltelli 2010) and total (ST, Jansen) Sobol indices; CIs by bootstrapping
+    the n base rows. Cost: n x (k + 2) points x seeds runs. Under CRN, row j of A, B and every
+    A_B^i shares its seeds, so the differences f(A_B^i) - f(A) are paired.
+    """
+    names, bounds = list(params), list(params.values())
+    k = len(names)
+    gen = np.random.default_rng(rng)
+    U = _unit_samples(n, 2 * k, gen)
+    A, B = U[:, :k], U[:, k:]
+    AB = np.repeat(A[None], k, axis=0)
+    for i in range(k):
+        AB[i, :, i] = B[:, i]
+    n = len(A)
+    units = np.concatenate([A, B, AB.reshape(-1, k)])
+    X = _scale(units, bounds)
+
+    Y = evaluate(X, names, base, seeds, max_steps, processes, metric, crn, _integer(bounds))
+    y = Y.mean(axis=1)
+    fA, fB, fAB = y[:n], y[n:2 * n], y[2 * n:].reshape(k, n)
+
+    def indices(rows):
+        a, b, ab = fA[rows], fB[rows], fAB[:, rows]
+        V = np.var(np.concatenate([a, b]), ddof=1)
+        if not V > 0:
+            return np.full((2, k), np.nan)
+        s1 = np.mean(b * (ab - a), axis=1) / V
+        st = 0.5 * np.mean((a - ab) ** 2, axis=1) / V
+        return np.stack([s1, st])
+
+    est = indices(np.arange(n))
+    lo, hi = _bootstrap(indices, n, n_boot, gen)
+    table = pd.DataFrame(dict(parameter=names, S1=est[0], ST=est[1]))
+    if lo is not None:
+        table["S1_lo"], table["S1_hi"] = lo[0], hi[0]
+        table["ST_lo"], table["ST_hi"] = lo[1], hi[1]
+    table = table.sort_values("ST", ascending=False, ignore_index=True)
+    return SensitivityResult("sobol", table, X, Y, list(seeds), crn,
+                             dict(metric=metric if isinstance(metric, str) else "custom", n=n,
+                                  variance=float(np.var(np.concatenate([fA, fB]), ddof=1))))
+
+
+# ---- paired scenario comparison ----
+def paired_difference(a: dict, b: dict, seeds=range(30), max_steps: int = 200,
+                      processes: int | None = 1, metric="final_prey", n_boot: int = 2000, rng=0):
+    """
+    Mean difference metric(a) - metric(b) over common seeds, with a bootstrap CI.
+    variance_reduction = (var(a) + var(b)) / var(a - b): the factor by which independent seeds
+    would need more runs for the same CI width.
+    """
+    seeds = list(seeds)
+    Y = np.empty((2, len(seeds)))
+    for row, sc in enumerate((a, b)):
+        scenario = {k: v for k, v in sc.items() if k != "group"}
+        Y[row] = evaluate(np.empty((1, 0)), [], scenario, seeds, max_steps, processes, metric)[0]
+    d = Y[0] - Y[1]
+    gen = np.random.default_rng(rng)
+    lo, hi = _bootstrap(lambda rows: np.nanmean(d[rows]), len(d), n_boot, gen)
+    var_ind = np.nanvar(Y[0], ddof=1) + np.nanvar(Y[1], ddof=1)
+    var_pair = np.nanvar(d, ddof=1)
+    return dict(mean_a=float(np.nanmean(Y[0])), mean_b=float(np.nanmean(Y[1])),
+                difference=float(np.nanmean(d)), ci_lo=None if lo is None else float(lo),
+                ci_hi=None if hi is None else float(hi),
+                se_paired=float(np.sqrt(var_pair / len(d))), se_independent=float(np.sqrt(var_ind / len(d))),
+                variance_reduction=float(var_ind / var_pair) if var_pair > 0 else np.inf,
+                runs=2 * len(seeds), Y=Y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sensitivity analysis of FeralCatModel parameters")
+    parser.add_argument("method", choices=["morris", "sobol"])
+    parser.add_argument("--trajectories", type=int, default=20, help="Morris trajectories")
+    parser.add_argument("--n", type=int, default=64, help="Sobol base samples")
+    parser.add_argument("--seeds", type=int, default=5, help="Seeds per parameter point")
+    parser.add_argument("--max-steps", type=int, default=200)
+    parser.add_argument("--metric", default="final_prey")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes (0 = all cores)")
+    parser.add_argument("--independent", action="store_true", help="No common random numbers")
+    parser.add_argument("--out", default=None, help="Optional CSV of the index table")
+    args = parser.parse_args()
+
+    kw = dict(seeds=range(args.seeds), max_steps=args.max_steps, metric=args.metric,
+              processes=args.processes or None, crn=not args.independent)
+    if args.method == "morris":
+        res = morris(trajectories=args.trajectories, **kw)
+    else:
+        res = sobol(n=args.n, **kw)
+    pd.set_option("display.width", 200)
+    print(res)
+    if args.out:
+        res.table.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Local simulation service with a warm worker pool.
+
+Starting Python, importing Mesa / NumPy / pandas and building everything from scratch costs far
+more than a small run itself. The service keeps a pool of worker processes that have already
+imported the model code (and run a tiny warm-up model), accepts run specs over HTTP - on a TCP
+port or a Unix socket - and streams results back as NDJSON, one line per finished run.
+
+    python -m src.service --port 8100 --workers 4
+    python -m src.service --unix /tmp/feralcats.sock
+
+A run spec is a scenario dict (FeralCatModel keyword arguments, "group" optional) plus:
+    seed / seeds        one seed or a list (runs go to the pool in parallel)
+    max_steps           default 200
+    vegetation_path     map files, loaded once by the service (maps.load_map cache) and
+    river_path          published to shared memory, so later requests reuse them
+    trace               include the per-step trace as columns (default true)
+
+    POST /run           body: run spec           -> NDJSON lines {"seed", "summary", "trace"}
+                                                    and a final {"done": true, "seconds": ...}
+    GET  /health        pool size, cached maps, requests served
+
+Client:
+    from src.service import ServiceClient
+    for line in ServiceClient(port=8100).run(dict(width=25, height=25, n_cats=8, n_prey=80,
+            predation_base=0.2, predation_coef=0.1, prey_flee_prob=0.4, seeds=[1, 2, 3])):
+        print(line["seed"], line["summary"]["final_prey"])
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .maps import load_map
+from .shared_maps import SharedMap, SharedMaps, detach
+
+
+_RESERVED = ("seed", "seeds", "max_steps", "trace", "vegetation_path", "river_path")
+
+
+# ---- worker side ----
+def _warm_up():
+    """Pool initializer: import the model stack and run a tiny model once."""
+    from .batch import run_once
+    run_once(dict(width=6, height=6, n_cats=1, n_prey=4, predation_base=0.2,
+                  predation_coef=0.1, prey_flee_prob=0.4), seed=0, max_steps=2)
+
+
+def _service_run(task):
+    from .batch import run_once
+    scenario, seed, max_steps, trace = task
+    # maps of earlier requests (since replaced) would otherwise stay mapped in this worker
+    detach(keep={v.name for v in scenario.values() if isinstance(v, SharedMap)})
+    summary, df = run_once(scenario, seed, max_steps)
+    out = dict(seed=seed, summary=summary)
+    if trace:
+        cols = [c for c in df.columns if c not in ("group", "seed", "total_steps")]
+        out["trace"] = {c: df[c].tolist() for c in cols}
+    return out
+
+
+def _jsonable(obj):
+    if hasattr(obj, "item"):
+        return obj.item()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"not JSON serialisable: {type(obj).__name__}")
+
+
+# ---- server ----
+class SimulationService:
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_warm_up)
+        self.maps = SharedMaps()
+        self._map_refs = {}     # (path, kind) -> (mtime_ns, SharedMap) of the file's current version
+        self._in_use = {}       # SharedMap name -> requests streaming with it
+        self._retired = []      # replaced maps still in use, released when their requests end
+        self.served = 0
+        # start the workers now rather than on the first request
+        for f in [self.pool.submit(os.getpid) for _ in range(self.workers)]:
+            f.result()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        self.maps.close()
+
+    def shared_map(self, path, kind):
+        """SharedMap of a map file; an edited file replaces (and releases) the older version."""
+        key = (os.path.abspath(path), kind)
+        mtime = os.stat(path).st_mtime_ns
+        hit = self._map_refs.get(key)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+        ref = self.maps.publish(load_map(path, kind))
+        self._map_refs[key] = (mtime, ref)
+        if hit is not None:
+            self._retired.append(hit[1])
+            self._release_retired()
+        return ref
+
+    def _release_retired(self):
+        busy = [r for r in self._retired if self._in_use.get(r.name)]
+        for r in self._retired:
+            if r not in busy:
+                self.maps.release(r)
+        self._retired = busy
+
+    def tasks(self, spec: dict):
+        scenario = {k: v for k, v in spec.items() if k not in _RESERVED}
+        if spec.get("vegetation_path"):
+            scenario["vegetation"] = self.shared_map(spec["vegetation_path"], "vegetation")
+        if spec.get("river_path"):
+            scenario["river"] = self.shared_map(spec["river_path"], "river")
+        seeds = spec.get("seeds", [spec.get("seed")])
+        max_steps = int(spec.get("max_steps", 200))
+        trace = bool(spec.get("trace", True))
+        return [(scenario, s, max_steps, trace) for s in seeds]
+
+    # HTTP
+    async def handle(self, reader, writer):
+        try:
+            request = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                k, _, v = line.decode("latin-1").partition(":")
+                headers[k.strip().lower()] = v.strip()
+            method, path = (request + ["", ""])[:2]
+            path = path.split("?")[0]
+
+            if method == "GET" and path == "/health":
+                body = dict(workers=self.workers, maps=len(self._map_refs),
+                            map_bytes=self.maps.nbytes, served=self.served)
+                self._respond(writer, "200 OK", json.dumps(body).encode("utf-8"))
+            elif method == "POST" and path == "/run":
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b"{}"
+                try:
+                    tasks = self.tasks(json.loads(body))
+                except (ValueError, TypeError, OSError) as e:
+                    self._respond(writer, "400 Bad Request", json.dumps(dict(error=str(e))).encode("utf-8"))
+                else:
+                    names = {v.name for t in tasks for v in t[0].values() if isinstance(v, SharedMap)}
+                    for n in names:
+                        self._in_use[n] = self._in_use.get(n, 0) + 1
+                    try:
+                        await self._stream_runs(writer, tasks)
+                    finally:
+                        for n in names:
+                            self._in_use[n] -= 1
+                            if not self._in_use[n]:
+                                del self._in_use[n]
+                        self._release_retired()
+            else:
+                self._respond(writer, "404 Not Found", b'{"error": "not found"}')
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, status, body):
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+
+    async def _stream_runs(self, writer, tasks):
+        # no Content-Length: lines are written as runs finish, the end of the body is the close
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+        futures = [loop.run_in_executor(self.pool, _service_run, t) for t in tasks]
+        for fut in asyncio.as_completed(futures):
+            try:
+                line = await fut
+            except Exception as e:   # a failed run is reported, the others keep streaming
+                line = dict(error=f"{type(e).__name__}: {e}")
+            writer.write(json.dumps(line, default=_jsonable).encode("utf-8") + b"\n")
+            await writer.drain()
+        self.served += 1
+        writer.write(json.dumps(dict(done=True, runs=len(tasks),
+                                     seconds=time.perf_counter() - t0)).encode("utf-8") + b"\n")
+
+
+async def serve(port: int = 8100, host: str = "127.0.0.1", unix: str | None = None,
+                workers: int | None = None):
+    service = SimulationService(workers)
+    if unix:
+        if os.path.exists(unix):
+            os.unlink(unix)
+        server = await asyncio.start_unix_server(service.handle, unix)
+        where = f"unix:{unix}"
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        where = f"http://{host}:{port}/"
+    print(f"simulation service: {where} ({service.workers} warm workers)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+        if unix and os.path.exists(unix):
+            os.unlink(unix)
+
+
+# ---- client ----
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class ServiceClient:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8100, unix: str | None = None,
+                 timeout: float | None = None):
+        self.host, self.port, self.unix, self.timeout = host, port, unix, timeout
+
+    def _conn(self):
+        if self.unix:
+            return _UnixHTTPConnection(self.unix, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def run(self, spec: dict):
+        """Submit a run spec; yields one dict per finished run, then the final {"done": ...}."""
+        conn = self._conn()
+        try:
+            conn.request("POST", "/run", body=json.dumps(spec, default=_jsonable),
+                         headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            if resp.status != 200:
+                raise RuntimeError(f"service error {resp.status}: {resp.read().decode()}")
+            for line in resp:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            conn.close()
+
+    def health(self) -> dict:
+        conn = self._conn()
+        try:
+            conn.request("GET", "/health")
+            return json.loads(conn.getresponse().read())
+        finally:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feral Cats ABM simulation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--unix", default=None, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.port, args.host, args.unix, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
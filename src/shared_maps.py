@@ -0,0 +1,178 @@
+"""
+Base maps (vegetation, river, ...) shared between processes without copies.
+
+The coordinator publishes each array once; tasks then carry a small picklable SharedMap
+descriptor instead of the array, and every worker maps the same physical pages read-only:
+
+    with SharedMaps() as maps:
+        veg_ref = maps.publish(V)          # multiprocessing.shared_memory segment
+        riv_ref = maps.publish(R)
+        ... send veg_ref / riv_ref to workers ...
+    # worker side
+        V = attach(veg_ref)                # read-only ndarray view, no copy
+
+Arrays that already live in a .npy file (np.memmap, e.g. from landscape.generate_landscape or
+np.load(..., mmap_mode="r")) are published by file name and memory-mapped by the workers, so
+no segment is created at all.
+
+Segments are unlinked by SharedMaps.close() / the with-block, at interpreter exit, and - if the
+coordinator dies - by multiprocessing's resource tracker. Workers keep their mappings for the
+life of the process (attach() caches them), so a pool can reuse them across tasks;
+SharedMaps.release(ref) frees one map early and detach(keep) drops a worker's stale mappings.
+
+batch.run_batch / ensemble.run_ensemble publish array-valued scenario entries automatically;
+FeralCatModel uses a read-only river as-is and makes its one working copy of vegetation.
+"""
+
+import atexit
+import weakref
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SharedMap:
+    """Picklable handle to a published array: a shared memory segment or a .npy file."""
+    name: str           # segment name, or file path for kind == "npy"
+    shape: tuple
+    dtype: str
+    kind: str = "shm"
+
+
+# ---- low-level segment helpers (also used by parallel.py for its writable arrays) ----
+def create_shared(shape, dtype, fill=None, src=None):
+    """New shared memory segment holding an array; returns (SharedMemory, ndarray view)."""
+    dtype = np.dtype(dtype)
+    nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    if src is not None:
+        arr[...] = src
+    elif fill is not None:
+        arr.fill(fill)
+    return shm, arr
+
+
+def attach_shared(desc):
+    """Attach to a segment by (name, shape, dtype); returns (SharedMemory, writable ndarray view)."""
+    name, shape, dtype = desc
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def release(shm, unlink: bool = True):
+    shm.close()
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ---- publishing ----
+class SharedMaps:
+    """Owner of published maps; close() (or leaving the with-block) frees the segments."""
+
+    def __init__(self):
+        self._segments = {}   # name -> SharedMemory
+        self._by_id = {}      # id(array) -> (array, SharedMap), so an array is published once
+        self._finalizer = weakref.finalize(self, _release_all, self._segments)
+
+    def publish(self, arr) -> SharedMap:
+        key = id(arr)
+        if key in self._by_id and self._by_id[key][0] is arr:
+            return self._by_id[key][1]
+        filename = getattr(arr, "filename", None)
+        if (isinstance(arr, np.memmap) and filename and str(filename).endswith(".npy")
+                and arr.flags.c_contiguous and _is_whole_npy(arr)):
+            ref = SharedMap(str(filename), tuple(arr.shape), arr.dtype.str, kind="npy")
+        else:
+            a = np.asarray(arr)
+            shm, view = create_shared(a.shape, a.dtype, src=a)
+            self._segments[shm.name] = shm
+            ref = SharedMap(shm.name, tuple(a.shape), a.dtype.str)
+            del view
+        self._by_id[key] = (arr, ref)
+        return ref
+
+    def share_scenario(self, scenario: dict) -> dict:
+        """Copy of a scenario dict with every ndarray value replaced by its SharedMap."""
+        return {k: self.publish(v) if isinstance(v, np.ndarray) else v for k, v in scenario.items()}
+
+    def release(self, ref: SharedMap):
+        """Free one published map now; workers that already attached it keep their mapping."""
+        shm = self._segments.pop(ref.name, None)
+        if shm is not None:
+            release(shm)
+        for key in [k for k, (_, r) in self._by_id.items() if r == ref]:
+            del self._by_id[key]
+
+    @property
+    def nbytes(self):
+        return sum(shm.size for shm in self._segments.values())
+
+    def close(self):
+        self._by_id.clear()
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _is_whole_npy(arr):
+    """True if a memmap is a full array from np.load / open_memmap (not a slice of one)."""
+    base = arr
+    while isinstance(base.base, np.memmap):
+        base = base.base
+    return base is arr or (base.shape == arr.shape and base.dtype == arr.dtype)
+
+
+def _release_all(segments):
+    for shm in segments.values():
+        release(shm)
+    segments.clear()
+
+
+# ---- worker side ----
+_attached = {}   # name -> (handle, read-only array), kept for the life of the process
+
+
+def attach(ref: SharedMap) -> np.ndarray:
+    """Read-only array for a SharedMap (cached per process)."""
+    hit = _attached.get(ref.name)
+    if hit is not None:
+        return hit[1]
+    if ref.kind == "npy":
+        arr = np.load(ref.name, mmap_mode="r")
+        handle = None
+    else:
+        handle, arr = attach_shared((ref.name, ref.shape, ref.dtype))
+    arr.flags.writeable = False
+    _attached[ref.name] = (handle, arr)
+    return arr
+
+
+def resolve(value):
+    """attach() SharedMap values, pass anything else through."""
+    return attach(value) if isinstance(value, SharedMap) else value
+
+
+def detach(keep=()):
+    """Drop this process's cached mappings except those named in keep (all of them by default)."""
+    # views must go before their segments can be closed
+    handles = [_attached.pop(name)[0] for name in [n for n in _attached if n not in keep]]
+    for h in handles:
+        if h is None:
+            continue
+        try:
+            h.close()
+        except BufferError:
+            pass   # an array from it is still alive; its pages go when that does
+
+
+atexit.register(detach)
@@ -0,0 +1,108 @@
+"""
+Per-purpose random streams: FeralCatModel(..., streams=True).
+
+By default every draw of a run comes from one shared sequence (model.random / model.rng), so the
+first decision that differs between two runs - one kill that succeeds under predation_coef 0.20
+but not 0.16 - shifts every later draw: activation order, moves and kills all decorrelate within
+a few steps, and the same seed is little better than an independent one. With streams on, each
+draw is a counter-based uniform keyed by what it decides:
+
+    placement       prey / cats / vegetation each from their own generator (seed, purpose)
+    activation      agents step in the order of a uniform keyed by (seed, agent, step)
+    movement        (seed, agent, step, move index) - cats move up to 3 times per step
+    flee            (seed, prey, step)
+    predation       target and success uniforms keyed by (seed, cat, step, move index)
+    breeding        litter size and sexes by (seed, prey, step); a super-individual's
+                    multinomial / binomial from a generator with the same key
+    regrowth        a generator keyed by (seed, step)
+
+so changing a parameter only flips the outcomes it affects, and everything else an agent does
+is the same draw in both runs. Draws are keyed by agent.stream_id rather than unique_id:
+initial agents use their unique_id, young get child_id(parent, step, i), so one extra birth
+early on doesn't shift the keys of everything born after it. Prey a cat can target are taken
+in stream_id order rather than the order they entered the cell. sensitivity.py turns streams on
+for its common-random-number runs.
+
+Uniforms come from a SplitMix64 hash of the key (the same function vectorised for activation),
+which costs about as much as a random.random() call. Streams-on runs are a different random
+sequence from streams-off runs with the same seed. scheduler="sync" keeps drawing in bulk from
+model.rng.
+"""
+
+import hashlib
+
+import numpy as np
+
+
+PLACE_PREY, PLACE_CATS, VEGETATION, REGROWTH, ACTIVATION, MOVE, FLEE, TARGET, PREDATION, \
+    BIRTH, SEX = range(11)
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_M1, _M2 = 0xBF58476D1CE4E5B9, 0x94D049BB133111EB
+
+
+def _mix(z):
+    z = (z + _GOLDEN) & _MASK
+    z = ((z ^ (z >> 30)) * _M1) & _MASK
+    z = ((z ^ (z >> 27)) * _M2) & _MASK
+    return z ^ (z >> 31)
+
+
+def _mix_array(z):
+    z = z + np.uint64(_GOLDEN)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(_M1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(_M2)
+    return z ^ (z >> np.uint64(31))
+
+
+def child_id(parent: int, step: int, i: int) -> int:
+    """stream_id of the i-th young born to parent at step (non-negative int64)."""
+    return _mix(_mix(parent & _MASK) ^ (((step << 8) | i) & _MASK)) >> 1
+
+
+def _seed_key(seed) -> int:
+    if isinstance(seed, (int, np.integer)):
+        return int(seed) & _MASK
+    return int.from_bytes(hashlib.blake2b(repr(seed).encode(), digest_size=8).digest(), "little")
+
+
+class RandomStreams:
+    def __init__(self, seed):
+        self.seed = _seed_key(seed)
+        self._base = [_mix(self.seed ^ _mix(p)) for p in range(SEX + 1)]
+
+    def uniform(self, purpose: int, uid: int, step: int, k: int = 0) -> float:
+        """Uniform in [0, 1) for one decision; k tells apart several draws of an agent in a step."""
+        h = _mix(self._base[purpose] ^ (uid & _MASK))
+        h = _mix(h ^ (((step << 8) | k) & _MASK))
+        return (h >> 11) * (1.0 / (1 << 53))
+
+    def uniforms(self, purpose: int, uids, step: int, k: int = 0) -> np.ndarray:
+        """uniform() for an array of agent ids."""
+        with np.errstate(over="ignore"):
+            h = _mix_array(np.uint64(self._base[purpose]) ^ np.asarray(uids, dtype=np.int64).astype(np.uint64))
+            h = _mix_array(h ^ np.uint64(((step << 8) | k) & _MASK))
+        return (h >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+    def pick(self, purpose: int, uid: int, step: int, options, weights=None, k: int = 0):
+        """One of options (optionally weighted) chosen by the keyed uniform."""
+        u = self.uniform(purpose, uid, step, k)
+        if weights is None:
+            return options[int(u * len(options))]
+        total = sum(weights)
+        acc, target = 0, u * total
+        for opt, w in zip(options, weights):
+            acc += w
+            if target < acc:
+                return opt
+        return options[-1]
+
+    def generator(self, purpose: int, *key) -> np.random.Generator:
+        return np.random.default_rng([self.seed, purpose, *key])
+
+    def order(self, agents, step: int) -> list:
+        """agents in activation order for this step."""
+        agents = list(agents)
+        keys = self.uniforms(ACTIVATION, [a.stream_id for a in agents], step)
+        return [agents[i] for i in np.argsort(keys, kind="stable")]
@@ -0,0 +1,230 @@
+"""
+Live telemetry for headless runs.
+
+Runs publish per-step counters (Cats, Prey, predation events, steps/sec) as small UDP
+datagrams; a single asyncio server collects them and streams them to browsers over
+Server-Sent Events. UDP sends never block, so a slow (or absent) server or browser can
+never slow the simulation down; the server keeps a bounded queue per browser and drops
+the oldest updates for clients that fall behind.
+
+Server (one per machine):
+    python -m src.telemetry --http-port 8000 --udp-port 8765
+    # open http://localhost:8000/ ; raw stream at /events, latest values at /runs
+
+Publishing from a run:
+    from src.telemetry import TelemetryPublisher
+    m = FeralCatModel(..., step_hooks=[TelemetryPublisher(run_id="S0/seed1")])
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import time
+
+from .model import count_cats, count_prey
+
+
+# ---- publisher (runs inside the simulation process) ----
+class TelemetryPublisher:
+    """
+    Step hook that sends one JSON datagram per step (or per min_interval seconds).
+    Fire-and-forget: send errors and full socket buffers just drop the update.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, run_id: str | None = None,
+                 min_interval: float = 0.0):
+        self.addr = (host, port)
+        self.run_id = run_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.min_interval = min_interval
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self._last_time = None
+        self._last_step = 0
+        self._last_sent = 0.0
+        self.steps_per_sec = 0.0
+
+    def __call__(self, model):
+        now = time.perf_counter()
+        step = getattr(model, "steps", self._last_step + 1)
+        if self._last_time is not None and now > self._last_time:
+            sps = (step - self._last_step) / (now - self._last_time)
+            # smooth a little so the readout does not flicker
+            self.steps_per_sec = sps if self.steps_per_sec == 0 else 0.8 * self.steps_per_sec + 0.2 * sps
+        self._last_time, self._last_step = now, step
+
+        if not model.running or now - self._last_sent >= self.min_interval:
+            self._last_sent = now
+            self.publish(dict(
+                run=self.run_id,
+                step=step,
+                cats=count_cats(model),
+                prey=count_prey(model),
+                pred=getattr(model, "predation_events_this_step", 0),
+                pred_total=getattr(model, "predation_events_total", 0),
+                sps=round(self.steps_per_sec, 2),
+                running=bool(model.running),
+                t=time.time(),
+            ))
+
+    def publish(self, msg: dict):
+        try:
+            self.sock.sendto(json.dumps(msg).encode("utf-8"), self.addr)
+        except OSError:
+            pass  # server down or buffer full: drop, never block the model
+
+    def close(self):
+        self.sock.close()
+
+
+# ---- server ----
+class _Client:
+    def __init__(self, maxsize):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, data: bytes):
+        # backpressure: a slow browser loses its oldest updates, nobody waits
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(data)
+
+
+class TelemetryServer(asyncio.DatagramProtocol):
+    """Collects datagrams from publishers and fans them out to SSE clients."""
+    def __init__(self, client_queue: int = 256):
+        self.client_queue = client_queue
+        self.latest = {}       # run id -> last message
+        self.clients = set()
+
+    # UDP side
+    def datagram_received(self, data, addr):
+        try:
+            msg = json.loads(data)
+        except ValueError:
+            return
+        if not isinstance(msg, dict):
+            return   # valid JSON but not a message (1, [], "x")
+        self.latest[str(msg.get("run", addr))] = msg
+        for c in self.clients:
+            c.offer(data)
+
+    # HTTP side
+    async def handle_http(self, reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # ignore headers
+            parts = request.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) > 1 else "/"
+
+            if path == "/events":
+                await self._stream(writer)
+            elif path == "/runs":
+                self._respond(writer, "application/json", json.dumps(self.latest).encode("utf-8"))
+            elif path == "/":
+                self._respond(writer, "text/html; charset=utf-8", _PAGE.encode("utf-8"))
+            else:
+                self._respond(writer, "text/plain", b"not found", status="404 Not Found")
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, ctype, body, status="200 OK"):
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {ctype}\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body)
+
+    async def _stream(self, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+        client = _Client(self.client_queue)
+        for msg in self.latest.values():  # current state first
+            client.offer(json.dumps(msg).encode("utf-8"))
+        self.clients.add(client)
+        try:
+            while True:
+                try:
+                    data = await asyncio.wait_for(client.queue.get(), timeout=15)
+                    writer.write(b"data: " + data + b"\n\n")
+                except asyncio.TimeoutError:
+                    writer.write(b": keep-alive\n\n")
+                await writer.drain()
+        finally:
+            self.clients.discard(client)
+
+
+async def serve(http_port: int = 8000, udp_port: int = 8765, host: str = "127.0.0.1",
+                client_queue: int = 256):
+    loop = asyncio.get_running_loop()
+    server = TelemetryServer(client_queue=client_queue)
+    transport, _ = await loop.create_datagram_endpoint(lambda: server, local_addr=(host, udp_port))
+    http = await asyncio.start_server(server.handle_http, host, http_port)
+    print(f"telemetry: http://{host}:{http_port}/  (runs publish to udp {host}:{udp_port})")
+    try:
+        async with http:
+            await http.serve_forever()
+    finally:
+        transport.close()
+
+
+_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Feral Cats ABM - live runs</title>
+<style>
+ body { font-family: sans-serif; margin: 1em; }
+ table { border-collapse: collapse; }
+ td, th { padding: 2px 10px; border-bottom: 1px solid #ddd; text-align: right; }
+ td:first-child, th:first-child { text-align: left; }
+ tr.stopped { color: #999; }
+</style></head>
+<body><h3>Feral Cats ABM - live runs</h3>
+<table><thead><tr><th>run</th><th>step</th><th>Cats</th><th>Prey</th>
+<th>predation/step</th><th>predation total</th><th>steps/s</th></tr></thead>
+<tbody id="rows"></tbody></table>
+<script>
+const rows = new Map();
+const body = document.getElementById("rows");
+const es = new EventSource("/events");
+es.onmessage = (e) => {
+  const m = JSON.parse(e.data);
+  const run = String(m.run);
+  let tr = rows.get(run);
+  if (!tr) {
+    tr = document.createElement("tr");
+    rows.set(run, tr);
+    body.appendChild(tr);
+  }
+  tr.className = m.running ? "" : "stopped";
+  // payloads come from anyone who can reach the UDP port: text only, never markup
+  tr.replaceChildren(...[run, m.step, m.cats, m.prey, m.pred, m.pred_total, m.sps].map((v) => {
+    const td = document.createElement("td");
+    td.textContent = String(v);
+    return td;
+  }));
+};
+</script></body></html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feral Cats ABM telemetry server")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (0.0.0.0 for remote browsers)")
+    parser.add_argument("--http-port", type=int, default=8000, help="Port for the browser page / SSE")
+    parser.add_argument("--udp-port", type=int, default=8765, help="Port runs publish to")
+    parser.add_argument("--client-queue", type=int, default=256, help="Updates buffered per browser")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.http_port, args.udp_port, args.host, args.client_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+Compact agent trajectories: every live agent's position and state at every step.
+
+Storage is columnar and delta-encoded against the previous step:
+    keyframe    full state (id, kind, sex / energy, count, x, y) at the first step of every chunk
+    moves       one uint8 per surviving agent and step, (dx, dy) packed as (dx+3)*7 + (dy+3);
+                run-length encoded for the step when that is smaller (lots of agents standing
+                still); 255 = moved further than 3 cells, the new cell is in `jumps`
+    births      agents that appeared (id, kind, state, count, x, y)
+    deaths      agents that disappeared (id)
+    states      state changes (id, new value) - cat energy; prey sex never changes
+    counts      count changes (id, new value) - super-individual prey (superprey.py) growing or
+                shrinking; every other agent has count 1
+Agents are kept in id order, so survivors need no ids at all. A cat moves at most 3 cells per
+step and a prey 1, so a step costs about one byte per agent: 5,000 agents x 5,000 steps is
+~25 MB (less with compress=True), against GBs for per-agent DataFrames.
+
+    m = FeralCatModel(..., trajectory="out/run1_traj")   # chunk files in a directory
+    m = FeralCatModel(..., trajectory=True)              # in memory
+    ... run ...
+    m.finalize()                                         # flushes the last chunk
+    tr = load_trajectory("out/run1_traj")                # or m.trajectory.reader()
+    for frame in tr.frames(): ...                        # dict of arrays per step
+    tr.frame_at(120), tr.track(agent_id), tr.to_frame()  # one step, one agent, long DataFrame
+
+model.reset() starts a new recording on the same recorder, replacing the old one (chunk files
+in the directory included).
+
+kind: 0 = prey, 1 = cat. state: prey 0 = F / 1 = M, cat = energy. count: individuals the agent
+stands for (frame["count"].sum() over prey = model.n_prey). Chunks recorded before counts
+existed read as count 1.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from .agents import Cat, Prey
+
+
+PREY, CAT = 0, 1
+STILL = 24          # code of (0, 0)
+JUMP = 255
+
+AGENT_DTYPE = np.dtype([("step", np.int32), ("id", np.int64), ("kind", np.int8),
+                        ("state", np.int8), ("count", np.int32), ("x", np.int32), ("y", np.int32)])
+EVENT_DTYPE = np.dtype([("step", np.int32), ("id", np.int64), ("value", np.int32)])
+
+
+# ---- codecs ----
+def encode_moves(dx, dy):
+    """Pack per-agent displacements into uint8 codes; returns (codes, jump mask)."""
+    jump = (np.abs(dx) > 3) | (np.abs(dy) > 3)
+    codes = ((dx + 3) * 7 + (dy + 3)).astype(np.uint8)
+    codes[jump] = JUMP
+    return codes, jump
+
+
+def decode_moves(codes):
+    c = codes.astype(np.int32)
+    dx, dy = c // 7 - 3, c % 7 - 3
+    jump = codes == JUMP
+    dx[jump] = dy[jump] = 0
+    return dx, dy
+
+
+def rle_encode(values):
+    """(run values, run lengths as uint16) of a 1D array."""
+    n = len(values)
+    if n == 0:
+        return values[:0], np.empty(0, dtype=np.uint16)
+    starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+    lengths = np.diff(np.append(starts, n))
+    if lengths.max() > 65535:   # split very long runs
+        reps = -(-lengths // 65535)
+        vals = np.repeat(values[starts], reps)
+        lens = np.full(reps.sum(), 65535, dtype=np.int64)
+        lens[np.cumsum(reps) - 1] = lengths - (reps - 1) * 65535
+        return vals, lens.astype(np.uint16)
+    return values[starts], lengths.astype(np.uint16)
+
+
+def rle_decode(values, lengths):
+    return np.repeat(values, lengths.astype(np.int64))
+
+
+def _snapshot(model):
+    """(ids, kind, state, count, x, y) of all live agents in id order."""
+    ids, kind, state, count, pos = [], [], [], [], []
+    for a in model.agents_by_type.get(Prey, ()):
+        if a.pos is not None:
+            ids.append(a.unique_id)
+            kind.append(PREY)
+            state.append(0 if a.sex == "F" else 1)
+            count.append(a.count)
+            pos.append(a.pos)
+    for a in model.agents_by_type.get(Cat, ()):
+        if a.alive and a.pos is not None:
+            ids.append(a.unique_id)
+            kind.append(CAT)
+            state.append(a.energy)
+            count.append(1)
+            pos.append(a.pos)
+    ids = np.array(ids, dtype=np.int64)
+    order = np.argsort(ids, kind="stable")
+    xy = np.array(pos, dtype=np.int32).reshape(-1, 2)[order]
+    return (ids[order], np.array(kind, dtype=np.int8)[order], np.array(state, dtype=np.int8)[order],
+            np.array(count, dtype=np.int32)[order], xy[:, 0].copy(), xy[:, 1].copy())
+
+
+# ---- recording ----
+class TrajectoryRecorder:
+    """
+    Step hook recording agent trajectories; path=None keeps the chunks in memory.
+    chunk_steps: steps per chunk (each chunk starts with a keyframe).
+    """
+    def __init__(self, path=None, chunk_steps: int = 1000, compress: bool = False, every: int = 1):
+        self.path = Path(path) if path is not None else None
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self.chunk_steps = max(1, int(chunk_steps))
+        self.compress = compress
+        self.every = max(1, int(every))
+        self.chunks = []        # in-memory chunks (dicts of arrays)
+        self.n_chunks = 0
+        self.nbytes = 0
+        self._prev = None
+        self._last_step = None
+        self._start_chunk()
+
+    def _start_chunk(self):
+        self._key = None
+        self._steps, self._codes, self._runs = [], [], []
+        self._n_codes, self._n_runs = [], []
+        self._births, self._deaths, self._states, self._jumps = [], [], [], []
+        self._counts = []
+
+    def __call__(self, model):
+        if model.steps % self.every == 0:
+            self.record(model)
+
+    def record(self, model):
+        step = model.steps
+        if self._last_step is not None and step <= self._last_step:
+            # a new run on the same recorder (reset model): start over
+            self.clear()
+        cur = _snapshot(model)
+        ids, kind, state, count, x, y = cur
+        if self._key is None:
+            self._key = np.empty(len(ids), dtype=AGENT_DTYPE)
+            self._key["step"], self._key["id"], self._key["kind"] = step, ids, kind
+            self._key["state"], self._key["count"] = state, count
+            self._key["x"], self._key["y"] = x, y
+            self._key_step = step
+            self._steps.append(step)
+            self._n_codes.append(0)
+            self._n_runs.append(-1)
+        else:
+            self._delta(step, self._prev, cur)
+        self._prev = cur
+        self._last_step = step
+        if len(self._steps) >= self.chunk_steps:
+            self.flush()
+
+    def _delta(self, step, prev, cur):
+        pids, _, pstate, pcount, px, py = prev
+        ids, kind, state, count, x, y = cur
+        surv_c = np.isin(ids, pids, assume_unique=True)
+        surv_p = np.isin(pids, ids, assume_unique=True)
+
+        dead = pids[~surv_p]
+        if len(dead):
+            self._deaths.append(np.rec.fromarrays(
+                [np.full(len(dead), step, np.int32), dead, np.zeros(len(dead), np.int32)], dtype=EVENT_DTYPE))
+        born = ~surv_c
+        if born.any():
+            b = np.empty(int(born.sum()), dtype=AGENT_DTYPE)
+            b["step"], b["id"], b["kind"] = step, ids[born], kind[born]
+            b["state"], b["count"] = state[born], count[born]
+            b["x"], b["y"] = x[born], y[born]
+            self._births.append(b)
+
+        codes, jump = encode_moves(x[surv_c] - px[surv_p], y[surv_c] - py[surv_p])
+        if jump.any():
+            sid = ids[surv_c][jump]
+            j = np.empty(len(sid), dtype=AGENT_DTYPE)
+            j["step"], j["id"], j["kind"] = step, sid, kind[surv_c][jump]
+            j["state"], j["count"] = state[surv_c][jump], count[surv_c][jump]
+            j["x"], j["y"] = x[surv_c][jump], y[surv_c][jump]
+            self._jumps.append(j)
+        for new, old, out in ((state, pstate, self._states), (count, pcount, self._counts)):
+            changed = new[surv_c] != old[surv_p]
+            if changed.any():
+                sid = ids[surv_c][changed]
+                out.append(np.rec.fromarrays(
+                    [np.full(len(sid), step, np.int32), sid, new[surv_c][changed].astype(np.int32)],
+                    dtype=EVENT_DTYPE))
+
+        vals, lens = rle_encode(codes)
+        if 3 * len(vals) < len(codes):     # rle costs 3 bytes per run
+            self._codes.append(vals)
+            self._runs.append(lens)
+            self._n_runs.append(len(lens))
+            self._n_codes.append(len(vals))
+        else:
+            self._codes.append(codes)
+            self._n_runs.append(-1)
+            self._n_codes.append(len(codes))
+        self._steps.append(step)
+
+    def _chunk(self):
+        def cat(parts, dtype):
+            return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        return dict(
+            keyframe=self._key, steps=np.array(self._steps, dtype=np.int32),
+            n_codes=np.array(self._n_codes, dtype=np.int32), n_runs=np.array(self._n_runs, dtype=np.int32),
+            codes=cat(self._codes, np.uint8), runs=cat(self._runs, np.uint16),
+            births=cat(self._births, AGENT_DTYPE), deaths=cat(self._deaths, EVENT_DTYPE),
+            states=cat(self._states, EVENT_DTYPE), jumps=cat(self._jumps, AGENT_DTYPE),
+            counts=cat(self._counts, EVENT_DTYPE),
+        )
+
+    def flush(self):
+        """Close the current chunk: write it (path given) or keep it in memory."""
+        if self._key is None:
+            return
+        chunk = self._chunk()
+        self.nbytes += sum(a.nbytes for a in chunk.values())
+        if self.path is not None:
+            save = np.savez_compressed if self.compress else np.savez
+            save(self.path / f"chunk_{self.n_chunks:05d}.npz", **chunk)
+        else:
+            self.chunks.append(chunk)
+        self.n_chunks += 1
+        self._start_chunk()   # next record() writes a keyframe
+
+    def clear(self):
+        """Drop everything recorded so far (chunk files in path too)."""
+        if self.path is not None:
+            for f in _chunk_files(self.path):
+                f.unlink()
+        self.chunks, self.n_chunks, self.nbytes = [], 0, 0
+        self._prev = self._last_step = None
+        self._start_chunk()
+
+    def reader(self) -> "TrajectoryReader":
+        """Reader over everything recorded so far (flushes the open chunk)."""
+        self.flush()
+        return TrajectoryReader(self.chunks if self.path is None else _chunk_files(self.path))
+
+
+# ---- reading ----
+def _chunk_files(path):
+    return sorted(Path(path).glob("chunk_*.npz"))
+
+
+def load_trajectory(path) -> "TrajectoryReader":
+    files = _chunk_files(path)
+    if not files:
+        raise FileNotFoundError(f"no trajectory chunks in {path}")
+    return TrajectoryReader(files)
+
+
+def _counts_of(records):
+    """count column of keyframe / birth records (1s for chunks recorded without it)."""
+    if "count" in records.dtype.names:
+        return records["count"].astype(np.int32)
+    return np.ones(len(records), dtype=np.int32)
+
+
+def _by_step(records, steps):
+    """records grouped per step: list aligned with steps (records are in step order)."""
+    bounds = np.searchsorted(records["step"], np.append(steps, np.iinfo(np.int32).max), side="left")
+    return [records[bounds[i]:bounds[i + 1]] for i in range(len(steps))]
+
+
+class TrajectoryReader:
+    def __init__(self, chunks):
+        self._chunks = list(chunks)    # dicts or .npz paths
+        self._first_steps = None
+
+    def _load(self, i):
+        c = self._chunks[i]
+        if isinstance(c, dict):
+            return c
+        with np.load(c) as z:
+            return {k: z[k] for k in z.files}
+
+    @property
+    def first_steps(self):
+        if self._first_steps is None:
+            self._first_steps = [int(self._load(i)["steps"][0]) for i in range(len(self._chunks))]
+        return self._first_steps
+
+    def _decode_chunk(self, c):
+        key = c["keyframe"]
+        ids, kind, state = key["id"].copy(), key["kind"].copy(), key["state"].copy()
+        count = _counts_of(key)
+        x, y = key["x"].copy(), key["y"].copy()
+        steps = c["steps"]
+        births, deaths = _by_step(c["births"], steps), _by_step(c["deaths"], steps)
+        states, jumps = _by_step(c["states"], steps), _by_step(c["jumps"], steps)
+        counts = _by_step(c.get("counts", np.empty(0, dtype=EVENT_DTYPE)), steps)
+        code_off = np.concatenate(([0], np.cumsum(c["n_codes"])))
+        run_off = np.concatenate(([0], np.cumsum(np.maximum(c["n_runs"], 0))))
+        for i, step in enumerate(steps):
+            if i > 0:
+                if len(deaths[i]):
+                    keep = ~np.isin(ids, deaths[i]["id"], assume_unique=True)
+                    ids, kind, state, count = ids[keep], kind[keep], state[keep], count[keep]
+                    x, y = x[keep], y[keep]
+                codes = c["codes"][code_off[i]:code_off[i + 1]]
+                if c["n_runs"][i] >= 0:
+                    codes = rle_decode(codes, c["runs"][run_off[i]:run_off[i + 1]])
+                dx, dy = decode_moves(codes)
+                x, y = x + dx, y + dy
+                for recs, apply in ((jumps[i], "xy"), (states[i], "state"), (counts[i], "count")):
+                    if len(recs):
+                        idx = np.searchsorted(ids, recs["id"])
+                        if apply == "xy":
+                            x[idx], y[idx] = recs["x"], recs["y"]
+                        elif apply == "state":
+                            state[idx] = recs["value"]
+                        else:
+                            count[idx] = recs["value"]
+                b = births[i]
+                if len(b):
+                    ids = np.concatenate((ids, b["id"]))
+                    order = np.argsort(ids, kind="stable")
+                    ids = ids[order]
+                    kind = np.concatenate((kind, b["kind"]))[order]
+                    state = np.concatenate((state, b["state"]))[order]
+                    count = np.concatenate((count, _counts_of(b)))[order]
+                    x = np.concatenate((x, b["x"]))[order]
+                    y = np.concatenate((y, b["y"]))[order]
+            yield dict(step=int(step), id=ids, kind=kind, state=state, count=count, x=x, y=y)
+
+    def frames(self, start=None, stop=None):
+        """Yield every recorded step as a dict of arrays (id, kind, state, count, x, y) in id order."""
+        for i in range(len(self._chunks)):
+            if start is not None and i + 1 < len(self._chunks) and self.first_steps[i + 1] <= start:
+                continue
+            if stop is not None and self.first_steps[i] > stop:
+                return
+            for f in self._decode_chunk(self._load(i)):
+                if start is not None and f["step"] < start:
+                    continue
+                if stop is not None and f["step"] > stop:
+                    return
+                yield f
+
+    def frame_at(self, step):
+        """State at one recorded step (decodes only that step's chunk)."""
+        for f in self.frames(start=step, stop=step):
+            return f
+        raise KeyError(f"step {step} not recorded")
+
+    def track(self, agent_id):
+        """(steps, x, y, state) of one agent while it was alive."""
+        out = []
+        for f in self.frames():
+            i = np.searchsorted(f["id"], agent_id)
+            if i < len(f["id"]) and f["id"][i] == agent_id:
+                out.append((f["step"], f["x"][i], f["y"][i], f["state"][i]))
+        arr = np.array(out, dtype=np.int64).reshape(-1, 4)
+        return arr[:, 0], arr[:, 1], arr[:, 2], arr[:, 3]
+
+    def to_frame(self, start=None, stop=None):
+        """Long DataFrame (step, id, kind, state, count, x, y); large for long runs - prefer frames()."""
+        import pandas as pd
+        parts = [pd.DataFrame({"step": np.full(len(f["id"]), f["step"], dtype=np.int32),
+                               "id": f["id"], "kind": f["kind"], "state": f["state"],
+                               "count": f["count"], "x": f["x"], "y": f["y"]})
+                 for f in self.frames(start, stop)]
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+            columns=["step", "id", "kind", "state", "count", "x", "y"])
@@ -1,5 +1,9 @@
+import time
+
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import animation
+from matplotlib.colors import LinearSegmentedColormap, ListedColormap
 from matplotlib.lines import Line2D
 from src.model import count_cats, count_prey
 
@@ -31,6 +35,434 @@ def _get_positions(model):
     return cats_x, cats_y, prey_x, prey_y
 
 
+def _positions_array(model, cls):
+    """
+    (n, 2) int array of grid positions of live agents of one class, and (n,) individuals each
+    stands for (super-individual prey count, 1 otherwise).
+    """
+    agents = [a for a in model.agents_by_type.get(cls, ())
+              if a.pos is not None and getattr(a, "alive", True)]
+    pos = np.array([a.pos for a in agents], dtype=np.int64).reshape(-1, 2)
+    return pos, np.array([getattr(a, "count", 1) for a in agents], dtype=np.int64)
+
+
+# vegetation palette shared by the patch renderer and the raster renderer
+_VEG_COLORS = [
+    (0.9, 0.9, 0.9, 1.0),        # 0 = no vegetation (light gray)
+    (0.56, 0.93, 0.56, 0.6),     # lightgreen
+    (0.24, 0.70, 0.44, 0.6),     # mediumseagreen
+    (0.13, 0.55, 0.13, 0.7),     # forestgreen
+    (0.00, 0.39, 0.00, 0.8),     # darkgreen
+]
+
+
+def _block_reduce(arr, x0, x1, y0, y1, block, how="mean"):
+    """Reduce arr[x0:x1, y0:y1] over block x block cells (mean or max); edge blocks are partial."""
+    sub = np.asarray(arr[x0:x1, y0:y1])
+    if block == 1:
+        return sub
+    w, h = sub.shape
+    bw, bh = -(-w // block), -(-h // block)
+    fill = 0 if how == "max" else np.nan
+    padded = np.full((bw * block, bh * block), fill, dtype=np.float64)
+    padded[:w, :h] = sub
+    blocks = padded.reshape(bw, block, bh, block)
+    if how == "max":
+        return blocks.max(axis=(1, 3))
+    return np.nanmean(blocks, axis=(1, 3))
+
+
+class _RasterView:
+    """
+    Level-of-detail renderer for big grids: every layer is one image of the visible window,
+    downsampled to at most max_px blocks per side. Agents become density heatmaps, or markers
+    once the visible window is at full cell resolution and holds few enough agents.
+    """
+    def __init__(self, ax, model, max_px=400, max_agents=5000, scent_enabled=lambda: True):
+        self.ax, self.model = ax, model
+        self.max_px, self.max_agents = max_px, max_agents
+        self.scent_enabled = scent_enabled
+        w, h = model.width, model.height
+
+        veg_cmap = LinearSegmentedColormap.from_list("veg", _VEG_COLORS)
+        empty = np.zeros((1, 1))
+        kw = dict(origin="upper", interpolation="nearest", extent=(0, w, h, 0))
+        self.veg_im = ax.imshow(empty, cmap=veg_cmap, vmin=0, vmax=4, zorder=0, **kw)
+        self.river_im = ax.imshow(empty, cmap=ListedColormap([(0, 0, 0, 0), (0.0, 0.75, 1.0, 1.0)]),
+                                  vmin=0, vmax=1, zorder=1, **kw)
+        self.scent_im = ax.imshow(empty, cmap=ListedColormap([(1, 0, 0, a) for a in np.linspace(0, 0.35, 32)]),
+                                  vmin=0, vmax=1, zorder=2, **kw)
+        self.prey_im = ax.imshow(np.ma.masked_all((1, 1)), cmap="Blues", zorder=3, alpha=0.85, **kw)
+        self.cats_im = ax.imshow(np.ma.masked_all((1, 1)), cmap="Reds", zorder=3, alpha=0.85, **kw)
+        self.cats_scatter = ax.scatter([], [], marker="s", c="tab:red", zorder=4)
+        self.prey_scatter = ax.scatter([], [], marker="o", c="tab:blue", zorder=4)
+        ax.set_autoscale_on(False)
+        self.artists = (self.veg_im, self.river_im, self.scent_im, self.prey_im, self.cats_im,
+                        self.cats_scatter, self.prey_scatter)
+
+    def window(self):
+        """Visible cell window (x0, x1, y0, y1) from the current axis limits."""
+        w, h = self.model.width, self.model.height
+        xa, xb = sorted(self.ax.get_xlim())
+        ya, yb = sorted(self.ax.get_ylim())
+        x0, x1 = max(0, int(np.floor(xa))), min(w, int(np.ceil(xb)))
+        y0, y1 = max(0, int(np.floor(ya))), min(h, int(np.ceil(yb)))
+        return x0, max(x1, x0 + 1), y0, max(y1, y0 + 1)
+
+    def _density(self, pos, weights, x0, x1, y0, y1, block):
+        bw, bh = -(-(x1 - x0) // block), -(-(y1 - y0) // block)
+        if len(pos):
+            inside = (pos[:, 0] >= x0) & (pos[:, 0] < x1) & (pos[:, 1] >= y0) & (pos[:, 1] < y1)
+            p = pos[inside]
+            idx = ((p[:, 0] - x0) // block) * bh + (p[:, 1] - y0) // block
+            counts = np.bincount(idx, weights=weights[inside],
+                                 minlength=bw * bh).astype(np.int64).reshape(bw, bh)
+        else:
+            counts = np.zeros((bw, bh), dtype=np.int64)
+        return counts
+
+    @staticmethod
+    def _set(im, data, extent, vmax=None):
+        im.set_data(data.T)
+        im.set_extent(extent)
+        if vmax is not None:
+            im.set_clim(0, vmax)
+
+    def render(self):
+        model = self.model
+        x0, x1, y0, y1 = self.window()
+        block = max(1, int(np.ceil(max(x1 - x0, y1 - y0) / self.max_px)))
+        # snap the window to whole blocks so images line up with cells
+        x0 -= x0 % block
+        y0 -= y0 % block
+        bx1 = x0 + -(-(x1 - x0) // block) * block
+        by1 = y0 + -(-(y1 - y0) // block) * block
+        extent = (x0, bx1, by1, y0)
+
+        veg = getattr(model, "vegetation", None)
+        if veg is not None:
+            self._set(self.veg_im, _block_reduce(veg, x0, x1, y0, y1, block), extent)
+        river = getattr(model, "river", None)
+        if river is not None:
+            self._set(self.river_im, _block_reduce(river, x0, x1, y0, y1, block, how="max"), extent)
+
+        scent = getattr(model, "cat_scent", None)
+        try:
+            enabled = bool(self.scent_enabled())
+        except Exception:
+            enabled = True
+        self.scent_im.set_visible(enabled and scent is not None)
+        if enabled and scent is not None:
+            self._set(self.scent_im, _block_reduce(scent, x0, x1, y0, y1, block), extent)
+
+        cats, prey = _positions_array(model, Cat), _positions_array(model, Prey)
+        cat_counts = self._density(*cats, x0, x1, y0, y1, block)
+        prey_counts = self._density(*prey, x0, x1, y0, y1, block)
+        detail = block == 1 and cat_counts.sum() + prey_counts.sum() <= self.max_agents
+
+        for im, counts in ((self.cats_im, cat_counts), (self.prey_im, prey_counts)):
+            im.set_visible(not detail)
+            if not detail:
+                self._set(im, np.ma.masked_equal(counts, 0), extent, vmax=max(1, counts.max()))
+        for sc, (pos, _) in ((self.cats_scatter, cats), (self.prey_scatter, prey)):
+            sc.set_visible(detail)
+            if detail:
+                inside = (pos[:, 0] >= x0) & (pos[:, 0] < x1) & (pos[:, 1] >= y0) & (pos[:, 1] < y1)
+                sc.set_offsets(pos[inside] + 0.5 if inside.any() else np.empty((0, 2)))
+        return block
+
+    def connect_navigation(self, fig, on_change=None):
+        """Mouse wheel zooms around the cursor, left-drag pans, 'r' / double-click resets the view."""
+        ax, w, h = self.ax, self.model.width, self.model.height
+        drag = {}
+
+        def redraw():
+            self.render()
+            if on_change is not None:
+                on_change()
+            fig.canvas.draw_idle()
+
+        def on_scroll(event):
+            if event.inaxes is not ax or event.xdata is None:
+                return
+            factor = 0.8 if event.button == "up" else 1.25
+            (xa, xb), (ya, yb) = ax.get_xlim(), ax.get_ylim()
+            nx = [event.xdata + (v - event.xdata) * factor for v in (xa, xb)]
+            ny = [event.ydata + (v - event.ydata) * factor for v in (ya, yb)]
+            if abs(nx[1] - nx[0]) > w or abs(ny[1] - ny[0]) > h:
+                nx, ny = [0, w], [h, 0]
+            ax.set_xlim(*nx)
+            ax.set_ylim(*ny)
+            redraw()
+
+        def on_press(event):
+            if event.inaxes is not ax:
+                return
+            if event.dblclick:
+                ax.set_xlim(0, w)
+                ax.set_ylim(h, 0)
+                redraw()
+            elif event.button == 1:
+                drag["start"] = (event.x, event.y, ax.get_xlim(), ax.get_ylim())
+
+        def on_motion(event):
+            if "start" not in drag or event.x is None:
+                return
+            sx, sy, (xa, xb), (ya, yb) = drag["start"]
+            inv = ax.transData.inverted()
+            (dx0, dy0), (dx1, dy1) = inv.transform([(sx, sy), (event.x, event.y)])
+            ax.set_xlim(xa - (dx1 - dx0), xb - (dx1 - dx0))
+            ax.set_ylim(ya - (dy1 - dy0), yb - (dy1 - dy0))
+            redraw()
+
+        def on_release(event):
+            drag.pop("start", None)
+
+        def on_key(event):
+            if event.key == "r":
+                ax.set_xlim(0, w)
+                ax.set_ylim(h, 0)
+                redraw()
+
+        return [fig.canvas.mpl_connect(name, fn) for name, fn in (
+            ("scroll_event", on_scroll), ("button_press_event", on_press),
+            ("motion_notify_event", on_motion), ("button_release_event", on_release),
+            ("key_press_event", on_key))]
+
+
+class _PerfHUD:
+    """
+    Frame-time overlay: model step time, artist update time, canvas render time, achieved FPS
+    and dropped frames, plus a rolling plot of the last `history` frames.
+    Render time and FPS come from the canvas draw_event: render = draw_event - end of the
+    frame's update (includes the event loop's wait), period = time between two frame draws.
+    A frame slot is dropped when the period overruns interval_ms (round(period / interval) - 1);
+    gaps over max(1 s, 10 intervals) are taken as a pause and not counted.
+    """
+    def __init__(self, fig, ax, interval_ms, enabled=True, history=120):
+        self.enabled = enabled if callable(enabled) else (lambda: bool(enabled))
+        self.interval = max(interval_ms, 1) / 1000
+        self.history = history
+        self.step_ms = np.full(history, np.nan)
+        self.update_ms = np.full(history, np.nan)
+        self.render_ms = np.full(history, np.nan)
+        self.frames = self.dropped = 0
+        self.fps = np.nan
+        self._slot = 0
+        self._t_updated = None   # end of the last update, until its draw_event
+        self._t_drawn = None     # last frame draw
+
+        self.text = ax.text(0.98, 0.98, "", transform=ax.transAxes, ha="right", va="top",
+                            multialignment="left", family="monospace", fontsize=8, zorder=6, visible=False,
+                            bbox=dict(facecolor="white", alpha=0.7, linewidth=0))
+        self.ax_hist = ax.inset_axes([0.58, 0.03, 0.39, 0.2], zorder=6)
+        self.ax_hist.set_visible(False)
+        self.ax_hist.patch.set_alpha(0.85)
+        self.ax_hist.tick_params(labelsize=6, length=2, pad=1)
+        self.ax_hist.set_xlim(0, history - 1)
+        self.ax_hist.set_xticks([])
+        self.ax_hist.set_ylabel("ms", fontsize=6, labelpad=1)
+        x = np.arange(history)
+        self.lines = [self.ax_hist.plot(x, self.step_ms, lw=0.8, c=c, label=lab)[0]
+                      for c, lab in (("tab:purple", "step"), ("tab:orange", "update"), ("tab:gray", "render"))]
+        self.ax_hist.legend(fontsize=5, loc="upper left", ncol=3, frameon=False, handlelength=1)
+        self.artists = (self.text, self.ax_hist)
+        self.cid = fig.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def reset(self):
+        """Clear the history (a new run on the same figure)."""
+        for a in (self.step_ms, self.update_ms, self.render_ms):
+            a.fill(np.nan)
+        self.frames = self.dropped = 0
+        self.fps = np.nan
+        self._t_updated = self._t_drawn = None
+
+    def _on_draw(self, event):
+        now = time.perf_counter()
+        if self._t_updated is None:
+            return   # a redraw that did not follow a frame (resize, pan, ...)
+        self.render_ms[self._slot] = (now - self._t_updated) * 1000
+        self._t_updated = None
+        if self._t_drawn is not None:
+            period = now - self._t_drawn
+            if period < max(1.0, 10 * self.interval):
+                self.dropped += max(0, int(period / self.interval + 0.5) - 1)
+                self.fps = 1 / period if np.isnan(self.fps) else 0.9 * self.fps + 0.1 / period
+        self._t_drawn = now
+
+    def frame(self, step_s, update_s):
+        """Record one frame's step / update times and refresh the overlay."""
+        on = self.enabled()
+        if self.text.get_visible() != on:
+            self.text.set_visible(on)
+            self.ax_hist.set_visible(on)
+        if not on:
+            self._t_updated = self._t_drawn = None
+            return
+        i = self._slot = self.frames % self.history
+        self.step_ms[i], self.update_ms[i], self.render_ms[i] = step_s * 1000, update_s * 1000, np.nan
+        self.frames += 1
+
+        s = self.summary()
+        bound = "step" if s["step_ms"] >= s["update_ms"] + np.nan_to_num(s["render_ms"]) else "draw"
+        self.text.set_text(
+            f"step   {s['step_ms']:6.1f} ms\n"
+            f"update {s['update_ms']:6.1f} ms\n"
+            f"render {s['render_ms']:6.1f} ms\n"
+            f"fps {s['fps']:5.1f} / {1 / self.interval:.1f}\n"
+            f"dropped {self.dropped}\n"
+            f"bound: {bound}")
+        order = np.roll(np.arange(self.history), -(i + 1))   # oldest first
+        for line, arr in zip(self.lines, (self.step_ms, self.update_ms, self.render_ms)):
+            line.set_ydata(arr[order])
+        if self.frames % 10 == 1:
+            top = np.nanmax([np.nanmax(a) if np.isfinite(a).any() else 0
+                             for a in (self.step_ms, self.update_ms, self.render_ms)])
+            self.ax_hist.set_ylim(0, max(1.0, 1.2 * top))
+        self._t_updated = time.perf_counter()
+
+    def summary(self):
+        """Means over the history window (ms), smoothed FPS, dropped frames."""
+        with np.errstate(all="ignore"):
+            mean = lambda a: float(np.nanmean(a)) if np.isfinite(a).any() else np.nan
+            return dict(step_ms=mean(self.step_ms), update_ms=mean(self.update_ms),
+                        render_ms=mean(self.render_ms), fps=float(self.fps),
+                        target_fps=1 / self.interval, frames=self.frames, dropped=self.dropped)
+
+
+def _stats_text(model, frame):
+    return (
+        f"Step: {frame+1}\n"
+        f"Cats: {count_cats(model)}\n"
+        f"Prey: {count_prey(model)}\n"
+        f"PredationEvents: {getattr(model, 'predation_events_this_step', 0)}\n"
+        f"PredationEventsTotal: {getattr(model, 'predation_events_total', 0)}"
+    )
+
+
+def _add_legend(ax):
+    legend_elems = [
+        Line2D([0], [0], marker='s', linestyle='None', markerfacecolor='tab:red',
+               markersize=6, label='Cats'),
+        Line2D([0], [0], marker='o', linestyle='None', markerfacecolor='tab:blue',
+               markersize=6, label='Prey'),
+    ]
+    return ax.legend(
+        handles=legend_elems,
+        loc="lower center",
+        bbox_to_anchor=(0.5, -0.10),
+        ncol=len(legend_elems),
+        columnspacing=1.2,
+        handletextpad=0.3,
+        borderaxespad=0.,
+        frameon=True, fancybox=True, framealpha=0.1
+    )
+
+
+def _rebindable_animation(fig, bound, init, update, interval_ms, on_rebind=None, draw=None):
+    """
+    FuncAnimation over bound["model"] / bound["steps"]; fig._rebind(model, steps, on_finished)
+    later points the same artists at another model of the same size and returns a new animation.
+    fig._show(model) draws a model's current state without stepping it (see show_state).
+    """
+    def start():
+        return animation.FuncAnimation(
+            fig, update, init_func=init,
+            frames=bound["steps"], interval=interval_ms,
+            blit=False, repeat=False
+        )
+
+    def rebind(model, steps, on_finished=None):
+        old = bound["model"]
+        if (model.width, model.height) != (old.width, old.height):
+            return None
+        if on_rebind is not None:
+            on_rebind(model)
+        if getattr(fig, "_hud", None) is not None:
+            fig._hud.reset()
+        bound.update(model=model, steps=steps, on_finished=on_finished)
+        return start()
+
+    def show(model):
+        old = bound["model"]
+        if draw is None or (model.width, model.height) != (old.width, old.height):
+            return False
+        draw(model, model.steps - 1)
+        fig.canvas.draw_idle()
+        return True
+
+    fig._rebind = rebind
+    fig._show = show
+    return start()
+
+
+def reanimate(fig, model, steps, on_finished=None):
+    """
+    Restart a figure made by animate_grid on a new (or reset()) model, reusing its artists
+    instead of rebuilding the figure. Returns the new animation, or None if the figure can't
+    show this model (different grid size) - then build a new one with animate_grid.
+    Stop the previous animation first.
+    """
+    rebind = getattr(fig, "_rebind", None)
+    return rebind(model, steps, on_finished) if rebind is not None else None
+
+
+def show_state(fig, model) -> bool:
+    """
+    Draw another model's current state (e.g. a replay.ReplayRecorder.seek() result) on a
+    figure made by animate_grid, without stepping anything. Pause the animation first; when
+    it resumes it draws its own model again. False if the figure can't show this model.
+    """
+    show = getattr(fig, "_show", None)
+    return bool(show is not None and show(model))
+
+
+def _animate_raster(fig, ax, model, steps, interval_ms, scent_enabled, on_finished,
+                    max_agents=5_000, max_px=400, hud=False):
+    """Level-of-detail variant of animate_grid for large grids / populations."""
+    view = _RasterView(ax, model, max_px=max_px, max_agents=max_agents, scent_enabled=scent_enabled)
+    text_box = ax.text(0.02, 0.98, "", transform=ax.transAxes, va="top", zorder=5,
+                       bbox=dict(facecolor="white", alpha=0.6, linewidth=0))
+    _add_legend(ax)
+    fig._lod_view = view  # keep the view (and its callbacks) alive with the figure
+    fig._lod_cids = view.connect_navigation(fig)
+
+    bound = dict(model=model, steps=steps, on_finished=on_finished)
+    perf = fig._hud = _PerfHUD(fig, ax, interval_ms, hud) if hud else None
+    extra = perf.artists if perf is not None else ()
+
+    def init():
+        view.render()
+        text_box.set_text("Step: 0")
+        return view.artists + (text_box,) + extra
+
+    def draw(m, frame):
+        live, view.model = view.model, m
+        view.render()
+        view.model = live
+        text_box.set_text(_stats_text(m, frame))
+
+    def update(frame):
+        m = bound["model"]
+        t0 = time.perf_counter()
+        if m.running:
+            m.step()
+        t1 = time.perf_counter()
+        draw(m, frame)
+        if perf is not None:
+            perf.frame(t1 - t0, time.perf_counter() - t1)
+        if (frame + 1) >= bound["steps"] and callable(bound["on_finished"]):
+            bound["on_finished"]()
+        return view.artists + (text_box,) + extra
+
+    def on_rebind(m):
+        view.model = m
+
+    anim = _rebindable_animation(fig, bound, init, update, interval_ms, on_rebind, draw)
+    plt.tight_layout()
+    return fig, anim
+
+
 def animate_grid(
     model,
     steps,
@@ -38,11 +470,29 @@ def animate_grid(
     figsize=(6, 6),
     title="Feral Cats vs Prey (2D Grid)",
     scent_enabled=lambda: True,
-    on_finished=None
+    on_finished=None,
+    lod="auto",
+    lod_max_cells=10_000,
+    lod_max_agents=5_000,
+    lod_max_px=400,
+    hud=False,
 ):
     """
     2D animation: support vegetation base map, river mask, cat/prey scatter, statistical text box;
     Now, a red outline layer for the "Cat Odor Range" has been added (cells with Chebyshev distance <= 2).
+
+    Level of detail: with lod="auto", grids above lod_max_cells cells or populations above
+    lod_max_agents agents are drawn as downsampled raster layers (at most lod_max_px blocks per
+    side) with agent-density heatmaps instead of one patch per cell / one marker per agent.
+    In that mode the mouse wheel zooms, left-drag pans, 'r' or double-click resets; only the
+    visible window is rendered, at full detail once it is small enough. lod=True/False forces it.
+
+    hud=True (or a callable returning bool, checked every frame, like scent_enabled) adds a
+    performance overlay: model step / artist update / render times, achieved FPS against
+    1000 / interval_ms, dropped frames and a rolling history plot; fig._hud.summary() gives
+    the same numbers as a dict.
+
+    The figure can be reused for another run of the same size: see reanimate().
     """
     w, h = model.width, model.height
 
@@ -53,20 +503,19 @@ def animate_grid(
     ax.set_aspect("equal")
     ax.invert_yaxis()  # y=0 at top
 
+    use_raster = (w * h > lod_max_cells or len(model.agents) > lod_max_agents) if lod == "auto" else bool(lod)
+    if use_raster:
+        return _animate_raster(fig, ax, model, steps, interval_ms, scent_enabled, on_finished,
+                               max_agents=lod_max_agents, max_px=lod_max_px, hud=hud)
+
     # background grid patches
     cell_patches = {}   # {(x,y): Rectangle}
 
     def veg_val2color(v):
         # 0= no vegetation (light gray); 1..4 use different green/opacity
         if v <= 0:
-            return (0.9, 0.9, 0.9, 1.0)
-        palette = {
-            1: (0.56, 0.93, 0.56, 0.6),  # lightgreen
-            2: (0.24, 0.70, 0.44, 0.6),  # mediumseagreen
-            3: (0.13, 0.55, 0.13, 0.7),  # forestgreen
-            4: (0.00, 0.39, 0.00, 0.8),  # darkgreen
-        }
-        return palette.get(int(v), (0.00, 0.39, 0.00, 0.8))
+            return _VEG_COLORS[0]
+        return _VEG_COLORS[min(int(v), 4)]
 
     v = getattr(model, "vegetation", None)
     for x in range(w):
@@ -79,16 +528,34 @@ def animate_grid(
             else:
                 rect.set_facecolor((0.9, 0.9, 0.9, 1.0)) # gray if no vegetation info
 
-    # river layer (only init once), above background
+    # river layer (drawn once per model), above background
     river_patches = []
-    if hasattr(model, "river") and model.river is not None:
-        for rx in range(w):
-            for ry in range(h):
-                if model.river[rx, ry]:
-                    rrect = plt.Rectangle((rx, ry), 1, 1, color="deepskyblue",
-                                          alpha=1.0, linewidth=0, zorder=1)
-                    ax.add_patch(rrect)
-                    river_patches.append(rrect)
+    drawn = {}   # copy of the river mask the patches show
+
+    def _draw_river(m):
+        for rrect in river_patches:
+            rrect.remove()
+        river_patches.clear()
+        river = getattr(m, "river", None)
+        drawn["river"] = None if river is None else np.array(river, dtype=bool)
+        drawn["source"] = river
+        if river is None:
+            return
+        for rx, ry in zip(*np.nonzero(river)):
+            rrect = plt.Rectangle((rx, ry), 1, 1, color="deepskyblue",
+                                  alpha=1.0, linewidth=0, zorder=1)
+            ax.add_patch(rrect)
+            river_patches.append(rrect)
+
+    _draw_river(model)
+
+    def _sync_river(m):
+        # redraw only when the mask differs from the drawn one (identity check first: cheap per frame)
+        river = getattr(m, "river", None)
+        if river is drawn["source"] and river is not None and not river.flags.writeable:
+            return
+        if drawn["river"] is None or river is None or not np.array_equal(drawn["river"], river):
+            _draw_river(m)
 
     # scent layer (red outline for cells within Chebyshev distance <= 2 of any cat), default hidden
     scent_patches = {}   # {(x,y): Rectangle}
@@ -118,24 +585,14 @@ def animate_grid(
     text_box = ax.text(0.02, 0.98, "", transform=ax.transAxes, va="top", zorder=4)
 
     # legends
-    legend_elems = [
-        Line2D([0], [0], marker='s', linestyle='None', markerfacecolor='tab:red',
-               markersize=6, label='Cats'),
-        Line2D([0], [0], marker='o', linestyle='None', markerfacecolor='tab:blue',
-               markersize=6, label='Prey'),
-    ]
-    legend = ax.legend(
-        handles=legend_elems,
-        loc="lower center",
-        bbox_to_anchor=(0.5, -0.10),
-        ncol=len(legend_elems),
-        columnspacing=1.2,
-        handletextpad=0.3,
-        borderaxespad=0.,
-        frameon=True, fancybox=True, framealpha=0.1
-    )
+    legend = _add_legend(ax)
+
+    # the model the artists show; reanimate() swaps it
+    bound = dict(model=model, steps=steps, on_finished=on_finished)
+    perf = fig._hud = _PerfHUD(fig, ax, interval_ms, hud) if hud else None
+    extra = perf.artists if perf is not None else ()
 
-    def _apply_scent_visibility():
+    def _apply_scent_visibility(model):
         """
         Show/hide the red stroke based on the GUI toggle and `model.cat_scent`.
         The model needs to call `refresh_cat_scent(radius=2)` at each step.
@@ -161,25 +618,24 @@ def animate_grid(
                 srect.set_visible(False)
 
     def init():
-        cx, cy, px, py = _get_positions(model)
+        cx, cy, px, py = _get_positions(bound["model"])
         cats_scatter.set_offsets(list(zip(cx, cy)) if cx else [])
         prey_scatter.set_offsets(list(zip(px, py)) if px else [])
         text_box.set_text("Step: 0")
 
         # initialize scent visibility
-        _apply_scent_visibility()
+        _apply_scent_visibility(bound["model"])
 
         # return all altered artists for FuncAnimation
         return (
             tuple(cell_patches.values())
             + tuple(scent_patches.values())
             + (cats_scatter, prey_scatter, text_box)
+            + extra
         )
 
-    def update(frame):
-        # each frame (model step) may consist of multiple sub-steps(cat_scent/vegetation updates)
-        if model.running:
-            model.step()
+    def draw(model, frame):
+        _sync_river(model)
 
         # plant changes
         v2 = getattr(model, "vegetation", None)
@@ -188,38 +644,44 @@ def animate_grid(
                 rect.set_facecolor(veg_val2color(v2[x, y]))
 
         # scent changes
-        _apply_scent_visibility()
+        _apply_scent_visibility(model)
 
         # update scatter positions & statistics
         cx, cy, px, py = _get_positions(model)
         cats_scatter.set_offsets(list(zip(cx, cy)) if cx else [])
         prey_scatter.set_offsets(list(zip(px, py)) if px else [])
 
-        n_cats = count_cats(model)
-        n_prey = count_prey(model)
-        pred_events = getattr(model, "predation_events_this_step", 0)
-        pred_events_total = getattr(model, "predation_events_total", 0)
-        text_box.set_text(
-            f"Step: {frame+1}\n"
-            f"Cats: {n_cats}\n"
-            f"Prey: {n_prey}\n"
-            f"PredationEvents: {pred_events}\n"
-            f"PredationEventsTotal: {pred_events_total}"
-        )
+        text_box.set_text(_stats_text(model, frame))
 
-        if (frame + 1) >= steps and callable(on_finished):
-            on_finished()
+    def update(frame):
+        model = bound["model"]
+        # each frame (model step) may consist of multiple sub-steps(cat_scent/vegetation updates)
+        t0 = time.perf_counter()
+        if model.running:
+            model.step()
+        t1 = time.perf_counter()
+
+        draw(model, frame)
+        if perf is not None:
+            perf.frame(t1 - t0, time.perf_counter() - t1)
+
+        if (frame + 1) >= bound["steps"] and callable(bound["on_finished"]):
+            bound["on_finished"]()
 
         return (
             tuple(cell_patches.values())
             + tuple(scent_patches.values())
             + (cats_scatter, prey_scatter, text_box)
+            + extra
         )
 
-    anim = animation.FuncAnimation(
-        fig, update, init_func=init,
-        frames=steps, interval=interval_ms,
-        blit=False, repeat=False
-    )
+    def on_rebind(m):
+        _sync_river(m)
+        v2 = getattr(m, "vegetation", None)
+        if v2 is not None:
+            for (x, y), rect in cell_patches.items():
+                rect.set_facecolor(veg_val2color(v2[x, y]))
+
+    anim = _rebindable_animation(fig, bound, init, update, interval_ms, on_rebind, draw)
     plt.tight_layout()
     return fig, anim
@@ -0,0 +1,14 @@
+from src.jobqueue import JobQueue
+
+P = dict(width=20, height=20, n_cats=2, n_prey=30, predation_base=0.2, predation_coef=0.16,
+         prey_flee_prob=0.4)
+
+
+def test_scenarios_without_group_are_kept_apart(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite")
+    q.enqueue_sweep([P, dict(P, predation_coef=0.2)], range(3), 100)
+    assert q.counts()["pending"] == 6
+    # the same scenario again (any key order) is a no-op
+    q.enqueue_sweep([dict(reversed(list(P.items())))], range(3), 100)
+    assert q.counts()["pending"] == 6
+    q.close()
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+from src.maps import read_json_grid
+
+
+def test_json_grid(tmp_path):
+    f = tmp_path / "v.json"
+    f.write_text("[ [1.5, 2] ,\n [3, 4] ]\n")
+    np.testing.assert_array_equal(read_json_grid(f), [[1.5, 2], [3, 4]])
+
+
+def test_ragged_json_grid_is_rejected(tmp_path):
+    f = tmp_path / "v.json"
+    f.write_text("[[1,2,3],[4,5,6,7,8],[0]]")
+    with pytest.raises(ValueError):
+        read_json_grid(f)
@@ -0,0 +1,17 @@
+from src.model import FeralCatModel
+
+
+def test_reset_to_another_size_starts_over():
+    m = FeralCatModel(25, 25, 3, 60, 0.2, 0.1, 0.4, seed=1, occupancy=True)
+    for _ in range(5):
+        m.step()
+    m.reset(seed=2)
+    m.step()
+    assert m.occupancy.samples == 6
+
+    m.reset(seed=3, width=30, height=30)
+    m.step()
+    maps = m.occupancy.maps()
+    assert maps["samples"] == 1
+    assert maps["cat_visits"].shape == (30, 30)
+    assert maps["prey_visits"].sum() == m.n_prey
@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.model import FeralCatModel
+from src.trajectory import _snapshot
+
+
+def _model(**kw):
+    return FeralCatModel(30, 30, 5, 150, 0.2, 0.1, 0.4, seed=kw.pop("seed", 1), **kw)
+
+
+def _frames(model):
+    return list(model.trajectory.reader().frames())
+
+
+def test_reset_starts_a_new_recording():
+    m = _model(trajectory=True)
+    for _ in range(20):
+        m.step()
+    m.reset(seed=5)
+    for _ in range(20):
+        m.step()
+    got = _frames(m)
+
+    fresh = _model(seed=5, trajectory=True)
+    for _ in range(20):
+        fresh.step()
+    want = _frames(fresh)
+
+    assert [f["step"] for f in got] == list(range(21))
+    assert len(got) == len(want)
+    for a, b in zip(got, want):
+        for k in ("id", "kind", "state", "count", "x", "y"):
+            np.testing.assert_array_equal(a[k], b[k])
+    # the last frame is the live model
+    ids, kind, state, count, x, y = _snapshot(m)
+    np.testing.assert_array_equal(got[-1]["id"], ids)
+    np.testing.assert_array_equal(got[-1]["x"], x)
+    np.testing.assert_array_equal(got[-1]["y"], y)
+
+
+def test_reset_replaces_chunk_files(tmp_path):
+    m = _model(trajectory=tmp_path / "traj")
+    m.trajectory.chunk_steps = 8
+    for _ in range(20):
+        m.step()
+    m.reset(seed=5)
+    for _ in range(5):
+        m.step()
+    m.finalize()
+    assert [f["step"] for f in m.trajectory.reader().frames()] == list(range(6))